@@ -27,6 +27,9 @@ curse_file_path = os.path.join(os.path.dirname(__file__), 'data', 'curse_words_s
 
 from ai_audio.stt_engine import StreamingSpeechRecognizer
 from session_state_manager import session_state_manager
+from server.metrics import STAGE_CPU_SECONDS
+from server.alert_latency import alert_latency, ALERT_AUDIO
+from server.tracing import frame_tracer, NULL_TRACE
 
 # 욕설 수위 한글 카테고리 매핑
 CATEGORY_KOREAN_MAP = {
@@ -49,6 +52,9 @@ PROFANITY_LEVEL_PRIORITY_MAP = {
     'low': 1
 }
 
+# 이벤트 루프에서 실행되는 recv 처리의 CPU 시간
+_AUDIO_RECV_CPU = STAGE_CPU_SECONDS.labels('audio_recv')
+
 
 class AudioProcessor(MediaStreamTrack):
     """
@@ -122,7 +128,7 @@ class AudioProcessor(MediaStreamTrack):
         """
         음성 인식기를 초기화합니다.
         """
-        def on_recognition_result(text: str, timestamp: float):
+        def on_recognition_result(text: str, timestamp: float, ingest_time: float = None, trace=NULL_TRACE):
             """음성 인식 결과 콜백"""
             if text.strip():
                 self.recognition_results.append(text)
@@ -130,7 +136,8 @@ class AudioProcessor(MediaStreamTrack):
 
                 # 🔥 스레드 안전한 큐에 결과 추가
                 try:
-                    self.stt_result_queue.put({'text': text, 'timestamp': timestamp}, block=False)
+                    self.stt_result_queue.put({'text': text, 'timestamp': timestamp, 'ingest_time': ingest_time,
+                                              'trace': trace, 'trace_enqueued': trace.now()}, block=False)
                     print(f"📥 STT 결과 큐에 추가됨: {text}")
                 except queue.Full:
                     print("⚠️ STT 결과 큐가 가득참")
@@ -178,6 +185,10 @@ class AudioProcessor(MediaStreamTrack):
         # STT 결과 처리 (논블로킹)
         self._process_stt_results_sync()
         frame = await self.track.recv()
+        recv_start = pytime.time()
+        cpu_start = pytime.thread_time()
+        trace = frame_tracer.start(self.session_id, 'audio')
+        trace_start = trace.now()
 
         try:
 
@@ -263,6 +274,7 @@ class AudioProcessor(MediaStreamTrack):
                     audio_data_1d = audio_data
                     
                 rms = np.sqrt(np.mean(audio_data_1d.astype(np.float32) ** 2))
+                self.processing_stats['audio_level'] = float(rms)
                 is_silence = rms < 100
                 print(f"🔊 오디오 레벨: RMS={rms:.1f}, 무음={'예' if is_silence else '아니오'}")
 
@@ -297,6 +309,8 @@ class AudioProcessor(MediaStreamTrack):
             # 3초 경과 시 버퍼에 저장
             if current_time - self.buffer_start_time >= self.buffer_duration:
                 print(f"🎉 3초 버퍼 완성! 경과시간: {current_time - self.buffer_start_time:.2f}초, 버퍼 크기: {len(self.audio_buffer)} 샘플")
+                window_trace = frame_tracer.start(self.session_id, 'stt')
+                window_start = window_trace.now()
                 try:
                     audio_np = np.array(self.audio_buffer[:int(self.buffer_sample_rate * self.buffer_duration)], dtype=np.int16)
                     print(f"🔢 numpy 배열 생성됨: {len(audio_np)} 샘플, dtype={audio_np.dtype}")
@@ -313,11 +327,14 @@ class AudioProcessor(MediaStreamTrack):
                     
                     # float32로 정규화 (Whisper 요구사항: -1.0 ~ 1.0 범위)
                     audio_float = resampled_audio.astype(np.float32) / 32767.0
+                    window_enqueued = window_trace.span('resample', window_start)
                     
                     # STT 엔진으로 전송 (3초 간격)                    
                     if self.speech_recognizer and self.speech_recognizer.is_running:
                         try:
-                            self.speech_recognizer.process_audio_chunk({'audio_data': audio_float,'timestamp': float(current_time)})
+                            # ingest_time: 윈도 첫 프레임 수신 시각 (알림 지연 SLO 기준)
+                            self.speech_recognizer.process_audio_chunk({'audio_data': audio_float,'timestamp': float(current_time), 'ingest_time': self.buffer_start_time,
+                                                                        'trace': window_trace, 'trace_enqueued': window_enqueued})
                         except Exception as e:
                             print(f"❌ STT 처리 중 오류: {e}")
                             print(f"❌ 오류 타입: {type(e).__name__}")
@@ -339,6 +356,14 @@ class AudioProcessor(MediaStreamTrack):
 
         except Exception as e:
             print(f"❌ 오디오 버퍼링/저장 처리 중 오류: {e}")
+        else:
+            self.processing_stats['processed_frames'] += 1
+
+        # 처리 통계 (get_stats/메트릭에서 사용)
+        self.processing_stats['total_frames'] += 1
+        self.processing_stats['processing_time'] += pytime.time() - recv_start
+        _AUDIO_RECV_CPU.inc(pytime.thread_time() - cpu_start)
+        trace.span('audio.recv', trace_start)
 
         # return processed_frame
         return frame
@@ -352,7 +377,10 @@ class AudioProcessor(MediaStreamTrack):
                 try:
                     # 논블로킹으로 큐에서 결과 가져오기
                     result = self.stt_result_queue.get(block=False)
-                    self._send_text_via_datachannel(result['text'], result['timestamp'])
+                    trace = result.get('trace', NULL_TRACE)
+                    send_start = trace.span('result_wait', result.get('trace_enqueued', 0.0))
+                    self._send_text_via_datachannel(result['text'], result['timestamp'], result.get('ingest_time'))
+                    trace.span('alert.send', send_start)
                     self.stt_result_queue.task_done()
                 except queue.Empty:
                     break  # 큐가 비어있음
@@ -394,12 +422,13 @@ class AudioProcessor(MediaStreamTrack):
         print(f"📡 AudioProcessor에 Data Channel 설정됨: {data_channel.label}")
         
 
-    def _send_text_via_datachannel(self, text: str, timestamp: float):
+    def _send_text_via_datachannel(self, text: str, timestamp: float, ingest_time: float = None):
         """
         Data Channel을 통해 텍스트를 전송합니다.
         
         @param {str} text - 전송할 텍스트
         @param {float} timestamp - 타임스탬프
+        @param {float} ingest_time - 오디오 윈도 수신 시각 (알림 지연 기록용)
         """
         if self.data_channel and self.data_channel.readyState == "open":
             try:
@@ -417,6 +446,7 @@ class AudioProcessor(MediaStreamTrack):
                     # JSON으로 직렬화하여 전송
                     json_message = json.dumps(message, ensure_ascii=False)
                     self.data_channel.send(json_message)
+                    alert_latency.record(self.session_id, ALERT_AUDIO, ingest_time)
                     print(f"🚨 욕설/금지어 감지: {curse_info['category']} - {curse_info['detail']}")
                     print(f"📤 Data Channel로 STT 결과 전송: {text}")
             except Exception as e:
@@ -472,6 +502,19 @@ class AudioProcessor(MediaStreamTrack):
             print("음성 인식이 중지되었습니다.")
     
 
+    def stop(self):
+        """
+        트랙 종료 시 음성 인식 스레드를 멈추고 세션별 Whisper 모델과 오디오 버퍼를 해제합니다.
+        """
+        self.stop_speech_recognition()
+        self.speech_recognizer = None
+        self.audio_buffer = []
+        self.frame_intervals = []
+        self.pts_gaps = []
+        self.recognition_results = []
+        self.data_channel = None
+        super().stop()
+
     def get_recognition_results(self) -> list:
         """
         인식 결과 목록을 반환합니다.
@@ -13,11 +13,14 @@ import queue
 import time
 import os
 import numpy as np
-from typing import Callable, Optional
+from typing import Callable, Dict, List, Optional
 from collections import deque
 import soundfile as sf
 from datetime import datetime
 
+from server.metrics import STAGE_CPU_SECONDS, STT_CHUNK_SECONDS
+from server.tracing import NULL_TRACE
+
 # HuggingFace Hub 최적화 설정
 os.environ['HF_HUB_DISABLE_SYMLINKS_WARNING'] = '1'  # symlink 경고 비활성화
 
@@ -28,6 +31,8 @@ except ImportError:
     print("⚠️ faster-whisper가 설치되지 않았습니다. pip install faster-whisper")
     FASTER_WHISPER_AVAILABLE = False
 
+_STT_CPU = STAGE_CPU_SECONDS.labels('stt')
+
 def check_cuda_compatibility():
     """
     CUDA 호환성을 자세히 확인합니다.
@@ -104,6 +109,82 @@ def check_cuda_compatibility():
     print("-" * 40)
 
 
+# Whisper 추론 스레드 수 (입장 제어의 코어 비용 환산에도 사용)
+WHISPER_CPU_THREADS = 4
+
+# 워밍업을 마친 모델 인스턴스 (크기별, 세션이 하나씩 가져감)
+_warm_models: Dict[str, List] = {}
+_warm_models_lock = threading.Lock()
+
+
+def load_whisper_model(model_size: str):
+    """
+    세션과 워밍업이 같은 설정으로 Whisper 모델을 로드합니다.
+    
+    @param model_size: Whisper 모델 크기 ("tiny", "small", "medium")
+    @returns: WhisperModel 인스턴스
+    """
+    return WhisperModel(
+        model_size,
+        device="cpu",
+        # device="cuda",
+        compute_type="int8",  # CPU 최적화
+        cpu_threads=WHISPER_CPU_THREADS,
+        download_root="./models"
+    )
+
+
+def acquire_whisper_model(model_size: str):
+    """
+    세션용 Whisper 모델을 가져옵니다. 워밍업을 마친 인스턴스가 있으면 그대로 넘기고, 없으면 새로 로드합니다.
+    
+    @param model_size: Whisper 모델 크기
+    @returns: (WhisperModel 인스턴스, 워밍업 인스턴스 여부)
+    """
+    with _warm_models_lock:
+        warm = _warm_models.get(model_size)
+        if warm:
+            return warm.pop(), True
+    return load_whisper_model(model_size), False
+
+
+def warmup_whisper_model(model_size: str, runs: int = 2, sample_rate: int = 16000) -> dict:
+    """
+    Whisper 모델을 로드해 합성 오디오로 몇 번 인식을 실행합니다. (블로킹)
+    
+    워밍업한 인스턴스는 버리지 않고 보관했다가 acquire_whisper_model로 그 크기의 첫 세션에 넘기므로,
+    첫 세션은 로드와 첫 인식의 지연 초기화 비용을 치르지 않습니다. 이후 세션은 각자 새로 로드하지만
+    모델 파일 페이지 캐시와 CTranslate2 커널 초기화는 프로세스 단위로 이미 끝나 있습니다.
+    
+    @param model_size: Whisper 모델 크기
+    @param runs: 인식 실행 횟수
+    @param sample_rate: 합성 오디오 샘플링 레이트
+    @returns: 로드/워밍업 시간(초)
+    """
+    if not FASTER_WHISPER_AVAILABLE:
+        raise ImportError("faster-whisper 패키지가 필요합니다")
+    
+    load_start = time.time()
+    model = load_whisper_model(model_size)
+    load_time = time.time() - load_start
+    
+    # 세션 버퍼와 같은 3초 길이의 저음량 잡음 + 톤
+    rng = np.random.default_rng(0)
+    t = np.arange(int(sample_rate * 3.0), dtype=np.float32) / sample_rate
+    audio = (0.05 * np.sin(2 * np.pi * 220.0 * t) + 0.01 * rng.standard_normal(t.shape[0])).astype(np.float32)
+    
+    warmup_start = time.time()
+    for _ in range(max(0, runs)):
+        segments, _ = model.transcribe(audio, language="ko", beam_size=1, best_of=1, vad_filter=False, word_timestamps=False)
+        list(segments)  # 제너레이터를 소비해야 실제 디코딩이 실행됨
+    warmup_time = time.time() - warmup_start
+    with _warm_models_lock:
+        _warm_models.setdefault(model_size, []).append(model)
+    
+    print(f"🔥 Whisper {model_size} 워밍업 완료: 로드 {load_time:.2f}초, 추론 {warmup_time:.2f}초 ({runs}회)")
+    return {'load_time': round(load_time, 3), 'warmup_time': round(warmup_time, 3)}
+
+
 class StreamingSpeechRecognizer:
     """
     실시간 스트리밍 음성 인식 클래스
@@ -116,7 +197,7 @@ class StreamingSpeechRecognizer:
                  language: str = "ko",
                  buffer_duration: float = 3.0,
                  sample_rate: int = 16000,
-                 on_result: Optional[Callable[[str], None]] = None):
+                 on_result: Optional[Callable[..., None]] = None):
         """
         StreamingSpeechRecognizer 초기화
         
@@ -124,7 +205,7 @@ class StreamingSpeechRecognizer:
         @param language: 인식할 언어 코드
         @param buffer_duration: 버퍼링 시간 (초)
         @param sample_rate: 샘플링 레이트
-        @param on_result: 인식 결과 콜백 함수
+        @param on_result: 인식 결과 콜백 함수 (텍스트, 타임스탬프, 윈도 수신 시각, 추적 핸들)
         """
         # cuda 호환성 확인
         # check_cuda_compatibility()
@@ -149,7 +230,9 @@ class StreamingSpeechRecognizer:
             'total_processed': 0,
             'total_processing_time': 0.0,
             'last_result': '',
-            'buffer_overflow_count': 0
+            'buffer_overflow_count': 0,
+            'transcribe_time': 0.0,  # 빈 결과를 포함한 전체 인식 시간 (실시간 계수 계산용)
+            'audio_seconds': 0.0
         }
 
         # Whisper 모델 초기화
@@ -164,16 +247,9 @@ class StreamingSpeechRecognizer:
         """
         try:
 
-            # CPU 사용
-            self.model = WhisperModel(
-                self.model_size,
-                device="cpu",
-                # device="cuda",
-                compute_type="int8",  # CPU 최적화
-                cpu_threads=4,
-                download_root="./models"
-            )                
-            print(f"✅ Whisper {self.model_size} 모델 로딩 완료!")
+            # CPU 사용 (워밍업을 마친 인스턴스가 있으면 재사용)
+            self.model, warmed = acquire_whisper_model(self.model_size)
+            print(f"✅ Whisper {self.model_size} 모델 {'워밍업 인스턴스 인계' if warmed else '로딩'} 완료!")
             
             
             # 실제 사용 중인 디바이스 확인
@@ -297,8 +373,11 @@ class StreamingSpeechRecognizer:
         @param audio_data: 처리할 오디오 데이터 (3초)
         """
         start_time = time.time()
+        cpu_start = time.thread_time()
         audio_np = audio_data['audio_data']
         timestamp = audio_data.get('timestamp')
+        trace = audio_data.get('trace', NULL_TRACE)
+        transcribe_start = trace.span('stt.queue_wait', audio_data.get('trace_enqueued', 0.0))
         
         try:
             print(f"🎤 Whisper 처리 시작: {len(audio_np)} 샘플, 데이터 타입: {audio_np.dtype}")
@@ -323,8 +402,13 @@ class StreamingSpeechRecognizer:
             # print(f"🔍 Whisper 세그먼트 수: {len(segments_list)}")
             
             text_result = " ".join(segment.text.strip() for segment in segments_list)
+            trace.span('stt.transcribe', transcribe_start)
             
             processing_time = time.time() - start_time
+            self.stats['transcribe_time'] += processing_time
+            self.stats['audio_seconds'] += len(audio_np) / self.sample_rate
+            STT_CHUNK_SECONDS.observe(processing_time)
+            _STT_CPU.inc(time.thread_time() - cpu_start)
             
             print(f"⏱️ Whisper 처리 시간: {processing_time:.2f}초")
             print(f"📝 인식된 텍스트: '{text_result}'")
@@ -339,7 +423,7 @@ class StreamingSpeechRecognizer:
                 
                 # 콜백 호출
                 if self.on_result:
-                    self.on_result(text_result, timestamp)
+                    self.on_result(text_result, timestamp, audio_data.get('ingest_time'), trace)
 
             else:
                 print(f"🔇 음성 없음 또는 빈 결과 ({processing_time:.2f}s)")
@@ -380,6 +464,8 @@ class StreamingSpeechRecognizer:
             stats['avg_processing_time'] = (
                 stats['total_processing_time'] / stats['total_processed']
             )
+        if stats['audio_seconds'] > 0:
+            stats['real_time_factor'] = stats['transcribe_time'] / stats['audio_seconds']
         return stats
     
     def reset_stats(self):
@@ -390,5 +476,7 @@ class StreamingSpeechRecognizer:
             'total_processed': 0,
             'total_processing_time': 0.0,
             'last_result': '',
-            'buffer_overflow_count': 0
+            'buffer_overflow_count': 0,
+            'transcribe_time': 0.0,
+            'audio_seconds': 0.0
         }
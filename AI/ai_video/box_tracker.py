@@ -0,0 +1,181 @@
+"""
+박스 전파 모듈
+@module box_tracker
+@author joon hyeok
+@date 2025-08-22
+@description 감지 사이의 스킵 프레임에서 모션용 저해상도 그레이 프레임에 희소 광학 흐름을 적용해 감지 박스를 이동/만료시킵니다.
+"""
+
+from dataclasses import dataclass, replace
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from .object_detector import DetectionResult
+
+
+@dataclass
+class TrackedBox:
+    """전파 중인 감지 박스"""
+    detection: DetectionResult
+    box: np.ndarray  # 원본 좌표계 float [x1, y1, x2, y2]
+    age: int = 0  # 마지막 감지 이후 이동/추적 실패한 프레임 수
+    lost: int = 0  # 연속으로 흐름 추적에 실패한 프레임 수
+
+
+class BoxTracker:
+    """
+    광학 흐름 기반 박스 전파기
+
+    YOLO 감지 결과를 기준으로 삼고, 감지를 건너뛴 프레임마다 박스 내부 특징점의
+    Lucas-Kanade 흐름 중앙값만큼 박스를 이동시킵니다. 이동한 프레임이 쌓일수록 박스를 조금씩
+    키워 위치 불확실성을 덮고, max_age를 넘기거나 추적을 연속으로 놓치면 만료합니다.
+    정지한 박스는 다음 감지까지 그대로 유지됩니다.
+    """
+
+    def __init__(self, max_age: int = 15, max_lost: int = 3, growth_per_frame: float = 0.02):
+        """
+        BoxTracker 초기화
+
+        @param {int} max_age - 감지 없이 이동시킬 최대 프레임 수
+        @param {int} max_lost - 흐름 추적 실패를 허용할 연속 프레임 수
+        @param {float} growth_per_frame - 전파 프레임당 박스 확장 비율
+        """
+        self.max_age = max_age
+        self.max_lost = max_lost
+        self.growth_per_frame = growth_per_frame
+        self.min_points = 3
+        self.static_shift = 0.5  # 이 거리(원본 픽셀) 미만의 흐름은 정지로 간주
+        self._lk_params = dict(
+            winSize=(9, 9),
+            maxLevel=1,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03),
+        )
+        self._boxes: List[TrackedBox] = []
+        self._prev_gray: Optional[np.ndarray] = None
+        self.last_max_shift = 0.0  # 직전 전파에서 가장 크게 움직인 거리(원본 픽셀)
+
+        self.stats = {
+            'frames_propagated': 0,
+            'boxes_expired': 0,
+        }
+
+    def reset(self, detections: List[DetectionResult], gray_small: Optional[np.ndarray]) -> None:
+        """
+        새 감지 결과로 추적 상태를 교체합니다.
+
+        @param {List[DetectionResult]} detections - 최신 감지 결과 (원본 좌표계)
+        @param {np.ndarray} gray_small - 같은 프레임의 저해상도 그레이 이미지
+        """
+        self._boxes = [
+            TrackedBox(detection=d, box=np.array(d.bbox, dtype=np.float32))
+            for d in detections
+        ]
+        self._prev_gray = gray_small
+        self.last_max_shift = 0.0
+
+    def clear(self) -> None:
+        """추적 중인 박스를 모두 제거합니다."""
+        self._boxes = []
+        self._prev_gray = None
+        self.last_max_shift = 0.0
+
+    def propagate(self, gray_small: Optional[np.ndarray], frame_shape: Tuple[int, ...]) -> List[DetectionResult]:
+        """
+        스킵 프레임에서 박스를 이동시키고 만료된 박스를 제거합니다.
+
+        @param {np.ndarray} gray_small - 현재 프레임의 저해상도 그레이 이미지
+        @param {tuple} frame_shape - 원본 프레임 shape (h, w, ...)
+        @returns {List[DetectionResult]} 전파된 감지 결과
+        """
+        self.last_max_shift = 0.0
+        if not self._boxes:
+            self._prev_gray = gray_small
+            return []
+
+        height, width = frame_shape[:2]
+        can_flow = (
+            gray_small is not None
+            and self._prev_gray is not None
+            and self._prev_gray.shape == gray_small.shape
+        )
+        scale = None
+        if can_flow:
+            small_h, small_w = gray_small.shape[:2]
+            scale = np.array([width / small_w, height / small_h], dtype=np.float32)
+
+        survivors: List[TrackedBox] = []
+        for tracked in self._boxes:
+            shift = self._flow_shift(tracked.box, gray_small, scale) if can_flow else None
+            if shift is None:
+                tracked.age += 1
+                tracked.lost += 1
+            else:
+                tracked.lost = 0
+                distance = float(np.hypot(shift[0], shift[1]))
+                if distance >= self.static_shift:
+                    # 정지한 박스는 다음 감지까지 유지하고, 움직인 박스만 나이를 먹음
+                    tracked.age += 1
+                    tracked.box[[0, 2]] += shift[0]
+                    tracked.box[[1, 3]] += shift[1]
+                self.last_max_shift = max(self.last_max_shift, distance)
+
+            if tracked.age > self.max_age or tracked.lost > self.max_lost:
+                self.stats['boxes_expired'] += 1
+                continue
+            survivors.append(tracked)
+
+        self._boxes = survivors
+        self._prev_gray = gray_small
+        self.stats['frames_propagated'] += 1
+        return [self._to_detection(t, width, height) for t in survivors]
+
+    def _flow_shift(self, box: np.ndarray, gray_small: np.ndarray, scale: np.ndarray) -> Optional[np.ndarray]:
+        """박스 내부 특징점의 흐름 중앙값(원본 좌표계 dx, dy)을 계산합니다. 실패 시 None."""
+        small_h, small_w = gray_small.shape[:2]
+        sx1 = int(np.clip(box[0] / scale[0], 0, small_w - 1))
+        sy1 = int(np.clip(box[1] / scale[1], 0, small_h - 1))
+        sx2 = int(np.clip(np.ceil(box[2] / scale[0]), sx1 + 1, small_w))
+        sy2 = int(np.clip(np.ceil(box[3] / scale[1]), sy1 + 1, small_h))
+
+        mask = np.zeros_like(self._prev_gray)
+        mask[sy1:sy2, sx1:sx2] = 255
+        points = cv2.goodFeaturesToTrack(self._prev_gray, maxCorners=12, qualityLevel=0.01, minDistance=2, mask=mask)
+        if points is None or len(points) < self.min_points:
+            # 질감이 적은 박스는 격자점으로 대체
+            xs = np.linspace(sx1, sx2 - 1, 3, dtype=np.float32)
+            ys = np.linspace(sy1, sy2 - 1, 3, dtype=np.float32)
+            points = np.array([[[x, y]] for y in ys for x in xs], dtype=np.float32)
+
+        next_points, status, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray_small, points, None, **self._lk_params)
+        if next_points is None:
+            return None
+        good = status.reshape(-1) == 1
+        if int(np.count_nonzero(good)) < self.min_points:
+            return None
+
+        delta = (next_points[good] - points[good]).reshape(-1, 2)
+        return np.median(delta, axis=0) * scale
+
+    def _to_detection(self, tracked: TrackedBox, width: int, height: int) -> DetectionResult:
+        """전파된 박스를 확장/클램프해 DetectionResult로 변환합니다."""
+        x1, y1, x2, y2 = tracked.box
+        grow = self.growth_per_frame * tracked.age
+        pad_x = (x2 - x1) * grow / 2.0
+        pad_y = (y2 - y1) * grow / 2.0
+        bx1 = int(max(0, x1 - pad_x))
+        by1 = int(max(0, y1 - pad_y))
+        bx2 = int(min(width, x2 + pad_x))
+        by2 = int(min(height, y2 + pad_y))
+        return replace(
+            tracked.detection,
+            bbox=(bx1, by1, bx2, by2),
+            center=((bx1 + bx2) // 2, (by1 + by2) // 2),
+        )
+
+    def get_stats(self) -> dict:
+        """전파 통계를 반환합니다."""
+        stats = self.stats.copy()
+        stats['active_boxes'] = len(self._boxes)
+        return stats
@@ -0,0 +1,132 @@
+"""
+감지 결과 캐시 모듈
+@module detection_cache
+@author joon hyeok
+@date 2025-08-25
+@description 다운스케일 프레임의 지각 해시(dHash)를 키로 감지 결과를 재사용하는 LRU 캐시입니다.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import replace
+from time import time
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+from config import config
+from .object_detector import DetectionResult
+
+
+def perceptual_hash(gray_small: np.ndarray) -> int:
+    """
+    그레이스케일 썸네일의 64비트 차분 해시(dHash)를 계산합니다.
+
+    @param {np.ndarray} gray_small - 모션 단계의 저해상도 그레이 이미지
+    @returns {int} 64비트 해시
+    """
+    tiny = cv2.resize(gray_small, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (tiny[:, 1:] > tiny[:, :-1]).flatten()
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+class DetectionCache:
+    """
+    지각 해시 기반 감지 결과 LRU 캐시
+
+    해밍 거리가 max_distance 이하인 해시를 같은 장면으로 보고 저장된 감지 결과를 반환합니다.
+    원본 해상도가 다르면 좌표계가 달라지므로 매칭하지 않으며, ttl이 지난 항목은 다시 감지합니다.
+    scope가 다른 항목끼리는 매칭하지 않으므로, 공유 캐시는 같은 원본을 보는 세션끼리만 결과를 나눕니다.
+    """
+
+    def __init__(self, max_entries: int = 64, max_distance: int = 2, ttl: float = 30.0):
+        """
+        DetectionCache 초기화
+
+        @param {int} max_entries - 최대 항목 수
+        @param {int} max_distance - 같은 장면으로 볼 최대 해밍 거리
+        @param {float} ttl - 항목 유효 시간(초)
+        """
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[Optional[str], int, Tuple[int, int]], Tuple[float, List[DetectionResult]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+        }
+
+    def lookup(self, frame_hash: int, frame_shape: Tuple[int, ...], scope: Optional[str] = None) -> Optional[List[DetectionResult]]:
+        """
+        같은 장면의 감지 결과를 찾습니다.
+
+        @param {int} frame_hash - 프레임 지각 해시
+        @param {tuple} frame_shape - 원본 프레임 shape
+        @param {str} scope - 결과를 공유할 범위 (같은 scope로 저장된 항목만 매칭)
+        @returns {List[DetectionResult]|None} 저장된 감지 결과 복사본 (없으면 None)
+        """
+        size = tuple(frame_shape[:2])
+        now = time()
+        with self._lock:
+            for key in reversed(self._entries):
+                cached_scope, cached_hash, cached_size = key
+                if (cached_scope != scope or cached_size != size
+                        or bin(cached_hash ^ frame_hash).count('1') > self.max_distance):
+                    continue
+                stored_at, detections = self._entries[key]
+                if now - stored_at > self.ttl:
+                    del self._entries[key]
+                    break
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                return [replace(d) for d in detections]
+            self.stats['misses'] += 1
+            return None
+
+    def store(self, frame_hash: int, frame_shape: Tuple[int, ...], detections: List[DetectionResult],
+              scope: Optional[str] = None) -> None:
+        """
+        감지 결과를 저장합니다. 용량을 넘으면 가장 오래 사용하지 않은 항목을 제거합니다.
+
+        @param {int} frame_hash - 프레임 지각 해시
+        @param {tuple} frame_shape - 원본 프레임 shape
+        @param {List[DetectionResult]} detections - 필터 적용 전 감지 결과
+        @param {str} scope - 결과를 공유할 범위
+        """
+        key = (scope, frame_hash, tuple(frame_shape[:2]))
+        with self._lock:
+            self._entries[key] = (time(), [replace(d) for d in detections])
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """모든 항목을 제거합니다."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> dict:
+        """
+        적중/미스 통계를 반환합니다.
+
+        @returns {dict} 적중 수, 미스 수, 적중률, 항목 수
+        """
+        with self._lock:
+            stats = self.stats.copy()
+            stats['entries'] = len(self._entries)
+        total = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / total if total else 0.0
+        return stats
+
+
+# 세션 간 공유 캐시 (BE가 같은 cacheScope를 지정한 세션끼리만 감지 결과 공유)
+shared_detection_cache = DetectionCache(
+    max_entries=config.VIDEO_DETECTION_CACHE_SIZE * 4,
+    max_distance=config.VIDEO_DETECTION_CACHE_MAX_DISTANCE,
+    ttl=config.VIDEO_DETECTION_CACHE_TTL,
+)
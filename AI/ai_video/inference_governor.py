@@ -0,0 +1,252 @@
+"""
+추론 거버너 모듈
+@module inference_governor
+@author joon hyeok
+@date 2025-08-23
+@description 노드 전체의 추론 대기 시간과 CPU 사용률을 측정해 세션별 감지 예산(초당 감지 수)을 나눠 주는 거버너입니다.
+"""
+
+import math
+import os
+import threading
+from contextlib import contextmanager
+from time import time
+from typing import Dict, Optional
+
+from config import config
+from .inference_scheduler import inference_scheduler
+from server.metrics import INFERENCE_QUEUE_WAIT_SECONDS
+
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+
+class _SessionDemand:
+    """거버너가 보는 세션별 수요 상태"""
+
+    def __init__(self, session_id: Optional[str]):
+        self.session_id = session_id
+        self.priority = 1.0
+        self.motion_ema = 0.0
+        self.frames = 0  # 이번 재분배 구간에 처리한 프레임 수
+        self.fps = 0.0
+        self.budget = 0.0  # 할당된 초당 감지 수
+        self.min_stride = 1  # 할당 예산에서 유도한 최소 감지 간격(프레임)
+
+
+class InferenceGovernor:
+    """
+    노드 단위 추론 거버너
+
+    모든 세션의 감지 호출을 추론 스케줄러의 슬롯으로 통과시키며 슬롯 대기 시간과
+    추론 시간을 측정합니다. 재분배 주기마다 대기 시간/CPU 사용률로 노드 전체 예산을
+    늘리거나 줄이고, 모션과 우선순위 가중치로 세션별로 나눈 뒤 최소 감지 간격으로 환산합니다.
+    """
+
+    def __init__(self):
+        self.concurrency = inference_scheduler.concurrency
+        self.target_wait = config.VIDEO_GOVERNOR_TARGET_WAIT
+        self.target_cpu = config.VIDEO_GOVERNOR_TARGET_CPU
+        self.rebalance_interval = 1.0
+        self.max_stride = 30
+
+        self._lock = threading.Lock()
+        self._sessions: Dict[int, _SessionDemand] = {}
+        self._last_rebalance = time()
+
+        # 재분배 구간 측정값
+        self._window_wait = 0.0
+        self._window_service = 0.0
+        self._window_detections = 0
+
+        self._service_ema = 0.0
+        self._wait_ema = 0.0
+        self._cpu_util = 0.0
+        self.budget = 0.0  # 노드 전체 초당 감지 예산 (0이면 첫 측정 전)
+
+        if PSUTIL_AVAILABLE:
+            psutil.cpu_percent(percpu=True)  # 첫 호출은 기준점 설정용
+        else:
+            print("⚠️ psutil 미설치 → 추론 거버너 CPU 사용률을 load average로 추정합니다 (pip install psutil 권장)")
+
+    def register(self, key: int, session_id: Optional[str] = None) -> None:
+        """
+        세션(VideoProcessor)을 등록합니다.
+
+        @param {int} key - 프로세서 식별 키
+        @param {str} session_id - 세션 ID (나중에 set_session으로 갱신 가능)
+        """
+        with self._lock:
+            self._sessions[key] = _SessionDemand(session_id)
+        inference_scheduler.register(key, session_id)
+
+    def unregister(self, key: int) -> None:
+        """세션 등록을 해제합니다."""
+        with self._lock:
+            self._sessions.pop(key, None)
+        inference_scheduler.unregister(key)
+
+    def set_session(self, key: int, session_id: Optional[str], tier: Optional[str] = None) -> None:
+        """
+        세션 ID와 우선순위 티어를 갱신합니다. 티어 가중치는 예산 분배에도 사용됩니다.
+
+        @param {int} key - 프로세서 식별 키
+        @param {str} session_id - 세션 ID
+        @param {str} tier - 우선순위 티어 이름 (None이면 유지)
+        @returns {float} 적용된 티어 가중치
+        """
+        weight = inference_scheduler.set_session(key, session_id, tier)
+        with self._lock:
+            demand = self._sessions.get(key)
+            if demand is not None:
+                demand.session_id = session_id
+                demand.priority = weight
+        return weight
+
+    def report_frame(self, key: int, motion_ratio: float) -> None:
+        """
+        워커가 프레임 하나를 처리할 때마다 호출합니다. 필요하면 예산을 재분배합니다.
+
+        @param {int} key - 프로세서 식별 키
+        @param {float} motion_ratio - 이 프레임의 모션 비율
+        """
+        with self._lock:
+            demand = self._sessions.get(key)
+            if demand is not None:
+                demand.frames += 1
+                demand.motion_ema = 0.3 * motion_ratio + 0.7 * demand.motion_ema
+            if time() - self._last_rebalance >= self.rebalance_interval:
+                self._rebalance()
+
+    def min_stride(self, key: int) -> int:
+        """
+        세션에 할당된 최소 감지 간격을 반환합니다.
+
+        @param {int} key - 프로세서 식별 키
+        @returns {int} 최소 감지 간격(프레임)
+        """
+        demand = self._sessions.get(key)
+        return demand.min_stride if demand is not None else 1
+
+    def admit(self, key: int) -> bool:
+        """
+        세션 티어의 초당 감지 상한 안에 있는지 확인합니다. (상한 초과 시 대기하지 않고 False)
+
+        @param {int} key - 프로세서 식별 키
+        @returns {bool} 이번 프레임에 감지를 실행해도 되는지 여부
+        """
+        return inference_scheduler.try_acquire(key)
+
+    @contextmanager
+    def slot(self, key: int):
+        """
+        추론 슬롯을 점유하는 컨텍스트 매니저. 슬롯 대기 시간과 추론 시간을 기록합니다.
+        슬롯 배분 순서는 추론 스케줄러(가중 공정 큐잉)가 결정합니다.
+
+        @param {int} key - 프로세서 식별 키
+        """
+        enqueued = time()
+        with inference_scheduler.slot(key):
+            started = time()
+            try:
+                yield
+            finally:
+                finished = time()
+                INFERENCE_QUEUE_WAIT_SECONDS.observe(started - enqueued)
+                with self._lock:
+                    self._window_wait += started - enqueued
+                    self._window_service += finished - started
+                    self._window_detections += 1
+
+    def _read_cpu_util(self) -> float:
+        """코어별 사용률 평균(0~1)을 반환합니다. psutil이 없으면 load average로 추정합니다."""
+        if PSUTIL_AVAILABLE:
+            per_core = psutil.cpu_percent(percpu=True)
+            if per_core:
+                return sum(per_core) / (100.0 * len(per_core))
+        try:
+            return os.getloadavg()[0] / max(1, os.cpu_count() or 1)
+        except (AttributeError, OSError):
+            return 0.0
+
+    def _rebalance(self) -> None:
+        """노드 예산을 조정하고 세션별로 분배합니다. (self._lock 보유 상태에서 호출)"""
+        now = time()
+        elapsed = max(now - self._last_rebalance, 1e-6)
+        self._last_rebalance = now
+
+        if self._window_detections:
+            avg_wait = self._window_wait / self._window_detections
+            avg_service = self._window_service / self._window_detections
+            self._wait_ema = 0.5 * avg_wait + 0.5 * self._wait_ema
+            self._service_ema = avg_service if self._service_ema == 0.0 else 0.5 * avg_service + 0.5 * self._service_ema
+        self._window_wait = 0.0
+        self._window_service = 0.0
+        self._window_detections = 0
+        self._cpu_util = self._read_cpu_util()
+
+        for demand in self._sessions.values():
+            demand.fps = demand.frames / elapsed
+            demand.frames = 0
+
+        if self._service_ema <= 0.0:
+            return  # 아직 추론 측정값 없음
+
+        # 노드 용량: 슬롯 수 / 평균 추론 시간
+        capacity = self.concurrency / self._service_ema
+        if self.budget <= 0.0:
+            self.budget = capacity
+
+        # 과부하면 곱셈 감소, 여유가 있으면 천천히 증가 (AIMD 유사)
+        overloaded = self._wait_ema > self.target_wait or self._cpu_util > self.target_cpu
+        if overloaded:
+            self.budget *= 0.8
+        elif self._wait_ema < self.target_wait / 2 and self._cpu_util < self.target_cpu * 0.8:
+            self.budget *= 1.1
+        self.budget = max(1.0, min(self.budget, capacity))
+
+        # 모션 × 우선순위 가중치로 분배 (정지 세션도 안전 주기용 최소 가중치 유지)
+        weights = {
+            key: demand.priority * (0.2 + min(1.0, demand.motion_ema / 0.05))
+            for key, demand in self._sessions.items()
+        }
+        total_weight = sum(weights.values()) or 1.0
+        for key, demand in self._sessions.items():
+            demand.budget = self.budget * weights[key] / total_weight
+            if demand.fps <= 0.0 or demand.budget <= 0.0:
+                demand.min_stride = 1
+                continue
+            demand.min_stride = int(min(self.max_stride, max(1, math.ceil(demand.fps / demand.budget))))
+
+    def get_stats(self) -> dict:
+        """
+        거버너 상태를 반환합니다.
+
+        @returns {dict} 노드 예산, 대기/추론 시간, 세션별 할당
+        """
+        with self._lock:
+            return {
+                'concurrency': self.concurrency,
+                'budget_per_sec': round(self.budget, 2),
+                'avg_wait_ms': round(self._wait_ema * 1000, 2),
+                'avg_service_ms': round(self._service_ema * 1000, 2),
+                'cpu_util': round(self._cpu_util, 3),
+                'cpu_source': 'psutil' if PSUTIL_AVAILABLE else 'loadavg',
+                'sessions': {
+                    str(demand.session_id or key): {
+                        'priority': demand.priority,
+                        'motion_ema': round(demand.motion_ema, 4),
+                        'fps': round(demand.fps, 2),
+                        'budget_per_sec': round(demand.budget, 2),
+                        'min_stride': demand.min_stride,
+                    }
+                    for key, demand in self._sessions.items()
+                },
+            }
+
+
+# 전역 인스턴스 생성
+inference_governor = InferenceGovernor()
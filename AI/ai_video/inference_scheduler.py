@@ -0,0 +1,234 @@
+"""
+추론 스케줄러 모듈
+@module inference_scheduler
+@author joon hyeok
+@date 2025-08-24
+@description YOLODetector 앞단에서 세션별 가중 공정 큐잉, 우선순위 티어, 토큰 버킷 상한으로 추론 슬롯을 배분합니다.
+"""
+
+import heapq
+import itertools
+import os
+import threading
+from contextlib import contextmanager
+from time import time
+from typing import Dict, Hashable, Optional
+
+from config import config
+
+DEFAULT_TIER = 'free'
+
+
+def _parse_tiers(spec: str) -> Dict[str, dict]:
+    """
+    "이름:가중치:초당상한,..." 형식의 티어 설정을 파싱합니다. 상한 0은 무제한입니다.
+
+    @param {str} spec - 티어 설정 문자열 (예: "paid:4:30,free:1:10")
+    @returns {dict} 티어별 {'weight', 'rate'}
+    """
+    tiers = {}
+    for item in (spec or '').split(','):
+        parts = [p.strip() for p in item.split(':')]
+        if len(parts) != 3 or not parts[0]:
+            continue
+        try:
+            tiers[parts[0]] = {'weight': max(0.1, float(parts[1])), 'rate': max(0.0, float(parts[2]))}
+        except ValueError:
+            print(f"⚠️ 잘못된 우선순위 티어 설정 무시: {item}")
+    tiers.setdefault(DEFAULT_TIER, {'weight': 1.0, 'rate': 0.0})
+    return tiers
+
+
+class _Flow:
+    """세션별 큐잉 상태와 통계"""
+
+    def __init__(self, tier: str, weight: float, rate: float):
+        self.session_id: Optional[str] = None
+        self.tier = tier
+        self.weight = weight
+        self.rate = rate  # 초당 추론 상한 (0이면 무제한)
+        self.burst = max(1.0, rate)  # 토큰 버킷 용량 (1초 분량)
+        self.tokens = self.burst
+        self.last_refill = time()
+        self.last_start_tag = 0.0  # 직전 요청의 가상 시작 태그
+        self.cost = 0.05  # 추론 시간 EMA(초): 해상도가 큰 세션일수록 태그가 빨리 증가
+
+        self.requests = 0
+        self.throttled = 0  # 상한 초과로 건너뛴 감지 수
+        self.wait_time = 0.0
+        self.service_time = 0.0
+
+    def refill(self, now: float) -> None:
+        if self.rate <= 0.0:
+            return
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+
+class InferenceScheduler:
+    """
+    가중 공정 큐잉 추론 스케줄러 (시작 시간 공정 큐잉)
+
+    각 요청은 max(가상 시간, 같은 세션의 직전 종료 태그)를 시작 태그로 받고, 슬롯이 비면
+    시작 태그가 가장 작은 요청부터 실행됩니다. 세션의 태그는 추론 시간 / 티어 가중치만큼
+    증가하므로, 고해상도·고빈도 세션이 슬롯을 독점해도 다른 세션의 대기 시간은 늘지 않습니다.
+    티어별 토큰 버킷은 세션의 초당 추론 횟수 상한을 강제하며, 버킷이 비면 워커를 재우지 않고
+    try_acquire()가 False를 반환해 그 프레임의 감지를 건너뛰게 합니다. (블러/출력은 계속 진행)
+    """
+
+    def __init__(self):
+        self.concurrency = max(1, config.VIDEO_INFERENCE_CONCURRENCY or (os.cpu_count() or 2) // 2)
+        self.tiers = _parse_tiers(config.VIDEO_PRIORITY_TIERS)
+
+        self._cond = threading.Condition()
+        self._free_slots = self.concurrency
+        self._queue = []  # (start_tag, seq, key)
+        self._seq = itertools.count()
+        self._virtual_time = 0.0
+        self._flows: Dict[Hashable, _Flow] = {}
+
+    def set_concurrency(self, concurrency: int) -> None:
+        """
+        동시 추론 슬롯 수를 변경합니다. (슈퍼바이저 워커가 코어 몫에 맞게 조정)
+
+        @param {int} concurrency - 새 슬롯 수
+        """
+        with self._cond:
+            concurrency = max(1, concurrency)
+            self._free_slots += concurrency - self.concurrency
+            self.concurrency = concurrency
+            self._cond.notify_all()
+
+    def _new_flow(self, tier: str) -> _Flow:
+        spec = self.tiers.get(tier) or self.tiers[DEFAULT_TIER]
+        return _Flow(tier if tier in self.tiers else DEFAULT_TIER, spec['weight'], spec['rate'])
+
+    def register(self, key: Hashable, session_id: Optional[str] = None, tier: str = DEFAULT_TIER) -> None:
+        """
+        세션을 등록합니다.
+
+        @param {Hashable} key - 프로세서 식별 키
+        @param {str} session_id - 세션 ID
+        @param {str} tier - 우선순위 티어 이름
+        """
+        with self._cond:
+            flow = self._new_flow(tier)
+            flow.session_id = session_id
+            self._flows[key] = flow
+
+    def unregister(self, key: Hashable) -> None:
+        """세션 등록을 해제합니다."""
+        with self._cond:
+            self._flows.pop(key, None)
+
+    def set_session(self, key: Hashable, session_id: Optional[str], tier: Optional[str] = None) -> float:
+        """
+        세션 ID와 티어를 갱신합니다.
+
+        @param {Hashable} key - 프로세서 식별 키
+        @param {str} session_id - 세션 ID
+        @param {str} tier - 우선순위 티어 이름 (None이면 유지)
+        @returns {float} 적용된 티어 가중치
+        """
+        with self._cond:
+            flow = self._flows.get(key)
+            if flow is None:
+                flow = self._new_flow(tier or DEFAULT_TIER)
+                self._flows[key] = flow
+            elif tier is not None and tier != flow.tier:
+                spec = self.tiers.get(tier) or self.tiers[DEFAULT_TIER]
+                flow.tier = tier if tier in self.tiers else DEFAULT_TIER
+                flow.weight = spec['weight']
+                flow.rate = spec['rate']
+                flow.burst = max(1.0, flow.rate)
+                flow.tokens = min(flow.tokens, flow.burst)
+            flow.session_id = session_id
+            return flow.weight
+
+    def try_acquire(self, key: Hashable) -> bool:
+        """
+        티어 상한 토큰을 하나 가져옵니다. 버킷이 비어 있으면 기다리지 않고 False를 반환합니다.
+
+        @param {Hashable} key - 프로세서 식별 키
+        @returns {bool} 이번 프레임에 감지를 실행해도 되는지 여부
+        """
+        with self._cond:
+            flow = self._flows.get(key)
+            if flow is None or flow.rate <= 0.0:
+                return True
+            flow.refill(time())
+            if flow.tokens >= 1.0:
+                flow.tokens -= 1.0
+                return True
+            flow.throttled += 1
+            return False
+
+    @contextmanager
+    def slot(self, key: Hashable):
+        """
+        스케줄러 순서에 따라 추론 슬롯을 점유합니다. 티어 상한은 호출 전에 try_acquire()로 확인합니다.
+
+        @param {Hashable} key - 프로세서 식별 키
+        """
+        enqueued = time()
+        with self._cond:
+            flow = self._flows.get(key)
+            if flow is None:
+                flow = self._new_flow(DEFAULT_TIER)
+                self._flows[key] = flow
+
+            start_tag = max(self._virtual_time, flow.last_start_tag)
+            flow.last_start_tag = start_tag + flow.cost / flow.weight
+            entry = (start_tag, next(self._seq), key)
+            heapq.heappush(self._queue, entry)
+            while not (self._free_slots > 0 and self._queue[0] is entry):
+                self._cond.wait()
+            heapq.heappop(self._queue)
+            self._free_slots -= 1
+            self._virtual_time = max(self._virtual_time, start_tag)
+            # 대기 중인 다음 요청이 남은 슬롯을 확인하도록 깨움
+            self._cond.notify_all()
+
+        started = time()
+        try:
+            yield
+        finally:
+            finished = time()
+            with self._cond:
+                self._free_slots += 1
+                service = finished - started
+                flow.cost = 0.3 * service + 0.7 * flow.cost
+                flow.requests += 1
+                flow.wait_time += started - enqueued
+                flow.service_time += service
+                self._cond.notify_all()
+
+    def get_stats(self) -> dict:
+        """
+        세션별 대기/처리 시간 통계를 반환합니다.
+
+        @returns {dict} 슬롯 상태와 세션별 통계
+        """
+        with self._cond:
+            sessions = {}
+            for key, flow in self._flows.items():
+                count = max(1, flow.requests)
+                sessions[str(flow.session_id or key)] = {
+                    'tier': flow.tier,
+                    'weight': flow.weight,
+                    'rate_limit': flow.rate,
+                    'requests': flow.requests,
+                    'throttled': flow.throttled,
+                    'avg_wait_ms': round(flow.wait_time / count * 1000, 2),
+                    'avg_service_ms': round(flow.service_time / count * 1000, 2),
+                }
+            return {
+                'concurrency': self.concurrency,
+                'free_slots': self._free_slots,
+                'queued': len(self._queue),
+                'sessions': sessions,
+            }
+
+
+# 전역 인스턴스 생성
+inference_scheduler = InferenceScheduler()
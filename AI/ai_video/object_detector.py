@@ -6,10 +6,12 @@
 @description YOLO를 사용한 물체 감지 기능을 제공합니다.
 """
 
+import math
+import threading
 import cv2
 import numpy as np
 from typing import List, Dict, Tuple, Optional, Callable
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from time import time
 import logging
 
@@ -32,6 +34,24 @@ class DetectionResult:
     track_id: Optional[int] = None  # ByteTrack 추적 ID
 
 
+def letterbox(image: np.ndarray, size: int) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """
+    종횡비를 유지하며 정사각형 입력 크기로 리사이즈하고 남는 영역을 패딩합니다.
+    
+    @param {np.ndarray} image - BGR 형식의 이미지
+    @param {int} size - 출력 한 변 크기
+    @returns {tuple} (패딩된 이미지, 스케일, (pad_x, pad_y))
+    """
+    height, width = image.shape[:2]
+    scale = min(size / width, size / height)
+    new_w, new_h = int(round(width * scale)), int(round(height * scale))
+    resized = cv2.resize(image, (new_w, new_h), interpolation=cv2.INTER_LINEAR)
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+    boxed = np.full((size, size, 3), 114, dtype=np.uint8)
+    boxed[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = resized
+    return boxed, scale, (pad_x, pad_y)
+
+
 class BaseObjectDetector:
     """물체 감지기 기본 클래스"""
     
@@ -79,6 +99,9 @@ class YOLODetector(BaseObjectDetector):
         self.confidence_threshold = confidence_threshold
         self.model = None
         self.class_names = {}
+        # 영역 감지 전용 predictor (track()이 모델에 등록한 ByteTrack 콜백을 타지 않도록 분리)
+        self._region_predictor = None
+        self._region_lock = threading.Lock()
         
         # 감지 결과 콜백 함수들
         self.detection_callbacks: List[Callable[[List[DetectionResult]], None]] = []
@@ -144,37 +167,129 @@ class YOLODetector(BaseObjectDetector):
             detections = []
             
             for result in results:
-                boxes = result.boxes
-                if boxes is not None:
-                    for box in boxes:
-                        # 바운딩 박스 좌표
-                        x1, y1, x2, y2 = box.xyxy[0].cpu().numpy().astype(int)
-                        
-                        # 신뢰도와 클래스 ID
-                        confidence = float(box.conf[0].cpu().numpy())
-                        class_id = int(box.cls[0].cpu().numpy())
-                        
-                        # ByteTrack ID (track_id가 있는 경우)
-                        track_id = None
-                        if hasattr(box, 'id') and box.id is not None:
-                            track_id = int(box.id[0].cpu().numpy())
-                        
-                        # 클래스 이름
-                        class_name = self.class_names.get(class_id, f"class_{class_id}")
-                        
-                        # 중심점 계산
-                        center_x = int((x1 + x2) / 2)
-                        center_y = int((y1 + y2) / 2)
-                        
-                        detection = DetectionResult(
-                            bbox=(x1, y1, x2, y2),
-                            confidence=confidence,
-                            class_id=class_id,
-                            class_name=class_name,
-                            center=(center_x, center_y),
-                            track_id=track_id
-                        )
-                        detections.append(detection)
+                detections.extend(self._parse_result(result))
+            
+            # 통계 업데이트
+            processing_time = time() - start_time
+            self.processing_stats['total_detections'] += len(detections)
+            self.processing_stats['processing_time'] += processing_time
+            self.processing_stats['frames_processed'] += 1
+            
+            # 콜백 함수 실행
+            if detections and self.detection_callbacks:
+                for callback in self.detection_callbacks:
+                    try:
+                        callback(detections)
+                    except Exception as e:
+                        logging.error(f"감지 콜백 실행 중 오류: {e}")
+            
+            return detections
+            
+        except Exception as e:
+            logging.error(f"물체 감지 중 오류: {e}")
+            return []
+    
+    def detect_regions(self, image: np.ndarray, regions: List[Tuple[int, int, int, int]]) -> List[DetectionResult]:
+        """
+        이미지의 일부 영역(모션 영역 등)만 잘라 한 번의 배치 추론으로 감지합니다.
+        크롭 크기에 맞춰 추론 해상도를 낮추므로 전체 프레임보다 추론 픽셀이 적습니다.
+        트래커 콜백이 없는 별도 predictor로 추론하므로 전체 프레임 ByteTrack 상태는 건드리지 않고,
+        결과에는 track_id가 부여되지 않습니다.
+        
+        @param {np.ndarray} image - BGR 형식의 이미지
+        @param {List[Tuple]} regions - 감지할 영역 목록 (x1, y1, x2, y2, 원본 좌표계)
+        @returns {List[DetectionResult]} 원본 좌표계로 변환된 감지 결과 목록
+        """
+        if not self.is_initialized:
+            logging.warning("YOLO 모델이 초기화되지 않았습니다.")
+            return []
+        
+        crops = []
+        offsets = []
+        for x1, y1, x2, y2 in regions:
+            crop = image[y1:y2, x1:x2]
+            if crop.size == 0:
+                continue
+            crops.append(crop)
+            offsets.append((x1, y1))
+        if not crops:
+            return []
+        
+        start_time = time()
+        
+        try:
+            # 가장 큰 크롭에 맞춘 32배수 해상도 (최대 640)
+            max_side = max(max(crop.shape[:2]) for crop in crops)
+            imgsz = int(min(640, max(64, math.ceil(max_side / 32) * 32)))
+            with self._region_lock:
+                predictor = self._get_region_predictor()
+                predictor.args.conf = self.confidence_threshold
+                predictor.args.imgsz = imgsz
+                results = predictor(source=crops, stream=False)
+            
+            detections = []
+            for offset, result in zip(offsets, results):
+                detections.extend(self._parse_result(result, offset))
+            
+            # 통계 업데이트
+            processing_time = time() - start_time
+            self.processing_stats['total_detections'] += len(detections)
+            self.processing_stats['processing_time'] += processing_time
+            self.processing_stats['frames_processed'] += 1
+            self.processing_stats['region_batches'] = self.processing_stats.get('region_batches', 0) + 1
+            self.processing_stats['region_pixels'] = self.processing_stats.get('region_pixels', 0) + sum(c.shape[0] * c.shape[1] for c in crops)
+            
+            # 콜백 함수 실행
+            if detections and self.detection_callbacks:
+                for callback in self.detection_callbacks:
+                    try:
+                        callback(detections)
+                    except Exception as e:
+                        logging.error(f"감지 콜백 실행 중 오류: {e}")
+            
+            return detections
+            
+        except Exception as e:
+            logging.error(f"영역 감지 중 오류: {e}")
+            return []
+    
+    def _get_region_predictor(self):
+        """
+        영역 감지용 predictor를 만듭니다. 가중치는 self.model과 공유하고 콜백은 기본값만 사용합니다.
+        model.predict()는 track()이 만든 predictor와 콜백 dict를 재사용하므로 크롭 배치가
+        전체 프레임 트래커를 갱신하고 결과가 필터링/재라벨링됩니다. (self._region_lock 보유 상태에서 호출)
+        """
+        if self._region_predictor is None:
+            predictor_cls = self.model.task_map[self.model.task]['predictor']
+            args = {**self.model.overrides, 'conf': self.confidence_threshold, 'batch': 1, 'save': False,
+                    'mode': 'predict', 'verbose': False, 'device': 'cpu'}
+            predictor = predictor_cls(overrides=args)
+            predictor.setup_model(model=self.model.model, verbose=False)
+            self._region_predictor = predictor
+        return self._region_predictor
+    
+    def detect_letterboxed(self, boxed: np.ndarray, scale: float, pad: Tuple[int, int]) -> List[DetectionResult]:
+        """
+        이미 letterbox된 입력으로 감지하고 결과를 원본 좌표계로 되돌립니다.
+        캐스케이드에서 스크리너와 전처리를 공유할 때 사용합니다.
+        
+        @param {np.ndarray} boxed - letterbox()로 만든 정사각형 이미지
+        @param {float} scale - letterbox 스케일
+        @param {Tuple[int, int]} pad - letterbox 패딩 (pad_x, pad_y)
+        @returns {List[DetectionResult]} 원본 좌표계 감지 결과 목록
+        """
+        if not self.is_initialized:
+            logging.warning("YOLO 모델이 초기화되지 않았습니다.")
+            return []
+        
+        start_time = time()
+        
+        try:
+            results = self.model.track(boxed, conf=self.confidence_threshold, imgsz=boxed.shape[0], tracker="bytetrack.yaml", verbose=False, device='cpu')
+            
+            detections = []
+            for result in results:
+                detections.extend(self._parse_result(result, (-pad[0], -pad[1]), scale))
             
             # 통계 업데이트
             processing_time = time() - start_time
@@ -196,6 +311,54 @@ class YOLODetector(BaseObjectDetector):
             logging.error(f"물체 감지 중 오류: {e}")
             return []
     
+    def _parse_result(self, result, offset: Tuple[int, int] = (0, 0), scale: float = 1.0) -> List[DetectionResult]:
+        """
+        YOLO 결과 하나를 DetectionResult 목록으로 변환합니다.
+        원본 좌표 = (결과 좌표 + offset) / scale
+        
+        @param {Results} result - ultralytics 결과 객체
+        @param {Tuple[int, int]} offset - 좌표 보정값 (크롭 좌상단 또는 -letterbox 패딩)
+        @param {float} scale - 입력 스케일 (letterbox 입력일 때)
+        @returns {List[DetectionResult]} 감지 결과 목록
+        """
+        detections = []
+        boxes = result.boxes
+        if boxes is None:
+            return detections
+        
+        off_x, off_y = offset
+        for box in boxes:
+            # 바운딩 박스 좌표
+            x1, y1, x2, y2 = box.xyxy[0].cpu().numpy()
+            x1, x2 = int((x1 + off_x) / scale), int((x2 + off_x) / scale)
+            y1, y2 = int((y1 + off_y) / scale), int((y2 + off_y) / scale)
+            
+            # 신뢰도와 클래스 ID
+            confidence = float(box.conf[0].cpu().numpy())
+            class_id = int(box.cls[0].cpu().numpy())
+            
+            # ByteTrack ID (track_id가 있는 경우)
+            track_id = None
+            if hasattr(box, 'id') and box.id is not None:
+                track_id = int(box.id[0].cpu().numpy())
+            
+            # 클래스 이름
+            class_name = self.class_names.get(class_id, f"class_{class_id}")
+            
+            # 중심점 계산
+            center_x = int((x1 + x2) / 2)
+            center_y = int((y1 + y2) / 2)
+            
+            detections.append(DetectionResult(
+                bbox=(x1, y1, x2, y2),
+                confidence=confidence,
+                class_id=class_id,
+                class_name=class_name,
+                center=(center_x, center_y),
+                track_id=track_id
+            ))
+        return detections
+    
     def add_detection_callback(self, callback: Callable[[List[DetectionResult]], None]):
         """
         감지 결과 콜백 함수를 추가합니다.
@@ -230,6 +393,298 @@ class YOLODetector(BaseObjectDetector):
         return self.class_names.copy()
 
 
+@dataclass
+class HostedModel:
+    """DetectorHost에 등록된 모델"""
+    name: str
+    detector: YOLODetector
+    class_map: Optional[Dict[int, int]] = None  # 모델 클래스 ID → 전역 클래스 ID (None이면 그대로)
+    class_names: Optional[Dict[int, str]] = None  # 전역 클래스 ID → 이름 (결과 표시용)
+    cadence: int = 1  # N번 감지 호출마다 1회 실행
+
+
+class DetectorHost(BaseObjectDetector):
+    """
+    다중 모델 감지 호스트
+    
+    프레임마다 한 번만 letterbox한 입력을 등록된 모든 모델에 공유하고, 결과를 하나의
+    감지 목록으로 합칩니다. 추가 모델은 자기 순전파 비용만 더해지며, 모델별 cadence로
+    실행 빈도를 낮출 수 있습니다(건너뛴 호출에서는 직전 결과 재사용).
+    cadence 카운터와 직전 결과는 호출 스레드(세션 워커)별로 따로 유지됩니다.
+    """
+    
+    def __init__(self, primary: YOLODetector, input_size: int = 640):
+        """
+        DetectorHost 초기화
+        
+        @param {YOLODetector} primary - 기본 감지 모델 (best.pt)
+        @param {int} input_size - 공유 letterbox 크기
+        """
+        super().__init__()
+        self.primary = primary
+        self.input_size = input_size
+        self.models: List[HostedModel] = [HostedModel(name='primary', detector=primary)]
+        self.is_initialized = primary.is_initialized
+        self._local = threading.local()
+        self._in_flight = 0  # 진행 중인 감지 호출 수 (핫스왑 후 기존 호스트 퇴역 판단용)
+        self._in_flight_cond = threading.Condition()
+    
+    def __getattr__(self, name):
+        # model_path, confidence_threshold, class_names 등은 기본 모델 값을 노출
+        if name == 'primary':
+            raise AttributeError(name)
+        return getattr(self.primary, name)
+    
+    def register(self, name: str, detector: YOLODetector, class_map: Optional[Dict[int, int]] = None,
+                 class_names: Optional[Dict[int, str]] = None, cadence: int = 1) -> None:
+        """
+        추가 모델을 등록합니다. 같은 이름이 있으면 교체합니다.
+        
+        @param {str} name - 모델 이름
+        @param {YOLODetector} detector - 초기화된 감지 모델
+        @param {Dict[int, int]} class_map - 모델 클래스 ID → 전역 클래스 ID (매핑에 없는 클래스는 버림)
+        @param {Dict[int, str]} class_names - 전역 클래스 ID → 이름
+        @param {int} cadence - 실행 주기 (감지 호출 N번마다 1회)
+        """
+        hosted = HostedModel(name=name, detector=detector, class_map=class_map, class_names=class_names, cadence=max(1, cadence))
+        self.models = [m for m in self.models if m.name != name] + [hosted]
+        print(f"✅ 감지 호스트 모델 등록: {name} (주기 {hosted.cadence})")
+    
+    def unregister(self, name: str) -> None:
+        """추가 모델 등록을 해제합니다. 기본 모델은 해제할 수 없습니다."""
+        if name != 'primary':
+            self.models = [m for m in self.models if m.name != name]
+    
+    def _thread_state(self) -> Dict:
+        state = getattr(self._local, 'state', None)
+        if state is None:
+            state = {'calls': {}, 'last': {}}
+            self._local.state = state
+        return state
+    
+    def _due(self, hosted: HostedModel, state: Dict) -> bool:
+        """이번 호출에서 모델을 실행할 차례인지 확인합니다."""
+        calls = state['calls'].get(hosted.name, 0)
+        state['calls'][hosted.name] = calls + 1
+        return calls % hosted.cadence == 0
+    
+    def _map_classes(self, hosted: HostedModel, detections: List[DetectionResult]) -> List[DetectionResult]:
+        """모델 클래스 ID를 전역 클래스 ID로 변환합니다."""
+        if hosted.class_map is None:
+            return detections
+        mapped = []
+        for detection in detections:
+            global_id = hosted.class_map.get(detection.class_id)
+            if global_id is None:
+                continue
+            detection.class_id = global_id
+            if hosted.class_names and global_id in hosted.class_names:
+                detection.class_name = hosted.class_names[global_id]
+            mapped.append(detection)
+        return mapped
+    
+    def _run_models(self, run) -> List[DetectionResult]:
+        """각 모델을 주기에 맞춰 실행하고 결과를 합칩니다."""
+        with self._in_flight_cond:
+            self._in_flight += 1
+        try:
+            state = self._thread_state()
+            merged: List[DetectionResult] = []
+            for hosted in list(self.models):
+                if hosted.cadence > 1 and not self._due(hosted, state):
+                    merged.extend(replace(d) for d in state['last'].get(hosted.name, []))
+                    continue
+                detections = self._map_classes(hosted, run(hosted.detector))
+                if hosted.cadence > 1:
+                    state['last'][hosted.name] = detections
+                merged.extend(detections)
+            return merged
+        finally:
+            with self._in_flight_cond:
+                self._in_flight -= 1
+                self._in_flight_cond.notify_all()
+    
+    def wait_idle(self, timeout: float) -> bool:
+        """
+        진행 중인 감지 호출이 모두 끝날 때까지 기다립니다.
+        
+        @param {float} timeout - 최대 대기 시간(초)
+        @returns {bool} 제한 시간 안에 비었는지 여부
+        """
+        with self._in_flight_cond:
+            return self._in_flight_cond.wait_for(lambda: self._in_flight == 0, timeout)
+    
+    def detect(self, image: np.ndarray) -> List[DetectionResult]:
+        """
+        모든 모델로 감지합니다. letterbox 전처리는 한 번만 수행합니다.
+        
+        @param {np.ndarray} image - BGR 형식의 이미지
+        @returns {List[DetectionResult]} 합쳐진 감지 결과 목록
+        """
+        boxed, scale, pad = letterbox(image, self.input_size)
+        return self.detect_letterboxed(boxed, scale, pad)
+    
+    def detect_letterboxed(self, boxed: np.ndarray, scale: float, pad: Tuple[int, int]) -> List[DetectionResult]:
+        """
+        이미 letterbox된 입력으로 모든 모델을 실행합니다.
+        
+        @param {np.ndarray} boxed - letterbox()로 만든 정사각형 이미지
+        @param {float} scale - letterbox 스케일
+        @param {Tuple[int, int]} pad - letterbox 패딩
+        @returns {List[DetectionResult]} 합쳐진 감지 결과 목록
+        """
+        return self._run_models(lambda detector: detector.detect_letterboxed(boxed, scale, pad))
+    
+    def detect_regions(self, image: np.ndarray, regions: List[Tuple[int, int, int, int]]) -> List[DetectionResult]:
+        """
+        모든 모델로 모션 영역만 감지합니다.
+        
+        @param {np.ndarray} image - BGR 형식의 이미지
+        @param {List[Tuple]} regions - 감지할 영역 목록
+        @returns {List[DetectionResult]} 합쳐진 감지 결과 목록
+        """
+        return self._run_models(lambda detector: detector.detect_regions(image, regions))
+    
+    def get_stats(self) -> Dict:
+        """모델별 처리 통계를 반환합니다."""
+        return {m.name: m.detector.get_stats() for m in self.models}
+    
+    def get_supported_classes(self) -> Dict[int, str]:
+        """
+        모든 모델의 전역 클래스 목록을 반환합니다.
+        
+        @returns {Dict[int, str]} 클래스 ID와 이름 매핑
+        """
+        classes = self.primary.get_supported_classes()
+        for hosted in self.models[1:]:
+            if hosted.class_names:
+                classes.update(hosted.class_names)
+        return classes
+
+
+class CascadeDetector(BaseObjectDetector):
+    """
+    2단계 캐스케이드 감지기
+    
+    저해상도 스크리너 모델을 먼저 실행하고, 스크리너가 반응했거나 안전 주기일 때만
+    전체 YOLODetector(컨퍼머)를 실행합니다. 두 단계는 같은 letterbox 입력을 공유하며,
+    스크리너는 그 입력을 한 번 더 축소해서 사용합니다.
+    """
+    
+    def __init__(self, confirmer: BaseObjectDetector, screener: YOLODetector, screener_imgsz: int = 320, input_size: int = 640):
+        """
+        CascadeDetector 초기화
+        
+        @param {YOLODetector|DetectorHost} confirmer - 전체 감지 모델
+        @param {YOLODetector} screener - 초기화된 경량 스크리너 모델
+        @param {int} screener_imgsz - 스크리너 입력 크기
+        @param {int} input_size - 공유 letterbox 크기 (컨퍼머 입력 크기)
+        """
+        super().__init__()
+        self.confirmer = confirmer
+        self.screener = screener
+        self.screener_imgsz = screener_imgsz
+        self.input_size = input_size
+        self.is_initialized = confirmer.is_initialized and screener.is_initialized
+        
+        # 최근 프레임의 공유 전처리 결과 (같은 이미지 객체면 재사용)
+        self._prepared_image = None
+        self._prepared = None
+        self._last_screen_hit = False
+        
+        self.cascade_stats = {
+            'screener_runs': 0,
+            'screener_hits': 0,
+            'screener_time': 0.0,
+            'confirmer_runs': 0,
+            'confirmer_after_hit': 0,
+            'confirmer_confirmed': 0,
+            'safety_confirms': 0,
+        }
+    
+    def _prepare(self, image: np.ndarray) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+        """이미지를 letterbox하고 같은 프레임에 대한 재호출 시 캐시를 반환합니다."""
+        if self._prepared_image is not image:
+            self._prepared = letterbox(image, self.input_size)
+            self._prepared_image = image
+        return self._prepared
+    
+    def screen(self, image: np.ndarray) -> bool:
+        """
+        스크리너로 관심 물체가 있을 가능성을 판단합니다.
+        
+        @param {np.ndarray} image - BGR 형식의 이미지
+        @returns {bool} 스크리너 반응 여부
+        """
+        start_time = time()
+        boxed, _, _ = self._prepare(image)
+        small = cv2.resize(boxed, (self.screener_imgsz, self.screener_imgsz), interpolation=cv2.INTER_AREA)
+        try:
+            results = self.screener.model.predict(small, conf=self.screener.confidence_threshold, imgsz=self.screener_imgsz, verbose=False, device='cpu')
+            hit = any(r.boxes is not None and len(r.boxes) > 0 for r in results)
+        except Exception as e:
+            # 스크리너 오류 시 놓치지 않도록 컨퍼머로 넘김
+            logging.error(f"스크리너 실행 중 오류: {e}")
+            hit = True
+        
+        self.cascade_stats['screener_runs'] += 1
+        self.cascade_stats['screener_time'] += time() - start_time
+        if hit:
+            self.cascade_stats['screener_hits'] += 1
+        self._last_screen_hit = hit
+        return hit
+    
+    def _record_confirm(self, detections: List[DetectionResult], screened: bool) -> None:
+        self.cascade_stats['confirmer_runs'] += 1
+        if screened:
+            self.cascade_stats['confirmer_after_hit'] += 1
+            if detections:
+                self.cascade_stats['confirmer_confirmed'] += 1
+        else:
+            self.cascade_stats['safety_confirms'] += 1
+        self._last_screen_hit = False
+    
+    def detect(self, image: np.ndarray) -> List[DetectionResult]:
+        """
+        컨퍼머로 전체 프레임을 감지합니다. 스크리너와 같은 letterbox 입력을 사용합니다.
+        
+        @param {np.ndarray} image - BGR 형식의 이미지
+        @returns {List[DetectionResult]} 감지 결과 목록
+        """
+        screened = self._last_screen_hit
+        boxed, scale, pad = self._prepare(image)
+        detections = self.confirmer.detect_letterboxed(boxed, scale, pad)
+        self._record_confirm(detections, screened)
+        return detections
+    
+    def detect_regions(self, image: np.ndarray, regions: List[Tuple[int, int, int, int]]) -> List[DetectionResult]:
+        """
+        컨퍼머로 모션 영역만 감지합니다.
+        
+        @param {np.ndarray} image - BGR 형식의 이미지
+        @param {List[Tuple]} regions - 감지할 영역 목록
+        @returns {List[DetectionResult]} 감지 결과 목록
+        """
+        screened = self._last_screen_hit
+        detections = self.confirmer.detect_regions(image, regions)
+        self._record_confirm(detections, screened)
+        return detections
+    
+    def get_stats(self) -> Dict:
+        """캐스케이드 통계(스크리너 적중률, 컨퍼머 정밀도 포함)를 반환합니다."""
+        stats = self.cascade_stats.copy()
+        runs = max(1, stats['screener_runs'])
+        stats['screener_hit_rate'] = stats['screener_hits'] / runs
+        stats['avg_screener_time'] = stats['screener_time'] / runs
+        stats['confirmer_precision'] = stats['confirmer_confirmed'] / max(1, stats['confirmer_after_hit'])
+        return stats
+    
+    def reset_stats(self):
+        """통계를 초기화합니다."""
+        for key in self.cascade_stats:
+            self.cascade_stats[key] = 0.0 if isinstance(self.cascade_stats[key], float) else 0
+
+
 class DetectionFilter:
     """감지 결과 필터링 클래스"""
     
@@ -0,0 +1,231 @@
+"""
+섀도 평가 모듈
+@module shadow_evaluator
+@author joon hyeok
+@date 2025-08-26
+@description 후보 감지 모델을 감지 대상으로 선택된 프레임의 일부에서 저우선순위로 실행해 운영 모델과의 일치도와 지연을 기록합니다.
+"""
+
+import os
+import queue
+import random
+import threading
+from time import process_time, time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import config
+from .object_detector import YOLODetector, DetectionResult
+
+
+def _iou(a, b) -> float:
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    if inter == 0:
+        return 0.0
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / max(1, union)
+
+
+def match_detections(live: List[DetectionResult], candidate: List[DetectionResult],
+                     iou_threshold: float = 0.5) -> Tuple[int, int, int]:
+    """
+    같은 클래스끼리 IoU 기준으로 탐욕 매칭합니다.
+
+    @param {List[DetectionResult]} live - 운영 모델 결과
+    @param {List[DetectionResult]} candidate - 후보 모델 결과
+    @param {float} iou_threshold - 매칭 IoU 임계값
+    @returns {tuple} (일치 수, 후보만 찾은 수, 후보가 놓친 수)
+    """
+    pairs = []
+    for i, l in enumerate(live):
+        for j, c in enumerate(candidate):
+            if l.class_id == c.class_id:
+                iou = _iou(l.bbox, c.bbox)
+                if iou >= iou_threshold:
+                    pairs.append((iou, i, j))
+    pairs.sort(reverse=True)
+    used_live, used_candidate = set(), set()
+    for _, i, j in pairs:
+        if i in used_live or j in used_candidate:
+            continue
+        used_live.add(i)
+        used_candidate.add(j)
+    matched = len(used_live)
+    return matched, len(candidate) - matched, len(live) - matched
+
+
+class ShadowEvaluator:
+    """
+    후보 모델 섀도 평가기
+
+    운영 감지 경로는 offer()로 프레임을 넘기기만 하고 기다리지 않습니다. 평가는 낮은
+    OS 우선순위의 단일 워커 스레드에서 실행되며, 후보 추론 CPU 시간 / 경과 시간이
+    cpu_budget(코어 비율)을 넘지 않도록 다음 평가 시점을 미룹니다. 큐가 차거나 예산이
+    없으면 프레임을 버리므로 운영 출력에는 영향이 없습니다.
+
+    CPU 시간은 추론 구간의 프로세스 CPU 증가분으로 잽니다. torch intra-op 스레드가 쓴 CPU까지
+    잡히고(벽시계는 멀티스레드 추론을 과소평가하고 thread_time은 호출 스레드만 셈), 같은 구간의
+    운영 추론도 섞이므로 상한 추정이 되어 부하가 높을수록 평가를 더 드물게 합니다.
+    """
+
+    def __init__(self):
+        self.candidate: Optional[YOLODetector] = None
+        self.sample_rate = config.VIDEO_SHADOW_SAMPLE_RATE
+        self.cpu_budget = config.VIDEO_SHADOW_CPU_BUDGET
+        self._queue: queue.Queue = queue.Queue(maxsize=4)
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._next_allowed = 0.0
+        self._lock = threading.Lock()
+        self.stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict:
+        return {
+            'frames_offered': 0,
+            'frames_evaluated': 0,
+            'frames_dropped': 0,
+            'matched': 0,
+            'new_detections': 0,
+            'missed_detections': 0,
+            'candidate_time': 0.0,
+            'candidate_cpu_time': 0.0,
+            'live_time': 0.0,
+        }
+
+    @property
+    def active(self) -> bool:
+        return self._running and self.candidate is not None
+
+    def start(self, model_path: str, sample_rate: Optional[float] = None, cpu_budget: Optional[float] = None) -> None:
+        """
+        후보 모델을 로드하고 섀도 평가를 시작합니다. (블로킹: 모델 로드 포함)
+
+        @param {str} model_path - 후보 가중치 경로
+        @param {float} sample_rate - 감지 프레임 중 평가할 비율 (0~1)
+        @param {float} cpu_budget - 평가에 허용할 코어 비율
+        @throws {RuntimeError} 후보 모델 로드 실패 시
+        """
+        candidate = YOLODetector(model_path=model_path, confidence_threshold=config.OBJECT_DETECTION_CONFIDENCE)
+        if not candidate.initialize():
+            raise RuntimeError(f"후보 모델 로드 실패: {model_path}")
+
+        self.stop()
+        with self._lock:
+            self.candidate = candidate
+            if sample_rate is not None:
+                self.sample_rate = max(0.0, min(1.0, sample_rate))
+            if cpu_budget is not None:
+                self.cpu_budget = max(0.01, cpu_budget)
+            self.stats = self._empty_stats()
+            self._next_allowed = 0.0
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, daemon=True)
+        self._thread.start()
+        print(f"🕶️ 섀도 평가 시작: {model_path} (샘플 {self.sample_rate:.0%}, CPU 예산 {self.cpu_budget:.2f}코어)")
+
+    def stop(self) -> None:
+        """섀도 평가를 중지하고 후보 모델을 해제합니다."""
+        if not self._running:
+            return
+        self._running = False
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        self._thread = None
+        self.candidate = None
+        while not self._queue.empty():
+            self._queue.get_nowait()
+        print("🕶️ 섀도 평가 중지")
+
+    def offer(self, image: np.ndarray, live_detections: List[DetectionResult], live_time: float) -> None:
+        """
+        감지가 끝난 프레임을 평가 후보로 넘깁니다. 절대 블로킹하지 않습니다.
+
+        @param {np.ndarray} image - 감지에 사용한 원본 이미지
+        @param {List[DetectionResult]} live_detections - 운영 모델의 필터 적용 전 결과
+        @param {float} live_time - 운영 모델 추론 시간(초)
+        """
+        if not self.active or random.random() >= self.sample_rate:
+            return
+        with self._lock:
+            self.stats['frames_offered'] += 1
+            if time() < self._next_allowed:
+                self.stats['frames_dropped'] += 1
+                return
+        try:
+            self._queue.put_nowait((image.copy(), list(live_detections), live_time))
+        except queue.Full:
+            with self._lock:
+                self.stats['frames_dropped'] += 1
+
+    def _lower_priority(self) -> None:
+        """워커 스레드의 OS 우선순위를 낮춥니다. (Linux 스레드 단위, 실패 시 무시)"""
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (AttributeError, OSError):
+            pass
+
+    def _worker(self) -> None:
+        self._lower_priority()
+        while self._running:
+            item = self._queue.get()
+            if item is None or not self._running:
+                break
+            image, live, live_time = item
+            candidate = self.candidate
+            if candidate is None:
+                continue
+
+            start = time()
+            cpu_start = process_time()
+            height, width = image.shape[:2]
+            # 후보 모델 ByteTrack 상태가 필요 없으므로 전체 프레임 한 영역으로 predict 실행
+            results = candidate.detect_regions(image, [(0, 0, width, height)])
+            elapsed = time() - start
+            cpu_time = process_time() - cpu_start
+
+            # 추가 호스트 모델(노출 등) 결과는 비교 대상에서 제외
+            if candidate.class_names:
+                live = [d for d in live if d.class_id in candidate.class_names]
+            matched, new, missed = match_detections(live, results)
+            with self._lock:
+                self.stats['frames_evaluated'] += 1
+                self.stats['matched'] += matched
+                self.stats['new_detections'] += new
+                self.stats['missed_detections'] += missed
+                self.stats['candidate_time'] += elapsed
+                self.stats['candidate_cpu_time'] += cpu_time
+                self.stats['live_time'] += live_time
+                # 코어 예산: 이번 추론 CPU 시간을 예산 비율로 나눈 만큼 다음 평가를 미룸
+                self._next_allowed = time() + cpu_time / self.cpu_budget
+
+    def get_stats(self) -> Dict:
+        """
+        섀도 평가 통계를 반환합니다.
+
+        @returns {dict} 일치/신규/누락 수, 일치율, 평균 지연
+        """
+        with self._lock:
+            stats = self.stats.copy()
+        evaluated = max(1, stats['frames_evaluated'])
+        compared = stats['matched'] + stats['new_detections'] + stats['missed_detections']
+        stats['active'] = self.active
+        stats['model_path'] = self.candidate.model_path if self.candidate else None
+        stats['sample_rate'] = self.sample_rate
+        stats['cpu_budget'] = self.cpu_budget
+        stats['agreement_rate'] = stats['matched'] / compared if compared else 1.0
+        stats['avg_candidate_latency_ms'] = round(stats.pop('candidate_time') / evaluated * 1000, 2)
+        stats['avg_candidate_cpu_ms'] = round(stats.pop('candidate_cpu_time') / evaluated * 1000, 2)
+        stats['avg_live_latency_ms'] = round(stats.pop('live_time') / evaluated * 1000, 2)
+        return stats
+
+
+# 전역 인스턴스 생성
+shadow_evaluator = ShadowEvaluator()
@@ -0,0 +1,624 @@
+"""
+공유 메모리 추론 전송 모듈
+@module shm_transport
+@author joon hyeok
+@date 2025-09-01
+@description 미디어 프로세스는 디코딩한 프레임을 세션별 공유 메모리 링에 쓰기만 하고, 별도 추론 프로세스가 YOLO를 실행해 박스 목록을 같은 링에 되돌려 씁니다.
+"""
+
+import itertools
+import multiprocessing as mp
+import threading
+import zlib
+from dataclasses import replace
+from multiprocessing import resource_tracker, shared_memory
+from time import time
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from config import config
+from .object_detector import BaseObjectDetector, DetectionResult
+
+# 슬롯당 최대 박스 수와 박스 행 형식: x1, y1, x2, y2, confidence, class_id, track_id(-1이면 없음)
+MAX_BOXES = 128
+_BOX_FIELDS = 7
+
+# 링 앞부분: [슬롯 수, 프레임 용량] (int64)
+_RING_HEADER_BYTES = 64
+# 슬롯 헤더 (int64): 프레임 seq, 높이, 너비, 결과 seq, 박스 수
+_SLOT_HEADER_FIELDS = 8
+_FRAME_SEQ, _HEIGHT, _WIDTH, _RESULT_SEQ, _BOX_COUNT = range(5)
+_SLOT_HEADER_BYTES = _SLOT_HEADER_FIELDS * 8
+_BOXES_BYTES = MAX_BOXES * _BOX_FIELDS * 4
+_WRITING = -1  # 쓰는 중인 슬롯의 seq 값 (seqlock)
+
+
+class FrameRing:
+    """
+    세션별 공유 메모리 프레임 링
+
+    슬롯마다 헤더, 결과 박스 영역, BGR 프레임 영역을 둡니다. 쓰는 쪽은 seq를 -1로 바꾼 뒤
+    내용을 쓰고 마지막에 seq를 기록하며, 읽는 쪽은 복사 전후의 seq가 같을 때만 결과를 믿습니다.
+    프레임은 미디어 프로세스만, 결과는 추론 프로세스만 쓰므로 슬롯마다 쓰는 쪽은 하나입니다.
+    """
+
+    def __init__(self, name: Optional[str] = None, slots: int = 3, frame_capacity: int = 0):
+        """
+        링을 만들거나 기존 링에 연결합니다.
+
+        @param {str} name - 연결할 공유 메모리 이름 (None이면 새로 생성)
+        @param {int} slots - 슬롯 수 (생성 시)
+        @param {int} frame_capacity - 슬롯당 프레임 최대 바이트 (생성 시)
+        """
+        self.owner = name is None
+        if self.owner:
+            size = _RING_HEADER_BYTES + slots * (_SLOT_HEADER_BYTES + _BOXES_BYTES + frame_capacity)
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            meta = np.ndarray((2,), dtype=np.int64, buffer=self.shm.buf)
+            meta[:] = (slots, frame_capacity)
+            del meta
+            for slot in range(slots):
+                self._header_init(slot, slots, frame_capacity)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            # 연결한 쪽이 종료될 때 resource_tracker가 세그먼트를 지우지 않도록 소유자만 추적
+            try:
+                resource_tracker.unregister(self.shm._name, 'shared_memory')
+            except Exception:
+                pass
+        meta = np.ndarray((2,), dtype=np.int64, buffer=self.shm.buf)
+        self.slots, self.frame_capacity = int(meta[0]), int(meta[1])
+        del meta
+        self.slot_size = _SLOT_HEADER_BYTES + _BOXES_BYTES + self.frame_capacity
+        self.name = self.shm.name
+
+    def _header_init(self, slot: int, slots: int, frame_capacity: int) -> None:
+        offset = _RING_HEADER_BYTES + slot * (_SLOT_HEADER_BYTES + _BOXES_BYTES + frame_capacity)
+        header = np.ndarray((_SLOT_HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf, offset=offset)
+        header[:] = 0
+        del header
+
+    def _offset(self, slot: int) -> int:
+        return _RING_HEADER_BYTES + slot * self.slot_size
+
+    def _header(self, slot: int) -> np.ndarray:
+        return np.ndarray((_SLOT_HEADER_FIELDS,), dtype=np.int64, buffer=self.shm.buf, offset=self._offset(slot))
+
+    def _boxes(self, slot: int) -> np.ndarray:
+        return np.ndarray((MAX_BOXES, _BOX_FIELDS), dtype=np.float32, buffer=self.shm.buf,
+                          offset=self._offset(slot) + _SLOT_HEADER_BYTES)
+
+    def _frame(self, slot: int, height: int, width: int) -> np.ndarray:
+        return np.ndarray((height, width, 3), dtype=np.uint8, buffer=self.shm.buf,
+                          offset=self._offset(slot) + _SLOT_HEADER_BYTES + _BOXES_BYTES)
+
+    def fits(self, image: np.ndarray) -> bool:
+        """프레임이 슬롯 용량에 들어가는지 확인합니다."""
+        return image.nbytes <= self.frame_capacity
+
+    def write_frame(self, slot: int, seq: int, image: np.ndarray) -> None:
+        """
+        슬롯에 BGR 프레임을 씁니다. (미디어 프로세스)
+
+        @param {int} slot - 슬롯 번호
+        @param {int} seq - 요청 번호 (1부터 증가)
+        @param {np.ndarray} image - BGR 프레임
+        """
+        height, width = image.shape[:2]
+        header = self._header(slot)
+        header[_FRAME_SEQ] = _WRITING
+        header[_RESULT_SEQ] = 0
+        frame = self._frame(slot, height, width)
+        np.copyto(frame, image)
+        del frame
+        header[_HEIGHT] = height
+        header[_WIDTH] = width
+        header[_FRAME_SEQ] = seq
+        del header
+
+    def read_frame(self, slot: int, seq: int) -> Optional[np.ndarray]:
+        """
+        슬롯의 프레임을 복사해 반환합니다. 그사이 덮어써졌으면 None. (추론 프로세스)
+
+        @param {int} slot - 슬롯 번호
+        @param {int} seq - 기대하는 요청 번호
+        @returns {np.ndarray|None} 프레임 복사본
+        """
+        header = self._header(slot)
+        if header[_FRAME_SEQ] != seq:
+            return None
+        frame = self._frame(slot, int(header[_HEIGHT]), int(header[_WIDTH]))
+        image = frame.copy()
+        del frame
+        stale = header[_FRAME_SEQ] != seq
+        del header
+        return None if stale else image
+
+    def write_result(self, slot: int, seq: int, detections: List[DetectionResult]) -> bool:
+        """
+        감지 결과를 슬롯에 씁니다. 프레임이 이미 다음 요청으로 덮어써졌으면 쓰지 않습니다. (추론 프로세스)
+
+        @param {int} slot - 슬롯 번호
+        @param {int} seq - 요청 번호
+        @param {List[DetectionResult]} detections - 감지 결과 (MAX_BOXES개까지)
+        @returns {bool} 기록 여부
+        """
+        header = self._header(slot)
+        if header[_FRAME_SEQ] != seq:
+            del header
+            return False
+        boxes = self._boxes(slot)
+        count = min(len(detections), MAX_BOXES)
+        for row, detection in enumerate(detections[:count]):
+            boxes[row] = (*detection.bbox, detection.confidence, detection.class_id,
+                          -1 if detection.track_id is None else detection.track_id)
+        del boxes
+        header[_BOX_COUNT] = count
+        header[_RESULT_SEQ] = seq
+        del header
+        return True
+
+    def read_result(self, slot: int, seq: int) -> Optional[np.ndarray]:
+        """
+        슬롯의 결과 박스 행을 복사해 반환합니다. 결과가 해당 요청의 것이 아니면 None. (미디어 프로세스)
+
+        @param {int} slot - 슬롯 번호
+        @param {int} seq - 요청 번호
+        @returns {np.ndarray|None} (N, 7) float32 박스 행
+        """
+        header = self._header(slot)
+        if header[_RESULT_SEQ] != seq or header[_FRAME_SEQ] != seq:
+            del header
+            return None
+        count = int(header[_BOX_COUNT])
+        boxes = self._boxes(slot)
+        rows = boxes[:count].copy()
+        del boxes, header
+        return rows
+
+    def close(self) -> None:
+        """연결을 닫고, 소유자면 세그먼트를 삭제합니다."""
+        try:
+            self.shm.close()
+            if self.owner:
+                self.shm.unlink()
+        except (FileNotFoundError, BufferError):
+            pass
+
+
+def _inference_process_main(index: int, threads: int, request_queue, response_queue, model_path: str) -> None:
+    """
+    추론 프로세스 본체. 모델을 직접 로드하고 요청 큐의 (링 이름, 슬롯, seq)만 받아 공유 메모리에서 프레임을 읽습니다.
+
+    @param {int} index - 프로세스 번호
+    @param {int} threads - torch 스레드 수
+    @param {mp.Queue} request_queue - 이 프로세스의 요청 큐
+    @param {mp.Queue} response_queue - 미디어 프로세스로 가는 응답 큐
+    @param {str} model_path - 로드할 가중치 (재시작 시 핫스왑된 경로를 이어받음)
+    """
+    import torch
+    torch.set_num_threads(max(1, threads))
+    from ai_video import video_processor
+
+    config.YOLO_MODEL_PATH = model_path
+
+    # 스크리너는 미디어 프로세스의 프레임 단위 판단에 쓰이므로 추론 프로세스에서는 로드하지 않음
+    config.VIDEO_CASCADE_ENABLED = False
+    start = time()
+    ok = video_processor.initialize_global_yolo_model()
+    warmup = {}
+    if ok and config.MODEL_WARMUP_RUNS > 0:
+        warmup = video_processor.warmup_global_yolo_model(config.MODEL_WARMUP_RUNS)
+    host = video_processor.get_global_yolo_detector()
+    classes = host.get_supported_classes() if ok else {}
+    response_queue.put(('ready', index, ok, classes, {'load_time': round(time() - start, 3), 'warmup': warmup}))
+    if not ok:
+        return
+
+    rings: Dict[str, FrameRing] = {}
+
+    try:
+        while True:
+            message = request_queue.get()
+            op = message[0]
+            if op == 'stop':
+                break
+            if op == 'release':
+                _, session_key, ring_name = message
+                ring = rings.pop(ring_name, None)
+                if ring is not None:
+                    ring.close()
+                continue
+            if op == 'swap':
+                _, model_path, warmup_runs = message
+                try:
+                    result = video_processor.swap_global_yolo_model(model_path, warmup_runs)
+                    result['classes'] = video_processor.get_global_yolo_detector().get_supported_classes()
+                except Exception as e:
+                    result = {'error': str(e)}
+                response_queue.put(('swapped', index, result))
+                continue
+
+            _, session_key, ring_name, slot, seq, sent_at, regions = message
+            if time() - sent_at > config.VIDEO_SHM_RESULT_TIMEOUT:
+                # 미디어 쪽이 이미 포기한 요청은 건너뛰어 밀린 큐를 빨리 비움
+                response_queue.put(('expired', session_key, seq))
+                continue
+            ring = rings.get(ring_name)
+            if ring is None:
+                try:
+                    ring = rings[ring_name] = FrameRing(name=ring_name)
+                except FileNotFoundError:
+                    continue
+            image = ring.read_frame(slot, seq)
+            if image is None:
+                continue
+            # 핫스왑 후에도 최신 호스트를 쓰도록 매 요청마다 전역 호스트를 가져옴
+            detector = video_processor.get_global_yolo_detector()
+            try:
+                detections = detector.detect_regions(image, regions) if regions else detector.detect(image)
+            except Exception as e:
+                print(f"❌ 추론 프로세스 {index} 감지 오류: {e}")
+                detections = []
+            if ring.write_result(slot, seq, detections):
+                response_queue.put(('result', session_key, seq))
+    finally:
+        for ring in rings.values():
+            ring.close()
+
+
+class ShmInferencePool:
+    """
+    공유 메모리 추론 프로세스 풀 (미디어 프로세스 쪽)
+
+    추론 프로세스는 spawn으로 시작해 torch/OpenMP 상태를 물려받지 않습니다. 세션은 키의 crc32로
+    프로세스에 고정되어 추적 상태가 유지되고, 응답 큐는 디스패처 스레드 하나가 받아 대기 중인
+    세션 워커를 깨웁니다. 큐로는 작은 튜플만 오가고 프레임/박스는 공유 메모리로만 전달됩니다.
+    감시 스레드가 프로세스 생존을 확인해, 로드 중 죽으면 풀을 실패로 표시하고 서비스 중 죽으면
+    같은 번호로 다시 띄웁니다. (재시작 중 그 프로세스에 고정된 세션은 결과 대기 시간 초과로 직전 결과 사용)
+    """
+
+    def __init__(self):
+        self.processes: List[mp.Process] = []
+        self._request_queues: List = []
+        self._response_queue = None
+        self._dispatcher: Optional[threading.Thread] = None
+        self._monitor: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._threads = 1
+        self._loading: set = set()  # 모델 로드가 끝나지 않은 프로세스 번호
+        self._pending: Dict[Tuple[str, int], threading.Event] = {}
+        self._pending_lock = threading.Lock()
+        self._ready = threading.Event()
+        self._ready_count = 0
+        self._swap_results: Dict[int, dict] = {}
+        self._swap_done = threading.Condition()
+        self.class_names: Dict[int, str] = {}
+        self.load_info: Dict[int, dict] = {}
+        self.failed = False
+        self.stats = {
+            'requests': 0,
+            'results': 0,
+            'timeouts': 0,
+            'expired': 0,
+            'ring_resizes': 0,
+            'respawns': 0,
+        }
+
+    @property
+    def is_running(self) -> bool:
+        return self._ready.is_set() and not self.failed
+
+    def start(self, count: int, threads: int) -> None:
+        """
+        추론 프로세스를 시작합니다. (논블로킹, 준비 여부는 wait_ready로 확인)
+
+        @param {int} count - 추론 프로세스 수
+        @param {int} threads - 프로세스당 torch 스레드 수
+        """
+        if self.processes:
+            return
+        self._threads = threads
+        self._stopping.clear()
+        self._response_queue = mp.get_context('spawn').Queue()
+        for index in range(max(1, count)):
+            self.processes.append(None)
+            self._request_queues.append(None)
+            self._spawn(index)
+        self._dispatcher = threading.Thread(target=self._dispatch, name="shm-dispatcher", daemon=True)
+        self._dispatcher.start()
+        self._monitor = threading.Thread(target=self._watch, name="shm-monitor", daemon=True)
+        self._monitor.start()
+        print(f"🧠 공유 메모리 추론 프로세스 {len(self.processes)}개 시작 (프로세스당 {threads}스레드)")
+
+    def _spawn(self, index: int) -> None:
+        """index번 추론 프로세스를 새 요청 큐와 함께 띄웁니다. (죽은 프로세스의 큐는 잠금이 깨졌을 수 있어 버림)"""
+        ctx = mp.get_context('spawn')
+        request_queue = ctx.Queue()
+        process = ctx.Process(
+            target=_inference_process_main,
+            args=(index, self._threads, request_queue, self._response_queue, config.get_yolo_model_path()),
+            name=f"inference-{index}",
+            daemon=True,
+        )
+        self._loading.add(index)
+        process.start()
+        self._request_queues[index] = request_queue
+        self.processes[index] = process
+
+    def _watch(self) -> None:
+        """추론 프로세스 생존을 주기적으로 확인합니다."""
+        while not self._stopping.wait(config.VIDEO_SHM_HEALTH_INTERVAL):
+            for index, process in enumerate(list(self.processes)):
+                if process is None or process.is_alive() or self._stopping.is_set():
+                    continue
+                if not self._ready.is_set():
+                    # 첫 로드 중 종료(OOM, 임포트 오류 등): 'ready' 응답이 오지 않으므로 대기자를 바로 깨움
+                    print(f"❌ 추론 프로세스 {index} 로드 중 종료 (exit {process.exitcode})")
+                    self.failed = True
+                    self._ready.set()
+                    return
+                if self.stats['respawns'] >= config.VIDEO_SHM_MAX_RESPAWNS:
+                    print(f"❌ 추론 프로세스 {index} 종료 (exit {process.exitcode}), 재시작 한도 초과로 공유 메모리 추론 중단")
+                    self.failed = True
+                    return
+                self.stats['respawns'] += 1
+                print(f"⚠️ 추론 프로세스 {index} 종료 (exit {process.exitcode}), 재시작합니다")
+                self._spawn(index)
+
+    def wait_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        모든 추론 프로세스가 모델을 로드할 때까지 기다립니다. 로드 중 프로세스가 죽으면 바로 실패를 반환합니다.
+
+        @param {float} timeout - 최대 대기 시간(초)
+        @returns {bool} 제한 시간 안에 모든 프로세스가 로드에 성공했는지 여부
+        """
+        return self._ready.wait(timeout) and not self.failed
+
+    def _dispatch(self) -> None:
+        """응답 큐를 읽어 대기 중인 감지 요청을 깨웁니다."""
+        while True:
+            message = self._response_queue.get()
+            if message is None:
+                break
+            op = message[0]
+            if op in ('result', 'expired'):
+                if op == 'expired':
+                    self.stats['expired'] += 1
+                with self._pending_lock:
+                    event = self._pending.get((message[1], message[2]))
+                if event is not None:
+                    event.set()
+            elif op == 'ready':
+                _, index, ok, classes, info = message
+                self.load_info[index] = info
+                self._loading.discard(index)
+                if ok:
+                    self.class_names.update(classes)
+                else:
+                    self.failed = True
+                    print(f"❌ 추론 프로세스 {index} 모델 로드 실패")
+                if self._ready.is_set():
+                    print(f"✅ 추론 프로세스 {index} 재시작 완료")
+                    continue
+                self._ready_count += 1
+                if self._ready_count == len(self.processes):
+                    self._ready.set()
+            elif op == 'swapped':
+                with self._swap_done:
+                    self._swap_results[message[1]] = message[2]
+                    self._swap_done.notify_all()
+
+    def _worker_for(self, session_key: str) -> int:
+        return zlib.crc32(session_key.encode('utf-8')) % len(self._request_queues)
+
+    def submit(self, session_key: str, ring: FrameRing, slot: int, seq: int,
+               regions: Optional[List[Tuple[int, int, int, int]]] = None) -> threading.Event:
+        """
+        링 슬롯에 쓴 프레임의 감지를 요청합니다.
+
+        @returns {threading.Event} 결과가 준비되면 설정되는 이벤트
+        """
+        event = threading.Event()
+        with self._pending_lock:
+            self._pending[(session_key, seq)] = event
+        self.stats['requests'] += 1
+        request = ('detect', session_key, ring.name, slot, seq, time(), [tuple(r) for r in regions] if regions else None)
+        self._request_queues[self._worker_for(session_key)].put(request)
+        return event
+
+    def forget(self, session_key: str, seq: int) -> None:
+        """응답 대기 등록을 해제합니다."""
+        with self._pending_lock:
+            self._pending.pop((session_key, seq), None)
+
+    def release(self, session_key: str, ring_name: str) -> None:
+        """
+        세션이 고정된 추론 프로세스에 링 연결을 닫도록 알립니다. (세그먼트 삭제는 링 소유자인 미디어 프로세스가 함)
+
+        @param {str} session_key - 세션 키 (요청을 보낼 프로세스 선택에만 사용)
+        @param {str} ring_name - 공유 메모리 이름
+        """
+        if self._request_queues:
+            self._request_queues[self._worker_for(session_key)].put(('release', session_key, ring_name))
+
+    def swap(self, model_path: str, warmup_runs: int, timeout: float = 300.0) -> dict:
+        """
+        모든 추론 프로세스의 가중치를 교체합니다. (블로킹: executor에서 호출)
+
+        @param {str} model_path - 새 가중치 경로
+        @param {int} warmup_runs - 워밍업 감지 횟수
+        @param {float} timeout - 최대 대기 시간(초)
+        @returns {dict} 프로세스별 교체 결과
+        @throws {RuntimeError} 제한 시간 안에 모든 프로세스가 응답하지 않았거나 교체에 실패한 프로세스가 있는 경우
+        """
+        with self._swap_done:
+            self._swap_results = {}
+        for request_queue in self._request_queues:
+            request_queue.put(('swap', model_path, warmup_runs))
+        with self._swap_done:
+            done = self._swap_done.wait_for(lambda: len(self._swap_results) == len(self._request_queues), timeout)
+            results = dict(self._swap_results)
+        if not done:
+            raise RuntimeError(f"추론 프로세스 모델 교체 시간 초과 ({len(results)}/{len(self._request_queues)} 완료)")
+        errors = {index: result['error'] for index, result in results.items() if 'error' in result}
+        if errors:
+            raise RuntimeError(f"추론 프로세스 모델 교체 실패: {errors}")
+
+        # 새 모델의 클래스 이름으로 교체한 뒤 세대를 올려 세션이 캐시/추적 상태를 초기화하게 함
+        class_names: Dict[int, str] = {}
+        for result in results.values():
+            class_names.update(result.pop('classes', {}))
+        self.class_names = class_names
+        from ai_video import video_processor
+        generation = video_processor.publish_model_swap(model_path)
+        return {'model_path': model_path, 'generation': generation, 'processes': results}
+
+    def create_detector(self) -> 'RemoteDetector':
+        """세션 워커용 원격 감지기를 만듭니다."""
+        return RemoteDetector(self)
+
+    def stop(self) -> None:
+        """추론 프로세스와 디스패처를 종료합니다."""
+        self._stopping.set()
+        for request_queue in self._request_queues:
+            request_queue.put(('stop',))
+        for process in self.processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+        if self._response_queue is not None:
+            self._response_queue.put(None)
+        self.processes = []
+        self._request_queues = []
+        self._ready.clear()
+        self._loading.clear()
+
+    def get_stats(self) -> dict:
+        """
+        풀 상태를 반환합니다.
+
+        @returns {dict} 프로세스 생존 여부, 로드 정보, 요청/결과/타임아웃 수
+        """
+        return {
+            'enabled': bool(self.processes),
+            'ready': self.is_running,
+            'processes': [{'pid': p.pid, 'alive': p.is_alive(), 'loading': index in self._loading}
+                          for index, p in enumerate(self.processes)],
+            'load': dict(self.load_info),
+            'pending': len(self._pending),
+            **self.stats,
+        }
+
+
+class RemoteDetector(BaseObjectDetector):
+    """
+    추론 프로세스를 호출하는 감지기 (YOLODetector와 같은 detect/detect_regions 인터페이스)
+
+    세션 워커 스레드는 결과를 기다리는 동안 GIL을 놓고 잠들기만 하므로, 미디어 프로세스의
+    이벤트 루프(RTP 페이싱/인코딩)는 추론 부하의 영향을 받지 않습니다. 제한 시간 안에 결과가
+    오지 않으면 직전 결과를 그대로 반환해 블러가 깜빡이지 않게 합니다.
+    """
+
+    _keys = itertools.count(1)
+
+    def __init__(self, pool: ShmInferencePool):
+        super().__init__()
+        self.pool = pool
+        self.session_key = f"s{next(self._keys)}"
+        self.ring: Optional[FrameRing] = None
+        self._seq = 0
+        self._last: List[DetectionResult] = []
+        self.is_initialized = True
+        self.processing_stats.update({'timeouts': 0, 'wait_time': 0.0})
+
+    def _ensure_ring(self, image: np.ndarray) -> FrameRing:
+        """프레임이 들어가는 링을 준비합니다. 해상도가 커지면 링을 새로 만듭니다."""
+        if self.ring is not None and self.ring.fits(image):
+            return self.ring
+        if self.ring is not None:
+            self.pool.release(self.session_key, self.ring.name)
+            self.ring.close()
+            self.pool.stats['ring_resizes'] += 1
+        self.ring = FrameRing(slots=max(2, config.VIDEO_SHM_RING_SLOTS), frame_capacity=image.nbytes)
+        return self.ring
+
+    def _request(self, image: np.ndarray, regions: Optional[List[Tuple[int, int, int, int]]]) -> List[DetectionResult]:
+        image = np.ascontiguousarray(image)
+        ring = self._ensure_ring(image)
+        self._seq += 1
+        seq = self._seq
+        slot = seq % ring.slots
+        start = time()
+        ring.write_frame(slot, seq, image)
+        event = self.pool.submit(self.session_key, ring, slot, seq, regions)
+        try:
+            answered = event.wait(config.VIDEO_SHM_RESULT_TIMEOUT)
+        finally:
+            self.pool.forget(self.session_key, seq)
+        rows = ring.read_result(slot, seq) if answered else None
+
+        elapsed = time() - start
+        self.processing_stats['wait_time'] += elapsed
+        if rows is None:
+            self.processing_stats['timeouts'] += 1
+            self.pool.stats['timeouts'] += 1
+            return [replace(d) for d in self._last]
+
+        detections = [self._to_detection(row) for row in rows]
+        self.pool.stats['results'] += 1
+        self.processing_stats['frames_processed'] += 1
+        self.processing_stats['total_detections'] += len(detections)
+        self.processing_stats['processing_time'] += elapsed
+        if not regions:
+            self._last = detections
+        return detections
+
+    def _to_detection(self, row: np.ndarray) -> DetectionResult:
+        x1, y1, x2, y2 = (int(v) for v in row[:4])
+        class_id = int(row[5])
+        track_id = int(row[6])
+        return DetectionResult(
+            bbox=(x1, y1, x2, y2),
+            confidence=float(row[4]),
+            class_id=class_id,
+            class_name=self.pool.class_names.get(class_id, str(class_id)),
+            center=((x1 + x2) // 2, (y1 + y2) // 2),
+            track_id=None if track_id < 0 else track_id,
+        )
+
+    def detect(self, image: np.ndarray) -> List[DetectionResult]:
+        """
+        추론 프로세스에서 전체 프레임을 감지합니다.
+
+        @param {np.ndarray} image - BGR 형식의 이미지
+        @returns {List[DetectionResult]} 감지 결과 목록
+        """
+        return self._request(image, None)
+
+    def detect_regions(self, image: np.ndarray, regions: List[Tuple[int, int, int, int]]) -> List[DetectionResult]:
+        """
+        추론 프로세스에서 모션 영역만 감지합니다.
+
+        @param {np.ndarray} image - BGR 형식의 이미지
+        @param {List[Tuple]} regions - 감지할 영역 목록
+        @returns {List[DetectionResult]} 감지 결과 목록
+        """
+        return self._request(image, regions)
+
+    def get_supported_classes(self) -> Dict[int, str]:
+        """추론 프로세스가 보고한 클래스 목록을 반환합니다."""
+        return dict(self.pool.class_names)
+
+    def close(self) -> None:
+        """세션 링을 삭제하고 추론 프로세스의 세션 상태를 해제합니다."""
+        if self.ring is not None:
+            self.pool.release(self.session_key, self.ring.name)
+            self.ring.close()
+            self.ring = None
+        self._last = []
+
+
+# 전역 인스턴스 생성
+shm_inference_pool = ShmInferencePool()
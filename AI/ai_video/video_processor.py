@@ -7,25 +7,45 @@
 """
 
 import asyncio
+import fractions
 import numpy as np
 import cv2
 import json
 import threading
 import queue
-from time import time
+import gc
+import math
+from time import time, thread_time
 from datetime import datetime
-from typing import List, Dict, Optional, Callable
+from typing import List, Dict, Optional, Callable, Tuple
 from aiortc import MediaStreamTrack
+from aiortc.mediastreams import MediaStreamError
 from av import VideoFrame
 
 from .object_detector import (
     YOLODetector,
+    DetectorHost,
+    CascadeDetector,
     DetectionFilter,
     DetectionVisualizer,
     DetectionResult
 )
+from .box_tracker import BoxTracker
+from .inference_governor import inference_governor
+from .detection_cache import DetectionCache, perceptual_hash, shared_detection_cache
+from .shadow_evaluator import shadow_evaluator
+from .shm_transport import RemoteDetector, shm_inference_pool
 from config import config
 from session_state_manager import session_state_manager
+from server.metrics import STAGE_CPU_SECONDS, VIDEO_DETECTION_SECONDS
+from server.alert_latency import alert_latency, ALERT_VIDEO
+from server.tracing import frame_tracer, NULL_TRACE
+from webrtc.passthrough import is_h264_keyframe
+
+# 핫 패스 메트릭 (라벨 조회를 프레임마다 하지 않도록 미리 바인딩)
+_DETECTION_FULL_SECONDS = VIDEO_DETECTION_SECONDS.labels('full')
+_DETECTION_REGIONS_SECONDS = VIDEO_DETECTION_SECONDS.labels('regions')
+_VIDEO_WORKER_CPU = STAGE_CPU_SECONDS.labels('video_worker')
 
 # 클래스 이름과 카테고리 매핑
 CLASS_CATEGORY_MAPPING = {
@@ -37,7 +57,14 @@ CLASS_CATEGORY_MAPPING = {
     5: '날카로운 도구',
     6: '화기류',
     7: '총기류',
-    8: '화기류'
+    8: '화기류',
+    9: '노출'
+}
+
+# 감지 주기를 촘촘히 유지할 고위험 클래스 ID (설정의 카테고리 이름 기준)
+HIGH_SEVERITY_CLASS_IDS = {
+    class_id for class_id, category in CLASS_CATEGORY_MAPPING.items()
+    if category in {c.strip() for c in config.VIDEO_HIGH_SEVERITY_CATEGORIES.split(',')}
 }
 
 # 클래스 이름 매핑 (class_id -> class_name)
@@ -50,12 +77,27 @@ CLASS_NAMES = {
     5: '칼',
     6: '불',
     7: '총',
-    8: '라이터'
+    8: '라이터',
+    9: '노출'
 }
 
+# 노출 모델 결과에 부여하는 전역 클래스 ID
+EXPOSURE_CLASS_ID = 9
+
+# 출력 프레임 PTS 기준 (RTP 비디오 클럭 90kHz)
+VIDEO_CLOCK_RATE = 90000
+VIDEO_TIME_BASE = fractions.Fraction(1, VIDEO_CLOCK_RATE)
+
 # 전역 YOLO 모델 인스턴스 (서버 시작 시 한 번만 로드)
 _global_yolo_detector = None
 _global_model_path = None
+_global_screener_detector = None  # 캐스케이드용 경량 스크리너 모델
+_global_detector_generation = 0  # 전역 모델이 교체될 때마다 증가 (세션은 프레임 사이에 새 모델로 전환)
+_swap_lock = threading.Lock()
+
+
+class ModelSwapInProgressError(RuntimeError):
+    """다른 모델 교체가 진행 중일 때 발생합니다."""
 
 def initialize_global_yolo_model():
     """
@@ -65,18 +107,25 @@ def initialize_global_yolo_model():
     @param {str} model_path - YOLO 모델 경로
     @returns {bool} 초기화 성공 여부
     """
-    global _global_yolo_detector, _global_model_path
+    global _global_yolo_detector, _global_model_path, _global_detector_generation
     
     # 모델 경로 설정에서 가져옴
     model_path = config.get_yolo_model_path()
     
     try:
         print(f"🔧 전역 YOLO 모델 초기화 시작: {model_path}")
-        _global_yolo_detector = YOLODetector(model_path=model_path, confidence_threshold=config.OBJECT_DETECTION_CONFIDENCE)
+        primary = YOLODetector(model_path=model_path, confidence_threshold=config.OBJECT_DETECTION_CONFIDENCE)
         
-        if _global_yolo_detector.initialize():
+        if primary.initialize():
+            # 여러 모델이 letterbox 입력 하나를 공유하도록 감지 호스트로 감쌈
+            _global_yolo_detector = DetectorHost(primary)
             _global_model_path = model_path
+            _global_detector_generation += 1
             print(f"✅ 전역 YOLO 모델 초기화 완료: {model_path}")
+            if config.VIDEO_EXPOSURE_MODEL_PATH:
+                _register_exposure_model(_global_yolo_detector)
+            if config.VIDEO_CASCADE_ENABLED:
+                _initialize_global_screener_model()
             return True
         else:
             print("❌ 전역 YOLO 모델 초기화 실패")
@@ -88,6 +137,45 @@ def initialize_global_yolo_model():
         _global_yolo_detector = None
         return False
 
+def _register_exposure_model(host: DetectorHost) -> bool:
+    """
+    노출 카테고리 모델을 로드해 감지 호스트에 등록합니다.
+    
+    @param {DetectorHost} host - 전역 감지 호스트
+    @returns {bool} 등록 성공 여부
+    """
+    detector = YOLODetector(model_path=config.VIDEO_EXPOSURE_MODEL_PATH, confidence_threshold=config.OBJECT_DETECTION_CONFIDENCE)
+    if not detector.initialize():
+        print(f"⚠️ 노출 모델 초기화 실패 → 노출 카테고리 감지 비활성화: {config.VIDEO_EXPOSURE_MODEL_PATH}")
+        return False
+    
+    class_ids = [int(c) for c in config.VIDEO_EXPOSURE_MODEL_CLASSES.split(',') if c.strip().isdigit()]
+    host.register(
+        'exposure',
+        detector,
+        class_map={class_id: EXPOSURE_CLASS_ID for class_id in class_ids},
+        class_names={EXPOSURE_CLASS_ID: CLASS_NAMES[EXPOSURE_CLASS_ID]},
+        cadence=config.VIDEO_EXPOSURE_MODEL_CADENCE,
+    )
+    return True
+
+def _initialize_global_screener_model() -> bool:
+    """
+    캐스케이드용 전역 스크리너 모델을 초기화합니다. 실패하면 캐스케이드 없이 동작합니다.
+    
+    @returns {bool} 초기화 성공 여부
+    """
+    global _global_screener_detector
+    
+    screener = YOLODetector(model_path=config.VIDEO_SCREENER_MODEL_PATH, confidence_threshold=config.VIDEO_SCREENER_CONFIDENCE)
+    if screener.initialize():
+        _global_screener_detector = screener
+        print(f"✅ 스크리너 모델 초기화 완료: {config.VIDEO_SCREENER_MODEL_PATH}")
+        return True
+    _global_screener_detector = None
+    print(f"⚠️ 스크리너 모델 초기화 실패 → 캐스케이드 비활성화: {config.VIDEO_SCREENER_MODEL_PATH}")
+    return False
+
 def get_global_yolo_detector():
     """
     전역 YOLO 모델 인스턴스를 반환합니다.
@@ -96,13 +184,152 @@ def get_global_yolo_detector():
     """
     return _global_yolo_detector
 
+def get_global_detector_generation() -> int:
+    """
+    전역 감지 모델 세대 번호를 반환합니다. 핫스왑될 때마다 증가합니다.
+    
+    @returns {int} 세대 번호
+    """
+    return _global_detector_generation
+
+def publish_model_swap(model_path: str) -> int:
+    """
+    모델 교체를 세션에 알립니다. 세대 번호를 올리면 각 세션이 다음 프레임 전에
+    감지기를 다시 바인딩하고 캐시·박스 추적·전송 이력을 초기화합니다.
+    로컬 핫스왑과 공유 메모리 추론 풀 교체가 같은 경로를 사용합니다.
+    
+    @param {str} model_path - 새 가중치 경로
+    @returns {int} 새 세대 번호
+    """
+    global _global_model_path, _global_detector_generation
+    _global_model_path = model_path
+    _global_detector_generation += 1
+    config.set_yolo_model_path(model_path)
+    shared_detection_cache.clear()  # 기존 모델의 결과 재사용 방지
+    return _global_detector_generation
+
+def parse_resolutions(spec: str) -> List[Tuple[int, int]]:
+    """
+    "가로x세로,..." 형식의 해상도 목록을 파싱합니다.
+    
+    @param {str} spec - 해상도 목록 문자열 (예: "640x480,1280x720")
+    @returns {List[Tuple[int, int]]} (가로, 세로) 목록 (비어 있으면 1280x720)
+    """
+    resolutions = []
+    for item in (spec or '').split(','):
+        parts = item.lower().strip().split('x')
+        if len(parts) == 2 and parts[0].isdigit() and parts[1].isdigit():
+            resolutions.append((int(parts[0]), int(parts[1])))
+    return resolutions or [(1280, 720)]
+
+def _warmup_detector(detector: YOLODetector, runs: int, resolutions: Optional[List[Tuple[int, int]]] = None) -> float:
+    """
+    합성 프레임으로 감지를 몇 번 실행해 지연 초기화 비용을 미리 치릅니다.
+    전체 프레임 경로(track)와 영역 경로(predict)를 해상도별로 모두 실행합니다.
+    
+    @param {YOLODetector} detector - 초기화된 감지 모델
+    @param {int} runs - 해상도별 실행 횟수
+    @param {List[Tuple[int, int]]} resolutions - 워밍업 해상도 목록 (없으면 설정값)
+    @returns {float} 워밍업 소요 시간(초)
+    """
+    start = time()
+    rng = np.random.default_rng(0)
+    for width, height in resolutions or parse_resolutions(config.VIDEO_WARMUP_RESOLUTIONS):
+        for _ in range(max(0, runs)):
+            frame = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+            detector.detect(frame)
+            detector.detect_regions(frame, [(0, 0, width // 2, height // 2)])
+    detector.reset_stats()
+    return time() - start
+
+def warmup_global_yolo_model(runs: int) -> dict:
+    """
+    전역 감지 호스트(추가 등록 모델 포함)와 스크리너 모델을 워밍업합니다. (블로킹)
+    
+    @param {int} runs - 해상도별 실행 횟수
+    @returns {dict} 모델별 워밍업 시간(초)
+    """
+    timings = {}
+    resolutions = parse_resolutions(config.VIDEO_WARMUP_RESOLUTIONS)
+    if _global_yolo_detector is not None:
+        timings['yolo'] = round(_warmup_detector(_global_yolo_detector, runs, resolutions), 3)
+    if _global_screener_detector is not None:
+        timings['screener'] = round(_warmup_detector(_global_screener_detector, runs, resolutions), 3)
+    for name, seconds in timings.items():
+        print(f"🔥 {name} 워밍업 완료: {seconds:.2f}초 ({runs}회 × {len(resolutions)}개 해상도)")
+    return timings
+
+def swap_global_yolo_model(model_path: str, warmup_runs: int = 3, drain_timeout: float = 30.0) -> dict:
+    """
+    서비스 중단 없이 전역 YOLO 가중치를 교체합니다. (블로킹: executor에서 호출)
+    
+    새 모델을 로드하고 워밍업한 뒤 전역 감지 호스트를 원자적으로 바꿉니다. 각 세션은
+    다음 프레임 처리 전에 새 호스트로 전환합니다. 세대 확인과 감지 호출 사이에 교체가 끼어들 수 있으므로
+    기존 모델을 직접 해제하지 않고, 마지막 세션이 기존 호스트 참조를 놓을 때 참조 카운트로 해제되게 둡니다.
+    추가 등록 모델(노출 등)은 새 호스트에 그대로 옮겨집니다.
+    
+    @param {str} model_path - 새 가중치 경로
+    @param {int} warmup_runs - 워밍업 감지 횟수
+    @param {float} drain_timeout - 기존 호스트의 진행 중 감지를 기다릴 최대 시간(초)
+    @returns {dict} 로드/워밍업/교체/드레인 시간
+    @throws {ModelSwapInProgressError} 다른 교체가 진행 중인 경우
+    @throws {RuntimeError} 새 모델 로드에 실패한 경우
+    """
+    global _global_yolo_detector
+    
+    if not _swap_lock.acquire(blocking=False):
+        raise ModelSwapInProgressError("다른 모델 교체가 진행 중입니다.")
+    try:
+        print(f"🔁 YOLO 모델 핫스왑 시작: {model_path}")
+        start = time()
+        primary = YOLODetector(model_path=model_path, confidence_threshold=config.OBJECT_DETECTION_CONFIDENCE)
+        if not primary.initialize():
+            raise RuntimeError(f"새 모델 로드 실패: {model_path}")
+        load_time = time() - start
+        warmup_time = _warmup_detector(primary, warmup_runs)
+        
+        new_host = DetectorHost(primary)
+        old_host = _global_yolo_detector
+        if old_host is not None:
+            for hosted in old_host.models[1:]:
+                new_host.register(hosted.name, hosted.detector, hosted.class_map, hosted.class_names, hosted.cadence)
+        
+        # 원자적 교체: 참조와 세대 번호만 바꾸고, 세션은 다음 프레임부터 새 호스트 사용
+        swap_start = time()
+        _global_yolo_detector = new_host
+        generation = publish_model_swap(model_path)
+        swap_pause = time() - swap_start
+        
+        # 진행 중인 감지가 끝나기를 기다린 뒤 전역 참조만 놓음 (세션이 아직 쥐고 있으면 전환할 때 해제)
+        drain_start = time()
+        drained = True
+        if old_host is not None:
+            drained = old_host.wait_idle(drain_timeout)
+            old_host = None
+            gc.collect()
+        drain_time = time() - drain_start
+        
+        result = {
+            'model_path': model_path,
+            'generation': generation,
+            'load_time': round(load_time, 3),
+            'warmup_time': round(warmup_time, 3),
+            'swap_pause_ms': round(swap_pause * 1000, 3),
+            'drain_time': round(drain_time, 3),
+            'drained': drained,
+        }
+        print(f"✅ YOLO 모델 핫스왑 완료: {result}")
+        return result
+    finally:
+        _swap_lock.release()
+
 def is_global_yolo_initialized():
     """
     전역 YOLO 모델이 초기화되었는지 확인합니다.
     
     @returns {bool} 초기화 여부
     """
-    return _global_yolo_detector is not None
+    return _global_yolo_detector is not None or shm_inference_pool.is_running
 
 
 def _categories_to_enabled_class_ids(video_category_flags: Dict[str, bool]) -> list:
@@ -125,8 +352,8 @@ def _categories_to_enabled_class_ids(video_category_flags: Dict[str, bool]) -> l
         'flammables': [6, 8],
         # 총기류
         'firearms': [7],
-        # 노출(현재 해당 클래스 없음)
-        'exposure': [],
+        # 노출 (별도 노출 모델이 등록된 경우에만 감지됨)
+        'exposure': [EXPOSURE_CLASS_ID],
     }
 
     enabled_ids = set()
@@ -136,6 +363,117 @@ def _categories_to_enabled_class_ids(video_category_flags: Dict[str, bool]) -> l
     return sorted(enabled_ids)
 
 
+def _rects_overlap(a, b) -> bool:
+    """두 사각형(x1, y1, x2, y2)이 겹치는지 확인합니다."""
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def _box_iou(a, b) -> float:
+    """두 사각형(x1, y1, x2, y2)의 IoU를 계산합니다."""
+    ix1, iy1 = max(a[0], b[0]), max(a[1], b[1])
+    ix2, iy2 = min(a[2], b[2]), min(a[3], b[3])
+    inter = max(0, ix2 - ix1) * max(0, iy2 - iy1)
+    if inter == 0:
+        return 0.0
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / max(1, union)
+
+
+def _merge_rects(rects: List[List[int]]) -> List[List[int]]:
+    """겹치는 사각형을 더 이상 겹치지 않을 때까지 합칩니다."""
+    merged = [list(r) for r in rects]
+    changed = True
+    while changed:
+        changed = False
+        result: List[List[int]] = []
+        for rect in merged:
+            for other in result:
+                if _rects_overlap(rect, other):
+                    other[0], other[1] = min(other[0], rect[0]), min(other[1], rect[1])
+                    other[2], other[3] = max(other[2], rect[2]), max(other[3], rect[3])
+                    changed = True
+                    break
+            else:
+                result.append(rect)
+        merged = result
+    return merged
+
+
+class FrameMailbox:
+    """
+    최신 프레임 우선(latest-frame-wins) 단일 슬롯 메일박스
+    
+    수신 루프는 원본 VideoFrame 참조만 넣고, 워커가 꺼내기 전에 새 프레임이 오면 이전 프레임을 교체합니다.
+    변환(to_ndarray)은 워커가 실제로 가져간 프레임에 대해서만 수행됩니다.
+    """
+    
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._frame: Optional[VideoFrame] = None
+        self._frame_ingest_time: Optional[float] = None
+        self._closed = False
+        self.replaced_count = 0  # 워커가 가져가기 전에 교체(폐기)된 프레임 수
+        self.taken_ingest_time: Optional[float] = None  # 워커가 마지막으로 꺼낸 프레임의 수신 시각
+        self._frame_trace = NULL_TRACE
+        self._frame_trace_start = 0.0
+        self.taken_trace = NULL_TRACE  # 워커가 마지막으로 꺼낸 프레임의 추적 핸들
+        self.taken_trace_start = 0.0
+    
+    def put(self, frame: VideoFrame, trace=NULL_TRACE) -> None:
+        """
+        프레임을 슬롯에 넣습니다. 기존 프레임이 있으면 교체합니다.
+        
+        @param {VideoFrame} frame - 수신된 원본 프레임
+        @param {FrameTrace} trace - 샘플링된 프레임의 추적 핸들
+        """
+        with self._condition:
+            if self._frame is not None:
+                self.replaced_count += 1
+            self._frame = frame
+            self._frame_ingest_time = time()
+            self._frame_trace = trace
+            self._frame_trace_start = trace.now()
+            self._condition.notify()
+    
+    def take(self, timeout: float) -> Optional[VideoFrame]:
+        """
+        슬롯의 프레임을 꺼냅니다. 비어 있으면 timeout까지 대기합니다.
+        
+        @param {float} timeout - 최대 대기 시간(초)
+        @returns {VideoFrame|None} 프레임 (타임아웃/종료 시 None)
+        """
+        with self._condition:
+            if self._frame is None and not self._closed:
+                self._condition.wait(timeout)
+            frame = self._frame
+            self._frame = None
+            if frame is not None:
+                self.taken_ingest_time = self._frame_ingest_time
+                self.taken_trace = self._frame_trace
+                self.taken_trace_start = self._frame_trace_start
+            self._frame_trace = NULL_TRACE
+            return frame
+    
+    def close(self) -> None:
+        """대기 중인 워커를 깨우고 메일박스를 닫습니다."""
+        with self._condition:
+            self._closed = True
+            self._frame = None
+            self._condition.notify_all()
+    
+    def reopen(self) -> None:
+        """닫힌 메일박스를 비운 채로 다시 엽니다. (워커 재시작 시)"""
+        with self._condition:
+            self._closed = False
+            self._frame = None
+            self._frame_trace = NULL_TRACE
+    
+    @property
+    def closed(self) -> bool:
+        """메일박스가 닫혔는지 여부"""
+        return self._closed
+
+
 class VideoProcessor:
     """
     비디오 프레임 처리 클래스
@@ -183,14 +521,16 @@ class VideoProcessor:
         self.detection_callbacks: List[Callable[[List[DetectionResult]], None]] = []
         
         # 별도 스레드 처리를 위한 큐와 스레드
-        self.processed_frame_queue = queue.Queue(maxsize=10)  # 처리된 프레임 큐
-        self.last_processed_frame = None  # 마지막 처리된 프레임 (복제용)
+        self.frame_mailbox = FrameMailbox()  # 수신 원본 프레임 메일박스 (최신 프레임 우선)
+        self._detections_ingest_time: Optional[float] = None  # current_detections를 만든 프레임의 수신 시각
+        self.last_processed_image = None  # 마지막 처리된 이미지 (킵얼라이브 재전송용)
         self.processing_thread = None
         self.processing_thread_running = False
         
-        # 출력 스무딩을 위한 출력 버퍼 큐 (이미지+타이밍 페어로 저장)
-        self.output_frame_queue = queue.Queue(maxsize=120)  # (img, pts, time_base)
-        self.output_buffer_target = 15  # 정적 구간에서 버퍼 목표 크기
+        # 출력 스무딩을 위한 출력 버퍼 큐 (PTS는 송출 시 페이싱 클럭이 부여)
+        self.output_frame_queue = queue.Queue(maxsize=120)  # (img, 추적 핸들, 큐 투입 시각)
+        self.last_output_trace = NULL_TRACE  # get_processed_frame이 마지막으로 내준 프레임의 추적 핸들
+        self.output_buffer_target = 15  # 출력 버퍼 최대 유지 크기 (초과분은 오래된 것부터 폐기)
         
         # 감지 주기: N프레임마다 1회 감지, 나머지는 직전 결과 재사용
         self.detection_stride = 3
@@ -202,12 +542,39 @@ class VideoProcessor:
         self.motion_downscale = (160, 90)  # 모션 계산용 다운스케일 해상도
         self.max_skip_without_detection = self.detection_stride * 3  # 안전 주기
         self._prev_motion_frame_small = None
+        self._motion_mask_small = None  # 직전 모션 계산의 이진 차분 마스크
         self._frames_since_last_detection = self.detection_stride  # 초기 감지 허용을 위해 stride만큼 채움
+        self._frames_since_last_confirm = 0  # 전체 모델 감지 이후 프레임 수 (안전 주기 기준)
+        self.cascade_detector: Optional[CascadeDetector] = None
+        self._detector_generation = 0
+
+        # 지각 해시 감지 캐시: 같은 장면이면 추론 없이 저장된 결과 재사용
+        self.detection_cache: Optional[DetectionCache] = None
+        if config.VIDEO_DETECTION_CACHE_ENABLED:
+            self.detection_cache = DetectionCache(
+                max_entries=config.VIDEO_DETECTION_CACHE_SIZE,
+                max_distance=config.VIDEO_DETECTION_CACHE_MAX_DISTANCE,
+                ttl=config.VIDEO_DETECTION_CACHE_TTL,
+            )
+
+        # 모션 영역 제한 추론: 모션 영역 크롭만 감지하고 정지 영역은 기존 박스 유지
+        self.roi_inference_enabled = config.VIDEO_ROI_INFERENCE_ENABLED
+        self.roi_max_area_ratio = config.VIDEO_ROI_MAX_AREA_RATIO
+        self.roi_min_component_area = 4  # 다운스케일 기준 최소 연결 영역 픽셀 수
+        self.roi_padding_px = 32  # 원본 기준 최소 여백
+        self._next_region_track_id = -1  # 영역 감지 결과용 임시 ID (ByteTrack ID와 겹치지 않도록 음수, 알림 대상 아님)
+        self._confirm_requested = False  # 영역 감지에 새 물체가 나오면 다음 프레임에 전체 감지로 ByteTrack ID 확정
 
         # 동적 스트라이드 설정
         self.dynamic_stride_enabled = True
         self.min_detection_stride = 1
         self.max_detection_stride = 10
+
+        # 감지 사이 박스 전파: 스킵 프레임에서도 블러가 물체를 따라가므로 스트라이드 상한을 높임
+        self.box_tracker: Optional[BoxTracker] = None
+        if config.VIDEO_BOX_TRACKING_ENABLED:
+            self.box_tracker = BoxTracker(max_age=config.VIDEO_BOX_TRACK_MAX_AGE)
+            self.max_detection_stride = max(self.max_detection_stride, config.VIDEO_BOX_TRACK_MAX_AGE)
         # 히스테리시스 임계값(EMA 기준): 높을수록 더 자주 줄이고, 낮을수록 더 자주 늘림
         self.high_motion_threshold = 0.05
         self.low_motion_threshold = 0.01
@@ -218,6 +585,14 @@ class VideoProcessor:
         self._stride_cooldown_frames = 5
         self._frames_since_last_stride_update = self._stride_cooldown_frames
 
+        # 클래스 인지 감지 주기: 고위험 클래스 등장 후 촘촘히, 장시간 빈 화면이면 안전 주기 완화
+        self.high_severity_window = config.VIDEO_HIGH_SEVERITY_WINDOW
+        self.high_severity_stride = max(1, config.VIDEO_HIGH_SEVERITY_STRIDE)
+        self.idle_relax_after = config.VIDEO_IDLE_RELAX_AFTER
+        self.idle_relax_max_factor = max(1, config.VIDEO_IDLE_RELAX_MAX_FACTOR)
+        self._high_severity_until = 0.0
+        self._last_nonempty_detection_time = time()
+
         # 모션 온셋 버스트 및 모션 중 최소 간격 설정
         self.motion_stride = 1  # 모션 중 최소 감지 간격(프레임)
         self.motion_burst_enabled = True
@@ -229,6 +604,10 @@ class VideoProcessor:
         self._frames_since_last_blur_draw = 0
         self._last_blurred_image = None
 
+        # 노드 거버너 등록: 부하에 따라 세션별 최소 감지 간격을 할당받음
+        self._governor_key = id(self)
+        inference_governor.register(self._governor_key)
+
         # 물체 감지 초기화
         self._initialize_object_detection()
         
@@ -249,6 +628,12 @@ class VideoProcessor:
             return
         
         self.processing_thread_running = True
+        if self.frame_mailbox.closed:
+            # 중지 후 재시작: 닫힌 메일박스를 다시 열고 중지 때 해제한 거버너 등록을 복구
+            self.frame_mailbox.reopen()
+            inference_governor.register(self._governor_key, self.session_id)
+            if self.session_id:
+                inference_governor.set_session(self._governor_key, self.session_id, session_state_manager.get_session_option(self.session_id, 'tier'))
         self.processing_thread = threading.Thread(target=self._processing_thread_worker, daemon=True)
         self.processing_thread.start()
         print("🔄 별도 스레드에서 프레임 처리 시작")
@@ -256,24 +641,55 @@ class VideoProcessor:
     def _stop_processing_thread(self):
         """별도 스레드를 중지합니다."""
         self.processing_thread_running = False
+        self.frame_mailbox.close()
+        inference_governor.unregister(self._governor_key)
         if self.processing_thread and self.processing_thread.is_alive():
             self.processing_thread.join(timeout=1.0)
         print("🛑 별도 스레드에서 프레임 처리 중지")
     
+    def release_resources(self) -> None:
+        """세션 종료 시 워커를 멈추고 프레임 버퍼와 세션별 추적/캐시 상태를 비웁니다."""
+        self._stop_processing_thread()
+        while True:
+            try:
+                self.output_frame_queue.get_nowait()
+            except queue.Empty:
+                break
+        self.last_processed_image = None
+        self._prev_motion_frame_small = None
+        self._motion_mask_small = None
+        self.current_detections = []
+        self.seen_track_ids_by_class.clear()
+        self.detection_callbacks.clear()
+        if self.box_tracker is not None:
+            self.box_tracker.clear()
+        if self.detection_cache is not None:
+            self.detection_cache.clear()
+        if isinstance(self.object_detector, RemoteDetector):
+            self.object_detector.close()
+    
     def _processing_thread_worker(self):
         """별도 스레드에서 실행되는 프레임 처리 워커"""
         while self.processing_thread_running:
             try:
-                # 큐에서 프레임 가져오기 (1초 타임아웃)
-                frame_data = self.processed_frame_queue.get(timeout=1.0)
-                if frame_data is None:  # 종료 신호
-                    break
+                # 메일박스에서 최신 프레임 가져오기 (1초 타임아웃)
+                frame = self.frame_mailbox.take(timeout=1.0)
+                if frame is None:
+                    continue
+                cpu_start = thread_time()
+                trace = self.frame_mailbox.taken_trace
+                t = trace.span('mailbox_wait', self.frame_mailbox.taken_trace_start)
                 
-                img, original_frame = frame_data
+                # 워커가 실제로 처리할 프레임만 numpy 배열로 변환
+                img = frame.to_ndarray(format='bgr24')
+                t = trace.span('to_ndarray', t)
                 
                 # 프레임 인덱스 증가 (워커 기준)
                 self._worker_frame_index += 1
                 
+                # 전역 모델 핫스왑 반영 (프레임 사이에서만 전환)
+                self._refresh_detector_if_swapped()
+                
                 # 물체 감지 실행 (별도 스레드에서)
                 if self.enable_object_detection:
                     detections = []
@@ -284,11 +700,27 @@ class VideoProcessor:
                             motion_ratio = self._compute_motion_ratio(img)
                         except Exception as _:
                             motion_ratio = 0.0
+                        t = trace.span('motion', t)
+                    
+                    # 노드 거버너가 할당한 최소 감지 간격 (과부하 시 모든 경로에 적용)
+                    inference_governor.report_frame(self._governor_key, motion_ratio)
+                    stride_floor = inference_governor.min_stride(self._governor_key)
+                    floor_ok = (self._frames_since_last_detection >= stride_floor)
                     
                     # 감지 실행 조건
-                    allow_window = (self._frames_since_last_detection >= self.detection_stride)
-                    safety_due = (self._frames_since_last_detection >= self.max_skip_without_detection)
+                    cadence_now = time()
+                    allow_window = (self._frames_since_last_detection >= max(self.detection_stride, stride_floor))
+                    # 안전 주기는 전체 모델(컨퍼머) 감지 기준 (캐스케이드의 스크리너만 실행된 프레임은 제외)
+                    safety_due = (
+                        self._frames_since_last_confirm >= max(self._safety_limit(cadence_now), stride_floor * 2)
+                        or (self._confirm_requested and floor_ok)
+                    )
                     motion_trigger = (motion_ratio >= self.motion_threshold)
+                    # 고위험 클래스가 최근 감지되었으면 모션과 무관하게 촘촘한 주기 유지
+                    severity_due = (
+                        cadence_now < self._high_severity_until
+                        and self._frames_since_last_detection >= max(self.high_severity_stride, stride_floor)
+                    )
 
                     # 모션 온셋(burst) 감지: 임계치 하->상 교차 시 즉시 몇 프레임 연속 감지
                     if self.motion_burst_enabled:
@@ -296,32 +728,91 @@ class VideoProcessor:
                             self._motion_burst_remaining = self.motion_burst_frames
                         self._motion_prev_above = motion_trigger
 
-                    in_burst = (self._motion_burst_remaining > 0)
+                    in_burst = (self._motion_burst_remaining > 0) and floor_ok
 
                     # 모션 중 최소 간격 적용: 모션이 계속되는 동안엔 motion_stride 기준 허용
-                    motion_window = (self._frames_since_last_detection >= self.motion_stride) if motion_trigger else allow_window
+                    motion_window = (self._frames_since_last_detection >= max(self.motion_stride, stride_floor)) if motion_trigger else allow_window
 
-                    run_detection = (motion_trigger and motion_window) or in_burst or safety_due
+                    run_detection = (motion_trigger and motion_window) or in_burst or severity_due or safety_due
+                    # 티어 초당 감지 상한: 넘으면 기다리지 않고 이번 프레임은 직전 박스 전파/재사용
+                    if run_detection and not inference_governor.admit(self._governor_key):
+                        run_detection = False
                     
+                    boxes_moved = False
                     if run_detection:
-                        detections = self._detect_objects_thread_safe(img)
+                        # 모션 구간은 모션 영역만 감지, 안전 주기는 항상 전체 프레임 감지
+                        regions = None
+                        if self.roi_inference_enabled and motion_trigger and not safety_due:
+                            regions = self._motion_regions(img.shape)
+                        
+                        # 전체 프레임 감지 결과는 캐시에 저장하고, 조회는 정지 장면이면서 안전 주기가 아닐 때만
+                        # (작은 새 물체는 썸네일 해시를 거의 바꾸지 못하므로 모션 프레임에서는 캐시를 믿지 않음)
+                        frame_hash = None
+                        cached = None
+                        if not regions and self.detection_cache is not None:
+                            frame_hash = self._frame_hash(img)
+                            if not motion_trigger and not in_burst and not safety_due:
+                                cached = self._lookup_detection_cache(frame_hash, img.shape)
+                        
+                        # 캐스케이드: 안전 주기가 아니면 스크리너가 반응할 때만 전체 모델 실행
+                        screened_out = False
+                        if cached is None and self.cascade_detector is not None and not safety_due:
+                            with inference_governor.slot(self._governor_key):
+                                screened_out = not self.cascade_detector.screen(img)
+                        
+                        if cached is not None:
+                            # 캐시 적중은 전체 모델 확인이 아니므로 안전 주기 카운터를 되돌리지 않음
+                            detections = cached
+                            self.current_detections = cached
+                            self._frames_since_last_confirm += 1
+                        elif screened_out:
+                            # 스크리너 미검출은 확인이 아니므로 직전 박스를 지우지 않고 전파해 유지하고,
+                            # 남은 박스가 있으면 다음 허용 프레임에 전체 모델 확인을 요청
+                            if self.box_tracker is not None:
+                                detections = self.box_tracker.propagate(self._motion_gray_for(img), img.shape)
+                                boxes_moved = self.box_tracker.last_max_shift >= 1.0
+                            else:
+                                detections = self.current_detections
+                            self._frames_since_last_confirm += 1
+                            self._confirm_requested = self._confirm_requested or bool(detections)
+                        elif regions:
+                            # 모션 영역만 본 감지는 전체 프레임 확인이 아니므로 안전 주기 카운터를 계속 올림
+                            detections = self._detect_regions_thread_safe(img, regions)
+                            self._frames_since_last_confirm += 1
+                        else:
+                            detections = self._detect_objects_thread_safe(img, frame_hash)
+                            self._frames_since_last_confirm = 0
+                            self._confirm_requested = False
                         self._frames_since_last_detection = 0
+                        # 이번 감지 결과로 나가는 알림의 지연 기준 시각
+                        self._detections_ingest_time = self.frame_mailbox.taken_ingest_time
+                        self._update_class_cadence(detections, cadence_now)
                         if in_burst:
                             self._motion_burst_remaining = max(0, self._motion_burst_remaining - 1)
+                        if self.box_tracker is not None and not screened_out:
+                            self.box_tracker.reset(detections, self._motion_gray_for(img))
+                    elif self.box_tracker is not None:
+                        # 스킵 프레임: 직전 감지 박스를 광학 흐름으로 이동/만료
+                        detections = self.box_tracker.propagate(self._motion_gray_for(img), img.shape)
+                        boxes_moved = self.box_tracker.last_max_shift >= 1.0
+                        self._frames_since_last_detection += 1
+                        self._frames_since_last_confirm += 1
                     else:
                         detections = self.current_detections
                         self._frames_since_last_detection += 1
+                        self._frames_since_last_confirm += 1
+                    t = trace.span('detect' if run_detection else 'propagate', t)
                     
                     # 감지 결과 시각화 (동적 블러 샘플링)
                     if detections:
                         do_draw = True
-                        if not motion_trigger:
+                        if not motion_trigger and not boxes_moved:
                             # 정적 구간: 매 N프레임마다 새로 블러 계산하고, 그 외에는 캐시된 블러 이미지 재사용
                             self._frames_since_last_blur_draw = getattr(self, "_frames_since_last_blur_draw", 0) + 1
                             static_n = getattr(self, "blur_sample_static_n", 5)
                             do_draw = (self._frames_since_last_blur_draw >= static_n)
 
-                        if do_draw or motion_trigger:
+                        if do_draw or motion_trigger or boxes_moved:
                             # 동적 구간은 항상 새로 블러, 정적 구간은 샘플링 간격마다 블러 갱신
                             print(f"✅ {len(detections)}개 물체 감지됨 (재사용 포함)")
                             blurred = self.visualizer.draw_detections(img, detections)
@@ -338,6 +829,7 @@ class VideoProcessor:
                                 self._last_blurred_image = blurred
                                 img = blurred
                         # img = self.visualizer.draw_detection_count(img, detections)
+                        t = trace.span('blur', t)
                     # else:
                     #     print("📭 물체 감지 결과 없음")
 
@@ -350,26 +842,21 @@ class VideoProcessor:
                     img = cv2.resize(img, (1280, 720))
                 except Exception as e:
                     print(f"리사이즈 중 오류: {e}")
+                t = trace.span('resize', t)
                 
-                # 처리된 이미지를 VideoFrame으로 변환
-                # 출력 스무딩: 처리 이미지와 원본 타임스탬프를 함께 큐에 저장
+                # 출력 스무딩: 처리 이미지를 큐에 저장 (VideoFrame 변환은 송출 슬롯에서 한 번만 수행)
+                output = (img, trace, t)
                 try:
-                    self.output_frame_queue.put_nowait((img, original_frame.pts, original_frame.time_base))
+                    self.output_frame_queue.put_nowait(output)
                 except queue.Full:
                     try:
                         _ = self.output_frame_queue.get_nowait()
-                        self.output_frame_queue.put_nowait((img, original_frame.pts, original_frame.time_base))
+                        self.output_frame_queue.put_nowait(output)
                     except Exception:
                         pass
                 
-                # 마지막 처리된 프레임 업데이트: 즉시 전송 경로를 위해서도 유지 (fallback)
-                try:
-                    processed_frame = VideoFrame.from_ndarray(img, format='bgr24')
-                    processed_frame.pts = original_frame.pts
-                    processed_frame.time_base = original_frame.time_base
-                    self.last_processed_frame = processed_frame
-                except Exception:
-                    pass
+                # 마지막 처리된 이미지 보관 (새 프레임이 없을 때 킵얼라이브 재전송용)
+                self.last_processed_image = img
                 
                 # 평균 FPS 업데이트 (처리된 프레임 수 / 경과 시간)
                 now = time()
@@ -383,17 +870,16 @@ class VideoProcessor:
                 if not self._fps_logged_30s and elapsed >= 30.0:
                     print(f"📈 평균 처리 FPS(30초): {self.processing_stats['avg_fps']:.2f}")
                     self._fps_logged_30s = True
+                _VIDEO_WORKER_CPU.inc(thread_time() - cpu_start)
                 
                 # print(f"🔄 프레임 처리 완료 (스레드): {self.frame_count}")
                 
-            except queue.Empty:
-                continue  # 타임아웃 시 계속 대기
             except Exception as e:
                 print(f"❌ 별도 스레드 처리 중 오류: {e}")
                 continue
     
-    def _detect_objects_thread_safe(self, img: np.ndarray) -> List[DetectionResult]:
-        """스레드 안전한 물체 감지 (별도 스레드에서 호출)"""
+    def _detect_objects_thread_safe(self, img: np.ndarray, frame_hash: Optional[int] = None) -> List[DetectionResult]:
+        """스레드 안전한 물체 감지 (별도 스레드에서 호출). frame_hash가 있으면 결과를 캐시에 저장합니다."""
         if not self.enable_object_detection:
             return []
         
@@ -403,8 +889,23 @@ class VideoProcessor:
         start_time = time()
         
         try:
-            # 물체 감지 실행
-            detections = self.object_detector.detect(img)
+            # 물체 감지 실행 (노드 추론 슬롯 대기/추론 시간은 거버너가 측정)
+            detector = self.cascade_detector or self.object_detector
+            with inference_governor.slot(self._governor_key):
+                inference_start = time()
+                detections = detector.detect(img)
+                inference_time = time() - inference_start
+            _DETECTION_FULL_SECONDS.observe(inference_time)
+            
+            # 섀도 평가: 후보 모델이 있으면 일부 프레임을 저우선순위 워커로 넘김 (논블로킹)
+            shadow_evaluator.offer(img, detections, inference_time)
+            
+            # 필터 적용 전 결과를 캐시 (세션마다 필터가 달라도 공유 가능)
+            if frame_hash is not None:
+                self.detection_cache.store(frame_hash, img.shape, detections)
+                scope = self._shared_cache_scope()
+                if scope is not None:
+                    shared_detection_cache.store(frame_hash, img.shape, detections, scope)
             
             # 필터링 적용
             filtered_detections = self.detection_filter.filter_detections(detections)
@@ -429,6 +930,106 @@ class VideoProcessor:
             print(f"물체 감지 중 오류: {e}")
             return []
 
+    def _detect_regions_thread_safe(self, img: np.ndarray, regions: List[Tuple[int, int, int, int]]) -> List[DetectionResult]:
+        """
+        모션 영역만 감지하고 정지 영역의 기존 박스는 그대로 유지합니다. (별도 스레드에서 호출)
+        영역 감지 결과는 기존 박스와 IoU로 매칭해 ID를 이어받고, 새 물체에는 임시 ID를 부여합니다.
+        """
+        if not self.enable_object_detection or not self.object_detector:
+            return []
+        
+        start_time = time()
+        
+        try:
+            # 정지 영역 박스: 추적기가 있으면 현재 프레임으로 전파한 위치 사용
+            if self.box_tracker is not None:
+                carried = self.box_tracker.propagate(self._motion_gray_for(img), img.shape)
+            else:
+                carried = list(self.current_detections)
+            kept = [d for d in carried if not any(_rects_overlap(d.bbox, r) for r in regions)]
+            
+            detector = self.cascade_detector or self.object_detector
+            with inference_governor.slot(self._governor_key):
+                inference_start = time()
+                detections = detector.detect_regions(img, regions)
+                _DETECTION_REGIONS_SECONDS.observe(time() - inference_start)
+            filtered_detections = self.detection_filter.filter_detections(detections)
+            self._assign_region_track_ids(filtered_detections, carried)
+            filtered_detections = kept + filtered_detections
+            
+            # 통계 업데이트
+            detection_time = time() - start_time
+            self.processing_stats['detection_time'] += detection_time
+            self.processing_stats['objects_detected'] += len(filtered_detections)
+            self.processing_stats['region_detections'] = self.processing_stats.get('region_detections', 0) + 1
+            
+            self.current_detections = filtered_detections
+            return filtered_detections
+            
+        except Exception as e:
+            print(f"영역 감지 중 오류: {e}")
+            return []
+
+    def _assign_region_track_ids(self, detections: List[DetectionResult], previous: List[DetectionResult]) -> None:
+        """
+        영역 감지 결과에 이전 박스의 ID를 이어 붙이고, 매칭이 없으면 임시 ID를 부여합니다.
+        임시 ID는 블러 유지용이며 알림을 보내지 않고, 다음 프레임의 전체 감지가 ByteTrack ID를 확정합니다.
+        """
+        for detection in detections:
+            if detection.track_id is not None:
+                continue
+            best_iou = 0.3
+            for prev in previous:
+                if prev.class_id != detection.class_id or prev.track_id is None:
+                    continue
+                iou = _box_iou(detection.bbox, prev.bbox)
+                if iou >= best_iou:
+                    best_iou = iou
+                    detection.track_id = prev.track_id
+            if detection.track_id is None:
+                detection.track_id = self._next_region_track_id
+                self._next_region_track_id -= 1
+                self._confirm_requested = True
+
+    def _motion_regions(self, frame_shape: Tuple[int, ...]) -> Optional[List[Tuple[int, int, int, int]]]:
+        """
+        직전 모션 마스크의 연결 영역을 원본 좌표계의 여백 포함 사각형으로 변환합니다.
+        
+        @param {tuple} frame_shape - 원본 프레임 shape (h, w, ...)
+        @returns {List[Tuple]|None} 감지 영역 목록 (None이면 전체 프레임 감지 권장)
+        """
+        mask = self._motion_mask_small
+        if mask is None:
+            return None
+        
+        height, width = frame_shape[:2]
+        small_h, small_w = mask.shape[:2]
+        scale_x, scale_y = width / small_w, height / small_h
+        
+        dilated = cv2.dilate(mask, np.ones((3, 3), np.uint8), iterations=2)
+        count, _, comp_stats, _ = cv2.connectedComponentsWithStats(dilated, connectivity=8)
+        
+        rects = []
+        for i in range(1, count):
+            x, y, w, h, area = comp_stats[i]
+            if area < self.roi_min_component_area:
+                continue
+            x1, y1 = x * scale_x, y * scale_y
+            x2, y2 = (x + w) * scale_x, (y + h) * scale_y
+            pad = max(self.roi_padding_px, 0.25 * max(x2 - x1, y2 - y1))
+            rects.append([
+                int(max(0, x1 - pad)), int(max(0, y1 - pad)),
+                int(min(width, x2 + pad)), int(min(height, y2 + pad)),
+            ])
+        if not rects:
+            return None
+        
+        rects = _merge_rects(rects)
+        covered = sum((r[2] - r[0]) * (r[3] - r[1]) for r in rects)
+        if covered > self.roi_max_area_ratio * width * height:
+            return None
+        return [tuple(r) for r in rects]
+
     def _compute_motion_ratio(self, img: np.ndarray) -> float:
         """저해상도 그레이스케일 차분으로 프레임 간 모션 비율(0~1)을 계산합니다."""
         # 다운스케일 및 그레이스케일 변환
@@ -441,12 +1042,14 @@ class VideoProcessor:
         # 첫 프레임 처리
         if self._prev_motion_frame_small is None:
             self._prev_motion_frame_small = gray
+            self._motion_mask_small = None
             return 1.0  # 첫 프레임은 강제 감지 유도
 
         # 절대 차이 및 이진화
         diff = cv2.absdiff(self._prev_motion_frame_small, gray)
         # 노이즈 억제를 위한 임계값(조정 가능)
         _, thresh = cv2.threshold(diff, 20, 255, cv2.THRESH_BINARY)
+        self._motion_mask_small = thresh
 
         # 변경 픽셀 비율 계산
         changed = int(np.count_nonzero(thresh))
@@ -457,6 +1060,69 @@ class VideoProcessor:
         self._prev_motion_frame_small = gray
         return float(ratio)
 
+    def _frame_hash(self, img: np.ndarray) -> Optional[int]:
+        """모션 단계 썸네일의 지각 해시를 계산합니다."""
+        gray = self._motion_gray_for(img)
+        if gray is None:
+            return None
+        return perceptual_hash(gray)
+
+    def _lookup_detection_cache(self, frame_hash: Optional[int], frame_shape) -> Optional[List[DetectionResult]]:
+        """세션 캐시 → 공유 캐시 순으로 같은 장면의 감지 결과를 찾아 현재 필터를 적용해 반환합니다."""
+        if frame_hash is None:
+            return None
+        cached = self.detection_cache.lookup(frame_hash, frame_shape)
+        scope = self._shared_cache_scope() if cached is None else None
+        if scope is not None:
+            cached = shared_detection_cache.lookup(frame_hash, frame_shape, scope)
+            if cached is not None:
+                self.detection_cache.store(frame_hash, frame_shape, cached)
+        if cached is None:
+            return None
+        return self.detection_filter.filter_detections(cached)
+
+    def _shared_cache_scope(self) -> Optional[str]:
+        """
+        공유 캐시 범위를 반환합니다. 공유가 꺼져 있거나 BE가 범위를 지정하지 않은 세션은 None(공유 안 함).
+        검은 화면·정지 화면처럼 썸네일이 비슷한 무관한 방송끼리 결과가 섞이지 않도록 범위가 같은 세션끼리만 공유합니다.
+        """
+        if not config.VIDEO_DETECTION_CACHE_SHARED or not self.session_id:
+            return None
+        return session_state_manager.get_session_option(self.session_id, 'cacheScope')
+
+    def _update_class_cadence(self, detections: List[DetectionResult], now: float) -> None:
+        """감지 결과의 클래스로 고위험 구간과 마지막 감지 시각을 갱신합니다."""
+        if not detections:
+            return
+        self._last_nonempty_detection_time = now
+        if any(d.class_id in HIGH_SEVERITY_CLASS_IDS for d in detections):
+            if now >= self._high_severity_until:
+                print(f"⚠️ 고위험 클래스 감지 → {self.high_severity_window:.0f}초간 감지 주기 강화")
+            self._high_severity_until = now + self.high_severity_window
+
+    def _safety_limit(self, now: float) -> int:
+        """
+        안전 주기(감지 없이 넘길 수 있는 최대 프레임 수)를 반환합니다.
+        빈 화면이 idle_relax_after초마다 이어질 때마다 2배로 완화합니다. (최대 idle_relax_max_factor배)
+        """
+        if now < self._high_severity_until or self.idle_relax_after <= 0:
+            return self.max_skip_without_detection
+        idle_periods = int((now - self._last_nonempty_detection_time) // self.idle_relax_after)
+        factor = min(self.idle_relax_max_factor, 2 ** min(idle_periods, 8))
+        return self.max_skip_without_detection * factor
+
+    def _motion_gray_for(self, img: np.ndarray) -> Optional[np.ndarray]:
+        """
+        박스 전파용 저해상도 그레이 프레임을 반환합니다.
+        모션 계산이 이미 이 프레임을 처리했다면 그 결과를 재사용합니다.
+        """
+        if self.motion_enabled and self._prev_motion_frame_small is not None:
+            return self._prev_motion_frame_small
+        try:
+            return cv2.cvtColor(cv2.resize(img, self.motion_downscale), cv2.COLOR_BGR2GRAY)
+        except Exception:
+            return None
+
     def _update_dynamic_stride(self, motion_ratio: float) -> None:
         """모션 EMA를 기반으로 detection_stride를 동적으로 조절합니다."""
         # EMA 업데이트
@@ -480,6 +1146,39 @@ class VideoProcessor:
             self.max_skip_without_detection = max(self.detection_stride * 2, min(self.detection_stride * 5, self.max_detection_stride * 3))
             self._frames_since_last_stride_update = 0
     
+    def _bind_global_detector(self) -> None:
+        """현재 전역 감지 호스트를 가져오고, 전역 스크리너가 있으면 세션별 캐스케이드(통계 분리)로 감쌉니다."""
+        self._detector_generation = get_global_detector_generation()
+        if shm_inference_pool.is_running:
+            # 추론은 별도 프로세스에서 실행하고 이 프로세스는 공유 메모리 링으로 프레임만 넘김
+            if not isinstance(self.object_detector, RemoteDetector):
+                self.object_detector = shm_inference_pool.create_detector()
+            self.cascade_detector = None
+            return
+        self.object_detector = get_global_yolo_detector()
+        self.cascade_detector = None
+        if self.object_detector and _global_screener_detector is not None:
+            self.cascade_detector = CascadeDetector(
+                self.object_detector,
+                _global_screener_detector,
+                screener_imgsz=config.VIDEO_SCREENER_IMGSZ,
+            )
+
+    def _refresh_detector_if_swapped(self) -> None:
+        """전역 모델이 핫스왑되었으면 프레임 사이에 새 모델로 전환합니다."""
+        if not self.enable_object_detection or self._detector_generation == get_global_detector_generation():
+            return
+        self._bind_global_detector()
+        # 새 모델의 ByteTrack ID는 1부터 다시 시작하므로 전송 이력과 추적 상태를 초기화
+        self.seen_track_ids_by_class = {}
+        self.current_detections = []
+        if self.box_tracker is not None:
+            self.box_tracker.clear()
+        if self.detection_cache is not None:
+            self.detection_cache.clear()
+        self._frames_since_last_confirm = self.max_skip_without_detection  # 새 모델로 즉시 전체 감지
+        print(f"🔁 세션 {self.session_id} 감지 모델 전환 (세대 {self._detector_generation})")
+
     def _initialize_object_detection(self):
         """
         물체 감지 모델을 초기화합니다.
@@ -490,7 +1189,9 @@ class VideoProcessor:
             return
         
         # 전역 YOLO 모델 가져오기
-        self.object_detector = get_global_yolo_detector()
+        self._bind_global_detector()
+        if self.cascade_detector is not None:
+            print("✅ 캐스케이드 감지 사용 (스크리너 → 컨퍼머)")
         
         if self.object_detector:
             print("✅ 물체 감지 모델 초기화 완료")
@@ -512,35 +1213,23 @@ class VideoProcessor:
             except Exception:
                 pass
     
-    def process_frame(self, frame: VideoFrame) -> VideoFrame:
+    def process_frame(self, frame: VideoFrame, trace=NULL_TRACE) -> VideoFrame:
         """
         비디오 프레임을 처리합니다.
-        별도 스레드에 프레임을 전달하고 즉시 반환합니다.
+        원본 프레임 참조를 메일박스에 넣고 즉시 반환합니다. (변환은 워커에서 필요할 때만 수행)
         
         @param {VideoFrame} frame - 처리할 비디오 프레임
-        @returns {VideoFrame} 처리된 비디오 프레임 (즉시 반환)
+        @param {FrameTrace} trace - 샘플링된 프레임의 추적 핸들
+        @returns {VideoFrame} 원본 비디오 프레임 (즉시 반환)
         """
         start_time = time()
         
         try:
-            # 프레임을 numpy 배열로 변환
-            img = frame.to_ndarray(format='bgr24')
-            
             # 프레임 카운터 증가
             self.frame_count += 1
             
-            # 별도 스레드에 프레임 전달 (큐가 가득 찬 경우 기존 항목 제거)
-            try:
-                if self.processed_frame_queue.full():
-                    try:
-                        self.processed_frame_queue.get_nowait()  # 기존 항목 제거
-                    except queue.Empty:
-                        pass
-                
-                self.processed_frame_queue.put_nowait((img, frame))
-                # print(f"📤 프레임을 별도 스레드에 전달: {self.frame_count}")
-            except queue.Full:
-                print(f"⚠️ 프레임 큐가 가득 참, 프레임 스킵: {self.frame_count}")
+            # 별도 스레드에 프레임 전달 (워커가 가져가기 전이면 최신 프레임으로 교체)
+            self.frame_mailbox.put(frame, trace)
             
             # 통계 업데이트
             self._update_stats(time() - start_time)
@@ -554,28 +1243,41 @@ class VideoProcessor:
     
     def get_processed_frame(self) -> Optional[VideoFrame]:
         """
-        처리된 프레임을 반환합니다.
-        출력 버퍼 큐에 프레임이 있으면 타이밍 큐의 PTS/time_base와 매칭하여 생성합니다.
-        처리된 프레임이 없으면 이전 프레임을 복제하여 반환합니다.
+        새로 처리된 프레임을 반환합니다.
+        출력 버퍼가 목표 크기를 넘으면 오래된 프레임을 버려 지연이 누적되지 않도록 합니다.
+        PTS/time_base는 호출 측(송출 페이싱 클럭)에서 설정합니다.
         
-        @returns {VideoFrame|None} 처리된 프레임 또는 이전 프레임 복제본
+        @returns {VideoFrame|None} 새로 처리된 프레임 (없으면 None)
         """
-        # 출력 버퍼 우선 사용 (이미지+타이밍 같이 보관)
         try:
-            if not self.output_frame_queue.empty():
-                img, pts, time_base = self.output_frame_queue.get_nowait()
-                vf = VideoFrame.from_ndarray(img, format='bgr24')
-                vf.pts = pts
-                vf.time_base = time_base
-                # 최신 프레임으로도 보관 (fallback 대비)
-                self.last_processed_frame = vf
-                return vf
-        except Exception:
-            pass
+            while self.output_frame_queue.qsize() > self.output_buffer_target:
+                self.output_frame_queue.get_nowait()
+            img, trace, queued_at = self.output_frame_queue.get_nowait()
+        except queue.Empty:
+            return None
         
-        if self.last_processed_frame is not None:
-            return self.last_processed_frame
-        return None
+        try:
+            t = trace.span('output_wait', queued_at)
+            video_frame = VideoFrame.from_ndarray(img, format='bgr24')
+            trace.span('video_frame', t)
+            self.last_output_trace = trace
+            return video_frame
+        except Exception as e:
+            print(f"⚠️ 출력 프레임 변환 오류: {e}")
+            return None
+    
+    def get_last_processed_frame(self) -> Optional[VideoFrame]:
+        """
+        마지막으로 처리된 이미지로 새 VideoFrame을 만들어 반환합니다. (킵얼라이브 재전송용)
+        
+        @returns {VideoFrame|None} 마지막 처리 프레임 복제본
+        """
+        if self.last_processed_image is None:
+            return None
+        try:
+            return VideoFrame.from_ndarray(self.last_processed_image, format='bgr24')
+        except Exception:
+            return None
     
 
     
@@ -724,6 +1426,16 @@ class VideoProcessor:
             stats['avg_processing_time'] = (
                 stats['processing_time'] / stats['processed_frames']
             )
+        stats['mailbox_replaced_frames'] = self.frame_mailbox.replaced_count
+        stats['governor_min_stride'] = inference_governor.min_stride(self._governor_key)
+        stats['high_severity_active'] = time() < self._high_severity_until
+        stats['safety_limit_frames'] = self._safety_limit(time())
+        if self.box_tracker is not None:
+            stats['box_tracker'] = self.box_tracker.get_stats()
+        if self.cascade_detector is not None:
+            stats['cascade'] = self.cascade_detector.get_stats()
+        if self.detection_cache is not None:
+            stats['detection_cache'] = self.detection_cache.get_stats()
         return stats
     
     def reset_stats(self):
@@ -761,6 +1473,7 @@ class VideoProcessor:
     def set_session_id(self, session_id: str) -> None:
         """세션 ID 설정 및 세션 저장소의 필터를 즉시 반영"""
         self.session_id = session_id
+        inference_governor.set_session(self._governor_key, session_id, session_state_manager.get_session_option(session_id, 'tier'))
         # 세션 변경 시, 클래스별 seen ID 초기화
         self.seen_track_ids_by_class = {}
         try:
@@ -787,6 +1500,14 @@ class VideoProcessor:
         except Exception as e:
             print(f"세션 비디오 필터 갱신 실패(session {session_id}): {e}")
 
+    def is_filtering_idle(self) -> bool:
+        """
+        감지할 클래스도 없고 블러도 꺼져 있어 프레임을 처리할 필요가 없는지 확인합니다.
+        
+        @returns {bool} 처리 불필요 여부
+        """
+        return not self.detection_filter.enabled_classes and not self.visualizer.enable_blur
+
     def _apply_blur_flag_from_session(self, session_id: str) -> None:
         """세션 저장소의 videoFilter.action.filtering 값을 읽어 블러 on/off 설정"""
         try:
@@ -806,6 +1527,7 @@ class VideoProcessor:
         """
         메인 스레드에서 감지 결과를 Data Channel로 전송합니다.
         클래스별로 새로운 ByteTrack ID가 등장할 때만 1회 전송합니다.
+        영역 감지의 임시 ID(음수)는 전체 감지에서 ByteTrack ID가 붙을 때까지 전송하지 않습니다.
         """
         if not self.data_channel or not self.current_detections:
             return
@@ -819,8 +1541,8 @@ class VideoProcessor:
             time_str = current_time.strftime("%H:%M:%S")
             
             for detection in detections:
-                # ByteTrack ID가 없으면 스킵
-                if detection.track_id is None:
+                # ByteTrack ID가 없거나 영역 감지 임시 ID면 스킵
+                if detection.track_id is None or detection.track_id < 0:
                     continue
                 class_id = detection.class_id
                 track_id = detection.track_id
@@ -850,6 +1572,7 @@ class VideoProcessor:
                 try:
                     json_message = json.dumps(message, ensure_ascii=False)
                     self.data_channel.send(json_message)
+                    alert_latency.record(self.session_id, ALERT_VIDEO, self._detections_ingest_time)
                     print(f"📨 신규 ID 감지 전송: class={class_id} id={track_id} category={category} detail={detail}")
                 except Exception as json_error:
                     print(f"❌ JSON 직렬화 오류: {json_error}")
@@ -863,6 +1586,7 @@ class VideoProcessor:
                     try:
                         json_message = json.dumps(simple_message, ensure_ascii=False)
                         self.data_channel.send(json_message)
+                        alert_latency.record(self.session_id, ALERT_VIDEO, self._detections_ingest_time)
                         print(f"📨 신규 ID 간단 전송: class={class_id} id={track_id} category={category}")
                     except Exception as retry_error:
                         print(f"❌ 재시도 전송 오류: {retry_error}")
@@ -986,110 +1710,205 @@ class VideoEchoTrack(MediaStreamTrack):
         
         # 프레임 전송을 위한 상태 관리
         self._last_sent_frame = None  # 마지막으로 전송한 프레임
-        self._frame_interval = 1.0 / 30.0  # 30fps 기준 (약 33ms)
-        self._last_send_time = 0.0
+        self.frames_in = 0  # 수신한 디코딩 프레임 수 (메트릭 수집기가 읽음)
+        self.frames_out = 0  # 송출한 프레임 수
         self._processing_task: Optional[asyncio.Task] = None
         self._closed: bool = False
-        # PTS 기반 재생 타임라인 상태
-        self._playout_start_pts: Optional[int] = None
-        self._playout_start_time: float = 0.0
-        # 보류 중인 프레임(시간 도래 전 미리 꺼낸 프레임 보관)
-        self._pending_frame: Optional[VideoFrame] = None
-        self._pending_target_time: float = 0.0
+        
+        # 출력 페이싱 클럭 상태 (슬롯당 한 프레임만 송출)
+        self._target_fps: float = config.VIDEO_OUTPUT_FPS
+        self._frame_interval = 1.0 / self._target_fps  # 기본 30fps (약 33ms)
+        self._keepalive_interval = config.VIDEO_KEEPALIVE_INTERVAL
+        self._clock_start: Optional[float] = None
+        self._next_slot_time: float = 0.0
+        self._last_emit_time: float = 0.0
+        
+        # 인코딩 패킷 패스스루 상태 (필터링이 꺼진 세션은 디코딩/재인코딩 생략)
+        self._passthrough = None  # PassthroughController
+        self._passthrough_allowed: Callable[[], bool] = lambda: False
+        self._passthrough_queue: asyncio.Queue = asyncio.Queue(maxsize=120)
+        self._passthrough_pts_offset: Optional[int] = None
+        self._passthrough_wait_keyframe = False
+        self.input_size: Optional[Tuple[int, int]] = None  # 마지막 디코딩 프레임 (너비, 높이), 공유 인코더 패스스루 판단에 사용
         
         # 백그라운드 처리 루프 시작
         loop = asyncio.get_event_loop()
         self._processing_task = loop.create_task(self._processing_loop())
     
-    async def recv(self):
+    def set_session_id(self, session_id: str) -> None:
+        """
+        세션 ID를 설정하고 세션별 출력 FPS를 반영합니다.
+        
+        @param {str} session_id - 세션 ID
         """
-        처리된 비디오 프레임을 반환합니다.
-        별도 스레드에서 처리된 프레임이 있으면 사용하고, 없으면 이전 프레임을 복제하여 전송합니다.
+        self.video_processor.set_session_id(session_id)
+        output_fps = session_state_manager.get_session_option(session_id, 'outputFps')
+        if output_fps:
+            self.set_target_fps(output_fps)
+        self.update_passthrough_mode()
+    
+    def attach_passthrough(self, controller, allowed: Callable[[], bool]) -> None:
         """
-        current_time = time()
+        패스스루 컨트롤러를 연결합니다.
         
-        # 프레임 전송 간격 체크 (30fps 제한)
-        if current_time - self._last_send_time < self._frame_interval:
-            # 이전 프레임을 복제하여 전송
-            if self._last_sent_frame is not None:
-                return self._last_sent_frame
+        @param {PassthroughController} controller - 수신기 패스스루 컨트롤러
+        @param {Callable} allowed - 하위 송신 경로가 인코딩 패킷을 받을 수 있는지 반환하는 함수
+        """
+        self._passthrough = controller
+        self._passthrough_allowed = allowed
+        if controller is not None:
+            controller.on_stream_change = self._on_passthrough_stream_change
+        self.update_passthrough_mode()
+    
+    def _on_passthrough_stream_change(self) -> None:
+        # 해상도를 모르는 상태로 되돌려 다음 디코딩 프레임에서 패스스루 여부를 다시 판단
+        self.input_size = None
+    
+    def update_passthrough_mode(self) -> None:
+        """
+        필터 설정과 송신 경로를 확인해 패스스루 모드를 요청/해제합니다.
+        비디오 카테고리가 모두 꺼져 있고 filtering=false일 때만 패스스루합니다.
+        """
+        if self._passthrough is None:
+            return
+        enabled = (
+            config.VIDEO_PASSTHROUGH_ENABLED
+            and self._passthrough_allowed()
+            and self.video_processor.is_filtering_idle()
+        )
+        self._passthrough.set_bypass(enabled)
+    
+    def _passthrough_active(self) -> bool:
+        if not self._passthrough_queue.empty():
+            return True
+        return self._passthrough is not None and self._passthrough.bypassing
+    
+    def _enqueue_passthrough(self, packet) -> None:
+        """수신 패킷을 패스스루 큐에 넣습니다. 넘치면 비우고 다음 키프레임부터 다시 전달합니다."""
+        if self._passthrough_wait_keyframe:
+            if not is_h264_keyframe(bytes(packet)):
+                return
+            self._passthrough_wait_keyframe = False
+        if self._passthrough_queue.full():
+            while not self._passthrough_queue.empty():
+                self._passthrough_queue.get_nowait()
+            self._passthrough_wait_keyframe = True
+            if self._passthrough is not None:
+                self._passthrough._request_keyframe()
+            return
+        self._passthrough_queue.put_nowait(packet)
+    
+    def _rebase_packet(self, packet):
+        """수신 패킷 PTS를 출력 클럭 기준으로 옮겨 프레임 송출과 타임라인을 이어 붙입니다."""
+        now = asyncio.get_event_loop().time()
+        if self._clock_start is None:
+            self._clock_start = now
+            self._next_slot_time = now
+        if self._passthrough_pts_offset is None:
+            clock_pts = int((now - self._clock_start) * VIDEO_CLOCK_RATE)
+            self._passthrough_pts_offset = clock_pts - packet.pts
+        packet.pts += self._passthrough_pts_offset
+        packet.time_base = VIDEO_TIME_BASE
+        return packet
+    
+    def set_target_fps(self, fps: float) -> None:
+        """
+        출력 목표 프레임 레이트를 설정합니다. 서버 기본 FPS(VIDEO_OUTPUT_FPS)보다 높게 올릴 수 없습니다.
         
-        # 보류 프레임이 있고 아직 재생 시각이 아니면 이전 프레임 유지
-        if self._pending_frame is not None:
-            if current_time + 0.0005 < self._pending_target_time and self._last_sent_frame is not None:
-                return self._last_sent_frame
-            else:
-                # 시각 도래 → 보류 프레임 송출
-                processed_frame = self._pending_frame
-                self._pending_frame = None
-                self._pending_target_time = 0.0
-                self._last_sent_frame = processed_frame
-                self._last_send_time = current_time
-                self.video_processor.process_detection_results()
-                return processed_frame
-
-        # VideoProcessor에서 처리된 프레임 가져오기
-        processed_frame = self.video_processor.get_processed_frame()
-        
-        if processed_frame is not None:
-            # PTS 기반 재생 타임라인 매핑
-            try:
-                frame_pts = processed_frame.pts
-                frame_tb = processed_frame.time_base
-                if frame_pts is not None and frame_tb is not None:
-                    if self._playout_start_pts is None:
-                        self._playout_start_pts = frame_pts
-                        self._playout_start_time = current_time
-                    delta_pts = frame_pts - self._playout_start_pts
-                    target_time = self._playout_start_time + (delta_pts * float(frame_tb))
-                    if current_time + 0.0005 < target_time and self._last_sent_frame is not None:
-                        # 아직 재생 시각이 아니면 보류 후 직전 프레임 유지
-                        self._pending_frame = processed_frame
-                        self._pending_target_time = target_time
-                        return self._last_sent_frame
-                # 즉시 송출
-            except Exception:
-                pass
-
+        @param {float} fps - 목표 FPS (1 ~ VIDEO_OUTPUT_FPS, 유한하지 않은 값은 무시)
+        """
+        fps = float(fps)
+        if not math.isfinite(fps):
+            return
+        self._target_fps = max(1.0, min(config.VIDEO_OUTPUT_FPS, fps))
+        self._frame_interval = 1.0 / self._target_fps
+        print(f"🎞️ 비디오 출력 FPS 설정: {self._target_fps:.1f}")
+    
+    async def _wait_next_slot(self) -> float:
+        """
+        다음 프레임 슬롯 시각까지 대기합니다.
+        많이 뒤처진 경우 밀린 슬롯을 몰아서 송출하지 않고 현재 시각으로 재정렬합니다.
+        
+        @returns {float} 이번 슬롯의 시각 (event loop 시간)
+        """
+        loop = asyncio.get_event_loop()
+        now = loop.time()
+        if self._clock_start is None:
+            self._clock_start = now
+            self._next_slot_time = now
+        
+        wait = self._next_slot_time - now
+        if wait > 0:
+            await asyncio.sleep(wait)
+        elif -wait > self._frame_interval * 3:
+            self._next_slot_time = now
+        
+        slot_time = self._next_slot_time
+        self._next_slot_time += self._frame_interval
+        return slot_time
+    
+    async def recv(self):
+        """
+        처리된 비디오 프레임을 페이싱 클럭에 맞춰 반환합니다.
+        슬롯마다 새로 처리된 프레임을 한 번만 송출하고, 새 프레임이 없으면 다음 슬롯까지 기다립니다.
+        새 프레임이 킵얼라이브 간격 이상 없을 때만 직전 프레임을 다시 송출합니다.
+        """
+        while True:
+            if self.readyState != "live":
+                raise MediaStreamError
+            
+            # 패스스루 중이면 수신한 인코딩 패킷을 그대로 송출
+            if self._passthrough_active():
+                try:
+                    packet = await asyncio.wait_for(self._passthrough_queue.get(), timeout=self._frame_interval)
+                except asyncio.TimeoutError:
+                    continue
+                return self._rebase_packet(packet)
+            self._passthrough_pts_offset = None
+            
+            slot_time = await self._wait_next_slot()
+            
+            # VideoProcessor에서 새로 처리된 프레임 가져오기
+            processed_frame = self.video_processor.get_processed_frame()
+            if processed_frame is None:
+                if self._last_sent_frame is None or slot_time - self._last_emit_time < self._keepalive_interval:
+                    continue
+                processed_frame = self.video_processor.get_last_processed_frame()
+                if processed_frame is None:
+                    continue
+            
+            # 출력 클럭 기준 PTS 부여
+            processed_frame.pts = int((slot_time - self._clock_start) * VIDEO_CLOCK_RATE)
+            processed_frame.time_base = VIDEO_TIME_BASE
+            # 샘플 프레임이면 공유 인코더가 같은 PTS의 인코딩 구간을 이어 기록
+            frame_tracer.mark_output(self.video_processor.session_id, processed_frame.pts, self.video_processor.last_output_trace)
+            self.video_processor.last_output_trace = NULL_TRACE
+            
             self._last_sent_frame = processed_frame
-            self._last_send_time = current_time
+            self._last_emit_time = slot_time
+            self.frames_out += 1
             
             # 메인 스레드에서 감지 결과 처리
             self.video_processor.process_detection_results()
-            
-            # print(f"📤 처리된 프레임 전송: {self.video_processor.frame_count}")
             return processed_frame
-        else:
-            # 처리된 프레임이 없으면 원본 프레임 사용
-            original_frame = await self.track.recv()
-            
-            # PTS 문제 해결: 프레임 복제 시 올바른 PTS 설정
-            if self._last_sent_frame is None:
-                # 첫 번째 프레임인 경우 원본 사용
-                self._last_sent_frame = original_frame
-                self._last_send_time = current_time
-                print(f"📤 원본 프레임 전송 (처리된 프레임 없음)")
-                return original_frame
-            else:
-                                 # 이전 프레임을 복제하여 전송하되, 올바른 PTS 설정
-                 # VideoFrame을 numpy 배열로 변환 후 다시 VideoFrame으로 생성
-                 img_array = self._last_sent_frame.to_ndarray(format='bgr24')
-                 cloned_frame = VideoFrame.from_ndarray(img_array, format='bgr24')
-                 cloned_frame.pts = original_frame.pts
-                 cloned_frame.time_base = original_frame.time_base
-                 # rate 속성은 VideoFrame에 없으므로 제거
-                 self._last_send_time = current_time
-                 print(f"📤 이전 프레임 복제 전송 (처리된 프레임 없음)")
-                 return cloned_frame
 
     async def _processing_loop(self) -> None:
         """원본 트랙에서 프레임을 지속적으로 읽어 별도 스레드에 전달."""
         try:
             while not self._closed:
                 frame = await self.track.recv()
+                if not isinstance(frame, VideoFrame):
+                    # 패스스루 패킷은 디코딩 없이 송출 큐로 전달
+                    self._enqueue_passthrough(frame)
+                    continue
+                self.frames_in += 1
+                if (frame.width, frame.height) != self.input_size:
+                    self.input_size = (frame.width, frame.height)
+                    self.update_passthrough_mode()
+                trace = frame_tracer.start(self.video_processor.session_id, 'video')
                 try:
                     # VideoProcessor에 프레임 전달 (별도 스레드에서 처리)
-                    self.video_processor.process_frame(frame)
+                    self.video_processor.process_frame(frame, trace)
                 except Exception as e:
                     print(f"⚠️ 비디오 프레임 처리 오류: {e}")
         except asyncio.CancelledError:
@@ -1105,9 +1924,17 @@ class VideoEchoTrack(MediaStreamTrack):
             return
         self._closed = True
         
-        # VideoProcessor의 별도 스레드 중지
-        if hasattr(self.video_processor, '_stop_processing_thread'):
-            self.video_processor._stop_processing_thread()
+        # 패스스루 탭 해제 (수신기 디코더 큐 복원)
+        if self._passthrough is not None:
+            self._passthrough.uninstall()
+            self._passthrough = None
+        
+        # VideoProcessor의 별도 스레드 중지 및 프레임 버퍼 해제
+        self.video_processor.release_resources()
+        while not self._passthrough_queue.empty():
+            self._passthrough_queue.get_nowait()
+        self._last_sent_frame = None
+        self.data_channel = None
         
         try:
             if self._processing_task:
@@ -29,6 +29,46 @@ class Config:
     TWILIO_ACCOUNT_SID: str = os.getenv("ACCOUNT_SID", "")
     TWILIO_AUTH_TOKEN: str = os.getenv("AUTH_TOKEN", "")
     
+    # 관리자 API 토큰 (비어 있으면 관리자 API 비활성화)
+    ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+    
+    # BE → AI 호출 토큰 (세션 티어 등 클라이언트가 정하면 안 되는 값 설정용, 비어 있으면 해당 API 비활성화)
+    BACKEND_TOKEN: str = os.getenv("BACKEND_TOKEN", "")
+    
+    # 세션 유휴 타임아웃(초): 피어가 연결되지 않은 채 이 시간이 지나면 세션 자원 해제 (0이면 비활성화)
+    SESSION_IDLE_TIMEOUT: float = float(os.getenv("SESSION_IDLE_TIMEOUT", "120"))
+    
+    # 세션 입장 제어 (측정한 세션별 코어 비용으로 남은 용량 추정, 꺼져 있어도 /capacity는 추정값을 보고)
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "false").lower() == "true"
+    ADMISSION_TARGET_UTILIZATION: float = float(os.getenv("ADMISSION_TARGET_UTILIZATION", "0.8"))  # 코어 수 대비 사용 목표
+    ADMISSION_MAX_SESSIONS: int = int(os.getenv("ADMISSION_MAX_SESSIONS", "0"))  # 하드 상한 (0이면 용량 추정만 사용)
+    ADMISSION_AUDIO_COST: float = float(os.getenv("ADMISSION_AUDIO_COST", "0.5"))  # 측정 전 오디오 세션 비용 사전값(코어)
+    ADMISSION_AUDIO_CORES_PER_RTF: float = float(os.getenv("ADMISSION_AUDIO_CORES_PER_RTF", "1.0"))  # STT 실시간 계수 1당 코어 (/capacity와 프로세스 CPU로 보정)
+    ADMISSION_VIDEO_COST: float = float(os.getenv("ADMISSION_VIDEO_COST", "0.8"))  # 측정 전 비디오 세션 비용 사전값(코어)
+    
+    # 멀티 프로세스 샤딩 (2 이상이면 슈퍼바이저가 모델을 한 번 로드한 뒤 워커를 fork하고 라우터가 세션 ID로 분배)
+    SUPERVISOR_WORKERS: int = int(os.getenv("SUPERVISOR_WORKERS", "0"))
+    SUPERVISOR_WORKER_BASE_PORT: int = int(os.getenv("SUPERVISOR_WORKER_BASE_PORT", "0"))  # 0이면 PORT+1부터
+    
+    # 검열 알림 지연 SLO (수신 시각 → Data Channel 전송, 초)
+    ALERT_SLO_AUDIO_SECONDS: float = float(os.getenv("ALERT_SLO_AUDIO_SECONDS", "5.0"))  # 3초 윈도 + STT 포함
+    ALERT_SLO_VIDEO_SECONDS: float = float(os.getenv("ALERT_SLO_VIDEO_SECONDS", "1.0"))
+    
+    # 프레임 단계 추적 (샘플링 비율 0이면 끔, 세션별 링 버퍼에 보관할 최대 구간 수)
+    TRACE_SAMPLE_RATE: float = float(os.getenv("TRACE_SAMPLE_RATE", "0.0"))
+    TRACE_RING_SIZE: int = int(os.getenv("TRACE_RING_SIZE", "20000"))
+    
+    # 이벤트 루프 지연 감시 (하트비트 간격, 지연 예산, 분위수 계산 구간 샘플 수, 보관할 멈춤 기록 수)
+    LOOP_MONITOR_ENABLED: bool = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() == "true"
+    LOOP_MONITOR_INTERVAL: float = float(os.getenv("LOOP_MONITOR_INTERVAL", "0.1"))
+    LOOP_LAG_BUDGET_SECONDS: float = float(os.getenv("LOOP_LAG_BUDGET_SECONDS", "0.05"))
+    LOOP_MONITOR_WINDOW: int = int(os.getenv("LOOP_MONITOR_WINDOW", "600"))  # 0.1초 간격이면 최근 1분
+    LOOP_MONITOR_SLOW_CALLBACKS: int = int(os.getenv("LOOP_MONITOR_SLOW_CALLBACKS", "50"))
+    
+    # 실행 중 프로파일링 (CPU 샘플링 최대 시간(초), tracemalloc 할당 위치당 보관 프레임 수)
+    PROFILE_MAX_SECONDS: float = float(os.getenv("PROFILE_MAX_SECONDS", "60"))
+    TRACEMALLOC_FRAMES: int = int(os.getenv("TRACEMALLOC_FRAMES", "10"))
+    
     # WebRTC 설정
     ICE_SERVERS = [
         {"urls": ["stun:stun.l.google.com:19302"]},
@@ -42,6 +82,70 @@ class Config:
     # 오디오 처리 설정
     AUDIO_RECOGNITION_ENABLED: bool = os.getenv("AUDIO_RECOGNITION_ENABLED", "true").lower() == "true"
     
+    # 시작 시 모델 워밍업 설정 (첫 세션이 지연 초기화 비용을 치르지 않도록 합성 입력으로 미리 추론)
+    MODEL_WARMUP_RUNS: int = int(os.getenv("MODEL_WARMUP_RUNS", "2"))  # 해상도/모델별 실행 횟수 (0이면 생략)
+    VIDEO_WARMUP_RESOLUTIONS: str = os.getenv("VIDEO_WARMUP_RESOLUTIONS", "640x480,1280x720")
+    WHISPER_WARMUP_TIERS: str = os.getenv("WHISPER_WARMUP_TIERS", "small")  # 워밍업할 Whisper 모델 크기 목록
+    MODEL_NOT_READY_RETRY_SECONDS: float = float(os.getenv("MODEL_NOT_READY_RETRY_SECONDS", "3"))  # 모델 준비 전 offer 거부 시 클라이언트 재시도 권장 간격(초)
+    
+    # 비디오 출력 페이싱 설정
+    VIDEO_OUTPUT_FPS: float = float(os.getenv("VIDEO_OUTPUT_FPS", "30"))
+    VIDEO_KEEPALIVE_INTERVAL: float = float(os.getenv("VIDEO_KEEPALIVE_INTERVAL", "1.0"))  # 새 프레임이 없을 때 직전 프레임 재전송 간격(초)
+    
+    # 공유 인코더 설정 (처리된 비디오를 한 번만 인코딩해 클라이언트/스트리밍 서버에 분배)
+    VIDEO_SHARED_ENCODER_ENABLED: bool = os.getenv("VIDEO_SHARED_ENCODER_ENABLED", "true").lower() == "true"
+    VIDEO_SHARED_ENCODER_BITRATE: int = int(os.getenv("VIDEO_SHARED_ENCODER_BITRATE", "1500000"))
+    VIDEO_SHARED_ENCODER_GOP_SECONDS: float = float(os.getenv("VIDEO_SHARED_ENCODER_GOP_SECONDS", "2.0"))
+    # 필터링이 꺼진 세션은 수신 H.264 패킷을 디코딩/재인코딩 없이 그대로 전달
+    VIDEO_PASSTHROUGH_ENABLED: bool = os.getenv("VIDEO_PASSTHROUGH_ENABLED", "true").lower() == "true"
+    
+    # 감지 사이 박스 전파 설정 (스킵 프레임에서 광학 흐름으로 블러 박스 이동)
+    VIDEO_BOX_TRACKING_ENABLED: bool = os.getenv("VIDEO_BOX_TRACKING_ENABLED", "true").lower() == "true"
+    VIDEO_BOX_TRACK_MAX_AGE: int = int(os.getenv("VIDEO_BOX_TRACK_MAX_AGE", "15"))  # 감지 없이 이동시킬 최대 프레임 수
+    
+    # 모션 영역 제한 추론 설정 (모션 영역 크롭만 배치 추론, 정지 영역은 추적 박스 유지)
+    VIDEO_ROI_INFERENCE_ENABLED: bool = os.getenv("VIDEO_ROI_INFERENCE_ENABLED", "true").lower() == "true"
+    VIDEO_ROI_MAX_AREA_RATIO: float = float(os.getenv("VIDEO_ROI_MAX_AREA_RATIO", "0.4"))  # 모션 영역 합이 이 비율을 넘으면 전체 프레임 감지
+    
+    # 노드 추론 거버너 설정 (전체 세션의 감지 예산을 부하에 맞춰 분배)
+    VIDEO_INFERENCE_CONCURRENCY: int = int(os.getenv("VIDEO_INFERENCE_CONCURRENCY", "0"))  # 동시 추론 슬롯 수 (0이면 코어 수의 절반)
+    VIDEO_GOVERNOR_TARGET_WAIT: float = float(os.getenv("VIDEO_GOVERNOR_TARGET_WAIT", "0.05"))  # 목표 추론 슬롯 대기 시간(초)
+    VIDEO_GOVERNOR_TARGET_CPU: float = float(os.getenv("VIDEO_GOVERNOR_TARGET_CPU", "0.85"))  # 목표 코어 평균 사용률
+    # 클래스 인지 감지 주기 (고위험 클래스 등장 후 일정 시간 촘촘히 감지, 장시간 빈 화면이면 완화)
+    VIDEO_HIGH_SEVERITY_CATEGORIES: str = os.getenv("VIDEO_HIGH_SEVERITY_CATEGORIES", "총기류,날카로운 도구")
+    VIDEO_HIGH_SEVERITY_WINDOW: float = float(os.getenv("VIDEO_HIGH_SEVERITY_WINDOW", "5.0"))  # 고위험 클래스 감지 후 촘촘한 주기 유지 시간(초)
+    VIDEO_HIGH_SEVERITY_STRIDE: int = int(os.getenv("VIDEO_HIGH_SEVERITY_STRIDE", "1"))  # 고위험 구간 감지 간격(프레임)
+    VIDEO_IDLE_RELAX_AFTER: float = float(os.getenv("VIDEO_IDLE_RELAX_AFTER", "10.0"))  # 빈 화면이 이 시간(초)마다 이어질 때 안전 주기 2배
+    VIDEO_IDLE_RELAX_MAX_FACTOR: int = int(os.getenv("VIDEO_IDLE_RELAX_MAX_FACTOR", "4"))  # 안전 주기 최대 완화 배수
+    # 2단계 캐스케이드 (경량 스크리너가 반응할 때만 전체 모델 실행)
+    VIDEO_CASCADE_ENABLED: bool = os.getenv("VIDEO_CASCADE_ENABLED", "false").lower() == "true"
+    VIDEO_SCREENER_MODEL_PATH: str = os.getenv("VIDEO_SCREENER_MODEL_PATH", "screener.pt")
+    VIDEO_SCREENER_CONFIDENCE: float = float(os.getenv("VIDEO_SCREENER_CONFIDENCE", "0.15"))  # 재현율 우선의 낮은 임계값
+    VIDEO_SCREENER_IMGSZ: int = int(os.getenv("VIDEO_SCREENER_IMGSZ", "320"))
+    # 노출 카테고리 전용 추가 모델 (경로가 비어 있으면 사용 안 함)
+    VIDEO_EXPOSURE_MODEL_PATH: str = os.getenv("VIDEO_EXPOSURE_MODEL_PATH", "")
+    VIDEO_EXPOSURE_MODEL_CLASSES: str = os.getenv("VIDEO_EXPOSURE_MODEL_CLASSES", "0")  # 노출로 볼 모델 클래스 ID 목록
+    VIDEO_EXPOSURE_MODEL_CADENCE: int = int(os.getenv("VIDEO_EXPOSURE_MODEL_CADENCE", "2"))  # 감지 N회마다 1회 실행
+    # 후보 모델 섀도 평가 (관리자 API로 시작)
+    VIDEO_SHADOW_SAMPLE_RATE: float = float(os.getenv("VIDEO_SHADOW_SAMPLE_RATE", "0.1"))  # 감지 프레임 중 평가 비율
+    VIDEO_SHADOW_CPU_BUDGET: float = float(os.getenv("VIDEO_SHADOW_CPU_BUDGET", "0.25"))  # 평가에 허용할 코어 비율
+    # 지각 해시 감지 캐시 (정지/반복 화면에서 감지 결과 재사용)
+    VIDEO_DETECTION_CACHE_ENABLED: bool = os.getenv("VIDEO_DETECTION_CACHE_ENABLED", "true").lower() == "true"
+    VIDEO_DETECTION_CACHE_SHARED: bool = os.getenv("VIDEO_DETECTION_CACHE_SHARED", "false").lower() == "true"  # 같은 cacheScope 세션 간 공유 캐시 사용
+    VIDEO_DETECTION_CACHE_SIZE: int = int(os.getenv("VIDEO_DETECTION_CACHE_SIZE", "64"))  # 세션별 최대 항목 수
+    VIDEO_DETECTION_CACHE_MAX_DISTANCE: int = int(os.getenv("VIDEO_DETECTION_CACHE_MAX_DISTANCE", "2"))  # 같은 장면으로 볼 해밍 거리
+    VIDEO_DETECTION_CACHE_TTL: float = float(os.getenv("VIDEO_DETECTION_CACHE_TTL", "30.0"))  # 항목 유효 시간(초)
+    # 세션 우선순위 티어 (이름:가중치:초당 추론 상한, 상한 0은 무제한)
+    VIDEO_PRIORITY_TIERS: str = os.getenv("VIDEO_PRIORITY_TIERS", "paid:4:0,free:1:0")
+    # 공유 메모리 추론 프로세스 (미디어 프로세스는 디코딩/인코딩만 하고 YOLO는 별도 프로세스에서 실행)
+    VIDEO_SHM_TRANSPORT_ENABLED: bool = os.getenv("VIDEO_SHM_TRANSPORT_ENABLED", "false").lower() == "true"
+    VIDEO_SHM_INFERENCE_PROCESSES: int = int(os.getenv("VIDEO_SHM_INFERENCE_PROCESSES", "0"))  # 추론 프로세스 수 (0이면 코어 수의 1/4)
+    VIDEO_SHM_RING_SLOTS: int = int(os.getenv("VIDEO_SHM_RING_SLOTS", "3"))  # 세션 링 슬롯 수
+    VIDEO_SHM_RESULT_TIMEOUT: float = float(os.getenv("VIDEO_SHM_RESULT_TIMEOUT", "0.5"))  # 결과 대기 시간(초), 초과 시 직전 결과 사용
+    VIDEO_SHM_READY_TIMEOUT: float = float(os.getenv("VIDEO_SHM_READY_TIMEOUT", "300"))  # 추론 프로세스 모델 로드 최대 대기 시간(초)
+    VIDEO_SHM_HEALTH_INTERVAL: float = float(os.getenv("VIDEO_SHM_HEALTH_INTERVAL", "1.0"))  # 추론 프로세스 생존 확인 주기(초)
+    VIDEO_SHM_MAX_RESPAWNS: int = int(os.getenv("VIDEO_SHM_MAX_RESPAWNS", "5"))  # 추론 프로세스 재시작 최대 횟수 (넘으면 공유 메모리 추론 중단)
+    
     @classmethod
     def get_yolo_model_path(cls) -> str:
         """
@@ -91,9 +195,22 @@ class Config:
         print(f"   스트리밍 서버: {cls.STREAMING_SERVER_URL}")
         print(f"   Twilio Account SID: {'설정됨' if cls.TWILIO_ACCOUNT_SID else '설정되지 않음'}")
         print(f"   Twilio Auth Token: {'설정됨' if cls.TWILIO_AUTH_TOKEN else '설정되지 않음'}")
+        print(f"   입장 제어: {'적용' if cls.ADMISSION_ENABLED else '보고만 (/capacity)'}")
+        print(f"   관리자 토큰: {'설정됨' if cls.ADMIN_TOKEN else '설정되지 않음 (관리자 API 비활성화)'}")
+        print(f"   BE 토큰: {'설정됨' if cls.BACKEND_TOKEN else '설정되지 않음 (티어 설정 API 비활성화)'}")
         print(f"   물체 감지: {'활성화' if cls.OBJECT_DETECTION_ENABLED else '비활성화'}")
         print(f"   음성 인식: {'활성화' if cls.AUDIO_RECOGNITION_ENABLED else '비활성화'}")
         print(f"   감지 신뢰도: {cls.OBJECT_DETECTION_CONFIDENCE}")
+        print(f"   알림 지연 SLO: 오디오 {cls.ALERT_SLO_AUDIO_SECONDS}초, 비디오 {cls.ALERT_SLO_VIDEO_SECONDS}초")
+        print(f"   프레임 추적 샘플링: {cls.TRACE_SAMPLE_RATE:.2%} (링 {cls.TRACE_RING_SIZE}구간)")
+        print(f"   이벤트 루프 감시: {'활성화' if cls.LOOP_MONITOR_ENABLED else '비활성화'} (예산 {cls.LOOP_LAG_BUDGET_SECONDS * 1000:.0f}ms)")
+        print(f"   모델 워밍업: {cls.MODEL_WARMUP_RUNS}회 (비디오 {cls.VIDEO_WARMUP_RESOLUTIONS}, Whisper {cls.WHISPER_WARMUP_TIERS})")
+        print(f"   비디오 출력 FPS: {cls.VIDEO_OUTPUT_FPS}")
+        print(f"   공유 인코더: {'활성화' if cls.VIDEO_SHARED_ENCODER_ENABLED else '비활성화'}")
+        print(f"   박스 전파: {'활성화' if cls.VIDEO_BOX_TRACKING_ENABLED else '비활성화'}")
+        print(f"   모션 영역 추론: {'활성화' if cls.VIDEO_ROI_INFERENCE_ENABLED else '비활성화'}")
+        print(f"   캐스케이드 감지: {'활성화 (' + cls.VIDEO_SCREENER_MODEL_PATH + ')' if cls.VIDEO_CASCADE_ENABLED else '비활성화'}")
+        print(f"   공유 메모리 추론: {'활성화' if cls.VIDEO_SHM_TRANSPORT_ENABLED else '비활성화'}")
 
 # 전역 설정 인스턴스
 config = Config()
@@ -8,21 +8,35 @@
 
 import sys
 import os
+import hmac
 
 # 현재 디렉토리를 Python 경로에 추가
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from fastapi import FastAPI, WebSocket, Depends, HTTPException
+from fastapi import FastAPI, WebSocket, Depends, HTTPException, Header, Query
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
 from server.dependencies import get_connection_manager
 from server.websocket_handler import handle_webrtc_message
+from webrtc.shared_encoder import attach_shared_video
 from session_state_manager import session_state_manager
-# 음성 테스트를 위해 비디오 프로세서 import 비활성화
-from ai_video.video_processor import initialize_global_yolo_model, is_global_yolo_initialized
+from server.readiness import model_readiness
+from server.session_lifecycle import session_lifecycle
+from server.admission import admission_controller, ADMIT_FULL, ADMIT_REJECTED
+from server.metrics import metrics, session_collector
+from server.alert_latency import alert_latency
+from server.tracing import frame_tracer
+from server.loop_monitor import loop_monitor
+from server.profiler import sampling_profiler, memory_profiler, PROFILE_FORMATS
+# torch/ultralytics/cv2, faster_whisper/scipy를 끌어오는 비디오/오디오 모듈은 설정에 따라
+# 준비 스레드(server.readiness)에서 임포트하고, 엔드포인트에서는 필요할 때 지연 임포트
+from ai_video.inference_governor import inference_governor
+from ai_video.inference_scheduler import inference_scheduler
 
 from config import config
 import json
+import math
 import asyncio
 import httpx
 from aiortc import RTCPeerConnection, RTCSessionDescription, RTCConfiguration, RTCIceServer
@@ -45,17 +59,28 @@ async def lifespan(app: FastAPI):
     # 설정 출력
     config.print_config()
     
-    # 전역 YOLO 모델 초기화
-    if initialize_global_yolo_model():
-        print(f"✅ 전역 YOLO 모델 초기화 완료: {config.get_yolo_model_path()}")
-    else:
-        print(f"❌ 전역 YOLO 모델 초기화 실패: {config.get_yolo_model_path()}")
-        print("⚠️ 물체 감지 기능이 비활성화됩니다.")
+    # YOLO/Whisper 임포트·로드·워밍업은 백그라운드 스레드에서 병렬로 진행 (포트는 바로 열림)
+    model_readiness.start()
+    
+    # 피어 종료/WebSocket 해제/유휴 타임아웃 시 세션 자원 해제
+    session_lifecycle.start(get_connection_manager())
+    
+    # /metrics 스크레이프 시 세션별 트랙/인식기 통계를 읽는 수집기
+    metrics.add_collector(session_collector(get_connection_manager()))
+    
+    # 이벤트 루프 스케줄링 지연 측정과 멈춘 콜백 스택 포착
+    loop_monitor.start()
     
     yield
     
     # 서버 종료 시 실행
     print("🛑 서버 종료 중...")
+    loop_monitor.stop()
+    memory_profiler.stop()
+    await session_lifecycle.shutdown()
+    if _video_module_loaded():
+        from ai_video.shm_transport import shm_inference_pool
+        shm_inference_pool.stop()
 
 app = FastAPI(title="FastAPI Unified Media Server", version="1.0.0", lifespan=lifespan)
 # FastAPI 상태로 등록
@@ -79,40 +104,129 @@ class FilterResponse(BaseModel):
     message: str
     session_id: str
 
-@app.on_event("startup")
-async def startup_event():
-    """
-    서버 시작 시 실행되는 이벤트
-    전역 YOLO 모델을 초기화합니다.
+class ModelSwapRequest(BaseModel):
+    modelPath: str
+    warmupRuns: int = 3
+
+class ShadowRequest(BaseModel):
+    modelPath: str
+    sampleRate: Optional[float] = None
+    cpuBudget: Optional[float] = None
+
+
+class TraceRequest(BaseModel):
+    sampleRate: float
+
+
+class TierRequest(BaseModel):
+    tier: str
+
+
+class CacheScopeRequest(BaseModel):
+    scope: Optional[str] = None
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)):
     """
-    print("🚀 서버 시작 중...")
+    관리자 API 토큰을 확인합니다. ADMIN_TOKEN이 설정되지 않았으면 관리자 API를 받지 않습니다.
     
-    # 설정 출력
-    config.print_config()
+    @param {str} x_admin_token - X-Admin-Token 헤더
+    @throws {HTTPException} 토큰 미설정 503, 불일치 401
+    """
+    if not config.ADMIN_TOKEN:
+        raise HTTPException(status_code=503, detail="ADMIN_TOKEN이 설정되지 않아 관리자 API가 비활성화되어 있습니다.")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, config.ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="관리자 토큰이 올바르지 않습니다.")
+
+def require_backend(x_backend_token: Optional[str] = Header(default=None)):
+    """
+    BE 서버 호출 토큰을 확인합니다. BACKEND_TOKEN이 설정되지 않았으면 요청을 받지 않습니다.
     
-    # 전역 YOLO 모델 초기화 (음성 테스트를 위해 비활성화)
-    print("🔇 비디오 처리가 비활성화되었습니다 (음성 테스트 모드)")
-    print("⚠️ 물체 감지 기능이 비활성화됩니다.")
-    # if initialize_global_yolo_model():
-    #     print(f"✅ 전역 YOLO 모델 초기화 완료: {config.get_yolo_model_path()}")
-    # else:
-    #     print(f"❌ 전역 YOLO 모델 초기화 실패: {config.get_yolo_model_path()}")
-    #     print("⚠️ 물체 감지 기능이 비활성화됩니다.")
+    @param {str} x_backend_token - X-Backend-Token 헤더
+    @throws {HTTPException} 토큰 미설정 503, 불일치 401
+    """
+    if not config.BACKEND_TOKEN:
+        raise HTTPException(status_code=503, detail="BACKEND_TOKEN이 설정되지 않아 BE 전용 API가 비활성화되어 있습니다.")
+    if not x_backend_token or not hmac.compare_digest(x_backend_token, config.BACKEND_TOKEN):
+        raise HTTPException(status_code=401, detail="BE 토큰이 올바르지 않습니다.")
 
 @app.get("/")
 async def root():
     """
     서버 상태 확인 엔드포인트
     
-    @returns {dict} 서버 실행 상태 메시지
+    @returns {dict} 서버 실행 상태 메시지 (ready는 모델 워밍업 완료 후 true)
     """
-    yolo_status = "활성화" if is_global_yolo_initialized() else "비활성화"
+    yolo_status = "활성화" if _video_module_loaded() and _video_module().is_global_yolo_initialized() else "비활성화"
     return {
         "message": "통합 미디어 서버 (비디오 + 오디오) 실행중",
+        "ready": model_readiness.is_ready,
         "yolo_model": yolo_status,
-        "model_path": config.get_yolo_model_path()
+        "model_path": config.get_yolo_model_path(),
+        "models": model_readiness.get_stats()
     }
 
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """
+    파이프라인 메트릭을 Prometheus 텍스트 형식으로 반환합니다.
+    
+    @returns {str} 세션별/전체 카운터, 게이지, 히스토그램
+    """
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/slo/alerts")
+async def get_alert_slo():
+    """
+    검열 알림 종단 간 지연 요약을 반환합니다.
+    
+    @returns {dict} 오디오/비디오별 지연 분위수, SLO 기준, 위반 수와 세션별 요약
+    """
+    return alert_latency.get_stats()
+
+
+@app.get("/loop/stats")
+async def get_loop_stats():
+    """
+    이벤트 루프 지연 분위수와 예산 초과 수, 최근 멈춤 기록(스택 제외)을 반환합니다.
+    
+    @returns {dict} 루프 지연 요약
+    """
+    return loop_monitor.get_stats(include_stacks=False)
+
+
+@app.get("/admin/loop/slow", dependencies=[Depends(require_admin)])
+async def get_slow_callbacks():
+    """
+    예산을 넘겨 루프를 멈춘 콜백의 포착 시점 스택을 반환합니다.
+    
+    @returns {dict} 루프 지연 요약과 멈춤 기록별 스택
+    """
+    return loop_monitor.get_stats()
+
+
+@app.get("/health/live")
+async def liveness():
+    """
+    생존 확인 엔드포인트. 이벤트 루프가 응답하면 모델 로딩 여부와 관계없이 200을 반환합니다.
+    
+    @returns {dict} 생존 상태
+    """
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """
+    준비 확인 엔드포인트. 활성화된 모델의 로드와 워밍업이 끝나기 전에는 503을 반환합니다.
+    
+    @returns {JSONResponse} 준비 상태와 구성 요소별 로딩 시간
+    """
+    stats = model_readiness.get_stats()
+    return JSONResponse(status_code=200 if stats['ready'] else 503, content=stats)
+
 @app.websocket("/ws")
 async def websocket_endpoint(
     websocket: WebSocket,
@@ -135,6 +249,12 @@ async def websocket_endpoint(
             message = await websocket.receive_text()
             try:
                 data = json.loads(message)
+                if data.get('sessionId') and data['sessionId'] != session_id:
+                    # 세션-WebSocket 연결 기록: 열린 소켓의 세션은 유휴 정리/필터 삭제 대상이 아님
+                    session_lifecycle.unbind_websocket(session_id, websocket)
+                    session_id = data['sessionId']
+                    session_lifecycle.bind_websocket(session_id, websocket)
+                session_lifecycle.touch(session_id)
 
                 # 세션 ID 설정 처리
                 if data['type'] == 'session_id':
@@ -144,6 +264,33 @@ async def websocket_endpoint(
                     # 세션 상태 관리자에 필터 설정 저장
                     session_state_manager.set_session_filter(session_id, filters)
 
+                    # 세션별 비디오 출력 FPS (선택, 1 ~ VIDEO_OUTPUT_FPS로 제한하고 잘못된 값은 무시)
+                    if data.get('outputFps') is not None:
+                        try:
+                            output_fps = float(data['outputFps'])
+                        except (TypeError, ValueError):
+                            output_fps = float('nan')
+                        if math.isfinite(output_fps):
+                            output_fps = max(1.0, min(config.VIDEO_OUTPUT_FPS, output_fps))
+                            session_state_manager.set_session_option(session_id, 'outputFps', output_fps)
+                        else:
+                            print(f"⚠️ [{session_id}] 잘못된 outputFps 무시: {data['outputFps']!r}")
+
+                    # 우선순위 티어는 클라이언트 메시지를 믿지 않고 BE 호출(/sessions/{id}/tier)로만 설정
+
+                    # 입장 제어: 용량이 부족하면 오디오 전용으로 강등하거나 거부
+                    decision = admission_controller.admit(manager, session_id)
+                    if decision != ADMIT_FULL:
+                        await websocket.send_text(json.dumps({
+                            "type": "admission",
+                            "sessionId": session_id,
+                            "decision": decision,
+                            "capacity": admission_controller.estimate(manager, exclude=session_id)['remaining_sessions'],
+                        }))
+                    if decision == ADMIT_REJECTED:
+                        await websocket.close(code=1013)  # Try Again Later
+                        break
+
                     manager.peer_connections[session_id] = {}
                     manager.added_tracks[session_id] = {}
                     print(f"📝 세션 ID 설정: {session_id}")
@@ -165,6 +312,12 @@ async def websocket_endpoint(
                 manager.disconnect(websocket)
     except Exception as e:
         print(f"❌ WebSocket 종료 에러: {e}")
+    finally:
+        # WebSocket이 끊기면 해당 세션의 피어 연결, 처리 트랙, 인코더, 스트리밍 연결까지 모두 해제
+        manager.disconnect(websocket)
+        # 같은 세션이 새 WebSocket으로 다시 연결됐으면 그 세션은 건드리지 않음
+        if session_lifecycle.unbind_websocket(session_id, websocket):
+            await session_lifecycle.teardown(session_id, 'websocket_disconnect')
 
 
 @app.post("/stream/{session_id}/start")
@@ -252,8 +405,12 @@ async def start_stream(session_id: str, body: dict, manager = Depends(get_connec
 
     # 처리된 트랙을 addTrack (VideoEchoTrack, AudioEchoTrack 자체가 MediaStreamTrack)
     relay = MediaRelay()
+    shared_encoder = manager.shared_encoders.get(session_id)
     if "video" in tracks and tracks["video"] is not None:
-        pc.addTrack(relay.subscribe(tracks["video"]))
+        if shared_encoder is not None:
+            pc.addTrack(shared_encoder.subscribe_raw())
+        else:
+            pc.addTrack(relay.subscribe(tracks["video"]))
     if "audio" in tracks and tracks["audio"] is not None:
         pc.addTrack(relay.subscribe(tracks["audio"]))
 
@@ -261,6 +418,9 @@ async def start_stream(session_id: str, body: dict, manager = Depends(get_connec
     answer = await pc.createAnswer()
     await pc.setLocalDescription(answer)
 
+    # H.264로 협상되었으면 클라이언트와 같은 인코딩 결과를 공유
+    attach_shared_video(pc, shared_encoder, streaming=True)
+
     # ICE gathering complete 대기 (no-trickle 방식)
     async def wait_ice_complete(connection: RTCPeerConnection, timeout: float = 5.0):
         elapsed = 0.0
@@ -289,6 +449,8 @@ async def start_stream(session_id: str, body: dict, manager = Depends(get_connec
             while True:
                 await asyncio.sleep(3.0)
                 state = pc.connectionState
+                if manager.streaming_peer_connections.get(session_id) is not pc:
+                    break  # 중지 요청 또는 세션 해제로 교체/제거된 연결은 재연결하지 않음
                 if state in ("failed", "closed"):
                     print(f"♻️ [streaming-webrtc][{session_id}] 상태 {state} → 재연결 시도")
                     try:
@@ -329,10 +491,76 @@ async def stop_stream(session_id: str, manager = Depends(get_connection_manager)
 
 
 
+def _video_module_loaded() -> bool:
+    """비디오 처리 모듈이 이미 임포트되었는지 확인합니다. (임포트를 유발하지 않음)"""
+    return 'ai_video.video_processor' in sys.modules
+
+
+def _video_module():
+    """
+    물체 감지가 활성화된 경우에만 비디오 처리 모듈을 반환합니다.
+    
+    @returns {module} ai_video.video_processor
+    @throws {HTTPException} 물체 감지가 비활성화된 경우 503
+    """
+    if not config.OBJECT_DETECTION_ENABLED:
+        raise HTTPException(status_code=503, detail="물체 감지가 비활성화되어 있습니다.")
+    from ai_video import video_processor
+    return video_processor
+
+
+def _shadow_evaluator():
+    """
+    물체 감지가 활성화된 경우에만 섀도 평가기를 반환합니다.
+    
+    @returns {ShadowEvaluator} 전역 섀도 평가기
+    @throws {HTTPException} 물체 감지가 비활성화된 경우 503
+    """
+    _video_module()
+    from ai_video.shadow_evaluator import shadow_evaluator
+    return shadow_evaluator
+
+
 # 세션별 필터 설정 저장소 (실제 운영에서는 Redis나 DB 사용 권장)
 session_filters = {}
 
 
+@app.post("/sessions/{session_id}/tier", dependencies=[Depends(require_backend)])
+async def set_session_tier(session_id: str, tier_request: TierRequest, manager = Depends(get_connection_manager)):
+    """
+    세션 우선순위 티어를 설정합니다. (BE 전용: 결제 상태는 BE가 확인하고 클라이언트가 보낸 값은 쓰지 않음)
+    
+    @param {str} session_id - 세션 ID
+    @param {TierRequest} tier_request - 티어 이름 (VIDEO_PRIORITY_TIERS에 정의된 이름)
+    @returns {dict} 적용된 티어와 가중치
+    """
+    if tier_request.tier not in inference_scheduler.tiers:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 티어: {tier_request.tier}")
+    session_state_manager.set_session_option(session_id, 'tier', tier_request.tier)
+    
+    # 이미 비디오 트랙이 있으면 스케줄러/거버너에 즉시 반영
+    track = manager.added_tracks.get(session_id, {}).get('video')
+    processor = getattr(track, 'video_processor', None)
+    weight = None
+    if processor is not None:
+        weight = inference_governor.set_session(processor._governor_key, session_id, tier_request.tier)
+    return {'session_id': session_id, 'tier': tier_request.tier, 'weight': weight}
+
+
+@app.post("/sessions/{session_id}/cache-scope", dependencies=[Depends(require_backend)])
+async def set_session_cache_scope(session_id: str, scope_request: CacheScopeRequest):
+    """
+    세션의 공유 감지 캐시 범위를 설정합니다. (BE 전용: 같은 원본을 재송출하는 세션에 같은 범위를 지정)
+    VIDEO_DETECTION_CACHE_SHARED가 켜져 있고 범위가 같은 세션끼리만 감지 결과를 공유합니다.
+    
+    @param {str} session_id - 세션 ID
+    @param {CacheScopeRequest} scope_request - 범위 이름 (None이면 공유 해제)
+    @returns {dict} 적용된 범위
+    """
+    session_state_manager.set_session_option(session_id, 'cacheScope', scope_request.scope or None)
+    return {'session_id': session_id, 'scope': scope_request.scope or None, 'shared_cache_enabled': config.VIDEO_DETECTION_CACHE_SHARED}
+
+
 @app.post("/sessions/{session_id}/filter")
 async def update_session_filters(session_id: str, filter_request: FilterRequest, manager = Depends(get_connection_manager)):
     """
@@ -358,6 +586,9 @@ async def update_session_filters(session_id: str, filter_request: FilterRequest,
                 # VideoEchoTrack → VideoProcessor에 위임된 헬퍼 호출
                 if hasattr(track, 'video_processor') and hasattr(track.video_processor, 'apply_video_filter_for_session'):
                     track.video_processor.apply_video_filter_for_session(session_id)
+                # 필터가 켜지면 다음 키프레임에서 전체 파이프라인으로 복귀 (꺼지면 패스스루)
+                if hasattr(track, 'update_passthrough_mode'):
+                    track.update_passthrough_mode()
         except Exception:
             pass
 
@@ -382,6 +613,219 @@ async def update_session_filters(session_id: str, filter_request: FilterRequest,
 
 
 
+@app.get("/inference/stats")
+async def get_inference_stats():
+    """
+    노드 추론 거버너와 스케줄러 상태를 반환합니다.
+    
+    @returns {dict} 노드 감지 예산, 세션별 할당, 세션별 대기/처리 시간
+    """
+    stats = {
+        "governor": inference_governor.get_stats(),
+        "scheduler": inference_scheduler.get_stats(),
+    }
+    if _video_module_loaded():
+        from ai_video.detection_cache import shared_detection_cache
+        stats["shared_detection_cache"] = shared_detection_cache.get_stats()
+        if config.VIDEO_SHM_TRANSPORT_ENABLED:
+            from ai_video.shm_transport import shm_inference_pool
+            stats["shm_inference"] = shm_inference_pool.get_stats()
+    return stats
+
+
+@app.get("/capacity")
+async def get_capacity(manager = Depends(get_connection_manager)):
+    """
+    노드의 남은 세션 용량을 반환합니다. BE는 remaining_sessions가 0인 노드를 피해 라우팅합니다.
+    
+    @returns {dict} 코어 예산/사용량, 세션 종류별 예상 비용, 추가 수용 가능한 세션 수, 입장 결정 통계
+    """
+    return admission_controller.get_stats(manager)
+
+
+@app.get("/sessions/{session_id}/trace")
+async def get_session_trace(session_id: str):
+    """
+    세션의 샘플링된 프레임 단계 구간을 Chrome trace-event JSON으로 반환합니다. (chrome://tracing, Perfetto에서 열기)
+    
+    @param {str} session_id - 세션 ID
+    @returns {JSONResponse} traceEvents 목록
+    """
+    trace = frame_tracer.export(session_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"세션 {session_id}의 추적 기록이 없습니다 (TRACE_SAMPLE_RATE 확인)")
+    return JSONResponse(content=trace)
+
+
+@app.get("/sessions/resources")
+async def get_session_resources(collect: bool = False):
+    """
+    세션별 자원 집계를 반환합니다. 활성 세션이 없으면 모든 맵과 살아 있는 세션 객체 수가 0이어야 합니다.
+    
+    @param {bool} collect - 집계 전에 가비지 컬렉션 실행 여부
+    @returns {dict} 연결 관리자 맵 크기, 세션 상태 수, 살아 있는 세션 객체 수, 스레드 수
+    """
+    return session_lifecycle.get_accounting(collect)
+
+
+@app.post("/admin/model/swap", dependencies=[Depends(require_admin)])
+async def swap_model(swap_request: ModelSwapRequest):
+    """
+    YOLO 가중치를 서비스 중단 없이 교체합니다.
+    백그라운드 스레드에서 로드/워밍업한 뒤 모든 세션을 프레임 사이에 새 모델로 전환합니다.
+    
+    @param {ModelSwapRequest} swap_request - 새 가중치 경로와 워밍업 횟수
+    @returns {dict} 로드 시간, 워밍업 시간, 교체 정지 시간, 드레인 시간
+    @throws {HTTPException} 잘못된 경로 400, 교체 진행 중 409, 로드 실패 500
+    """
+    if not os.path.isfile(swap_request.modelPath):
+        raise HTTPException(status_code=400, detail=f"모델 파일이 존재하지 않습니다: {swap_request.modelPath}")
+    video_processor = _video_module()
+    try:
+        loop = asyncio.get_event_loop()
+        if video_processor.shm_inference_pool.is_running:
+            # 공유 메모리 추론 모드에서는 모델이 추론 프로세스에만 있으므로 각 프로세스에서 교체
+            return await loop.run_in_executor(None, video_processor.shm_inference_pool.swap, swap_request.modelPath, swap_request.warmupRuns)
+        return await loop.run_in_executor(None, video_processor.swap_global_yolo_model, swap_request.modelPath, swap_request.warmupRuns)
+    except video_processor.ModelSwapInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"모델 교체 실패: {e}")
+
+
+@app.post("/admin/trace", dependencies=[Depends(require_admin)])
+async def set_trace_sample_rate(trace_request: TraceRequest):
+    """
+    프레임 단계 추적 샘플링 비율을 바꿉니다. (0이면 끔, 0.01이면 1%)
+    
+    @param {TraceRequest} trace_request - 샘플링 비율
+    @returns {dict} 추적 상태
+    """
+    frame_tracer.set_sample_rate(trace_request.sampleRate)
+    return frame_tracer.get_stats()
+
+
+@app.get("/admin/trace", dependencies=[Depends(require_admin)])
+async def get_trace_stats():
+    """
+    프레임 단계 추적 상태(샘플링 비율, 세션별 기록 구간 수)를 반환합니다.
+    
+    @returns {dict} 추적 상태
+    """
+    return frame_tracer.get_stats()
+
+
+@app.get("/admin/profile/cpu", dependencies=[Depends(require_admin)])
+async def profile_cpu(
+    seconds: float = Query(10.0, gt=0),
+    interval: float = Query(0.01, gt=0),
+    mode: str = Query('cpu'),
+    format: str = Query('collapsed'),
+):
+    """
+    이벤트 루프, 세션별 비디오 워커, STT 워커를 포함한 모든 스레드를 시간 제한 통계 샘플링으로 프로파일링합니다.
+    샘플링은 실행기 스레드에서 돌므로 그동안 루프와 세션 처리는 계속됩니다.
+    
+    @param {float} seconds - 샘플링 시간(초, PROFILE_MAX_SECONDS로 제한)
+    @param {float} interval - 샘플 간격(초)
+    @param {str} mode - cpu(스레드 CPU 시간 가중) | wall(대기 포함)
+    @param {str} format - collapsed(flamegraph.pl/speedscope 텍스트) | speedscope(JSON)
+    @returns {PlainTextResponse|JSONResponse} 프로파일
+    """
+    if format not in PROFILE_FORMATS:
+        raise HTTPException(status_code=400, detail=f"format은 {', '.join(PROFILE_FORMATS)} 중 하나여야 합니다")
+    try:
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(None, sampling_profiler.profile, seconds, interval, mode)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if format == 'speedscope':
+        return JSONResponse(content=sampling_profiler.to_speedscope(result))
+    return PlainTextResponse(sampling_profiler.to_collapsed(result))
+
+
+@app.post("/admin/profile/memory", dependencies=[Depends(require_admin)])
+async def snapshot_memory(limit: int = Query(25, gt=0), keyType: str = Query('lineno')):
+    """
+    tracemalloc 스냅샷을 찍고 상위 할당 위치와 기준/직전 스냅샷 대비 증가분을 반환합니다.
+    첫 호출은 추적을 시작하고 기준 스냅샷만 저장합니다.
+    
+    @param {int} limit - 항목 수
+    @param {str} keyType - lineno | filename | traceback
+    @returns {dict} 추적 메모리, 상위 할당, 차이
+    """
+    try:
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(None, memory_profiler.snapshot, limit, keyType)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/admin/profile/memory", dependencies=[Depends(require_admin)])
+async def get_memory_profile_stats():
+    """
+    tracemalloc 추적 상태를 반환합니다.
+    
+    @returns {dict} 추적 여부, 스냅샷 수, 추적 메모리
+    """
+    return memory_profiler.get_stats()
+
+
+@app.delete("/admin/profile/memory", dependencies=[Depends(require_admin)])
+async def stop_memory_profile():
+    """
+    tracemalloc 추적을 끄고 저장한 스냅샷을 해제합니다.
+    
+    @returns {dict} 종료 결과
+    """
+    return memory_profiler.stop()
+
+
+@app.post("/admin/shadow", dependencies=[Depends(require_admin)])
+async def start_shadow(shadow_request: ShadowRequest):
+    """
+    후보 모델 섀도 평가를 시작합니다. 운영 감지 결과와 출력에는 영향을 주지 않습니다.
+    
+    @param {ShadowRequest} shadow_request - 후보 가중치 경로, 샘플 비율, CPU 예산
+    @returns {dict} 섀도 평가 상태
+    """
+    if not os.path.exists(shadow_request.modelPath):
+        raise HTTPException(status_code=400, detail=f"모델 파일이 존재하지 않습니다: {shadow_request.modelPath}")
+    shadow_evaluator = _shadow_evaluator()
+    try:
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(
+            None, shadow_evaluator.start, shadow_request.modelPath, shadow_request.sampleRate, shadow_request.cpuBudget
+        )
+    except RuntimeError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return shadow_evaluator.get_stats()
+
+
+@app.get("/admin/shadow", dependencies=[Depends(require_admin)])
+async def get_shadow_stats():
+    """
+    섀도 평가 결과(일치/신규/누락 감지, 지연)를 반환합니다.
+    
+    @returns {dict} 섀도 평가 통계
+    """
+    return _shadow_evaluator().get_stats()
+
+
+@app.delete("/admin/shadow", dependencies=[Depends(require_admin)])
+async def stop_shadow():
+    """
+    섀도 평가를 중지하고 최종 통계를 반환합니다.
+    
+    @returns {dict} 섀도 평가 통계
+    """
+    shadow_evaluator = _shadow_evaluator()
+    loop = asyncio.get_event_loop()
+    await loop.run_in_executor(None, shadow_evaluator.stop)
+    return shadow_evaluator.get_stats()
+
 
 if __name__ == "__main__":
     """
@@ -389,4 +833,9 @@ if __name__ == "__main__":
     """
     import uvicorn
     print("🚀 통합 미디어 서버 (비디오 + 오디오) 시작...")
-    uvicorn.run(app, host=config.HOST, port=config.PORT)
+    if config.SUPERVISOR_WORKERS > 1:
+        # 모델을 한 번 로드하고 워커 프로세스를 fork, 라우터가 세션 ID로 분배
+        from server.supervisor import run_supervisor
+        run_supervisor(app, config.SUPERVISOR_WORKERS)
+    else:
+        uvicorn.run(app, host=config.HOST, port=config.PORT)
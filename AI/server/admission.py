@@ -0,0 +1,237 @@
+"""
+세션 입장 제어 모듈
+@module admission
+@author joon hyeok
+@date 2025-08-30
+@description 세션별로 측정한 처리 비용(STT 실시간 계수, 프레임당 감지/처리 시간, 프레임당 인코딩 시간)으로 남은 용량을 추정해 새 세션을 수락/오디오 전용 강등/거부합니다.
+"""
+
+import math
+import os
+import threading
+from time import perf_counter, process_time
+from typing import Dict, Optional
+
+from config import config
+from session_state_manager import session_state_manager
+
+ADMIT_FULL = 'full'
+ADMIT_AUDIO_ONLY = 'audio_only'
+ADMIT_REJECTED = 'rejected'
+ADMIT_NOT_READY = 'not_ready'  # 모델 로딩 중 (용량과 무관, 잠시 후 재시도)
+
+
+class AdmissionController:
+    """
+    용량 기반 입장 제어기
+
+    비용 단위는 코어(초당 CPU 초)입니다. 활성 세션마다 측정값이 있으면 측정값을, 아직 없으면
+    세션 종류별 비용 EMA(초기값은 설정의 사전값)를 사용해 현재 사용량을 합산하고,
+    노드 예산(코어 수 × 목표 사용률)에서 뺀 나머지로 새 세션의 수락 여부를 결정합니다.
+    측정값 합계는 실제 프로세스 CPU 사용률을 넘지 않도록 잘라 세션별 환산 오차가 쌓이지 않게 합니다.
+    비활성화 상태에서도 추정은 계속하므로 /capacity로 용량을 보고할 수 있으며, 비용 EMA는
+    입장 심사 때만 갱신해 /capacity 조회 빈도가 추정에 영향을 주지 않습니다.
+    """
+
+    def __init__(self):
+        self.enabled = config.ADMISSION_ENABLED
+        self.cores = os.cpu_count() or 1
+        self.budget = self.cores * config.ADMISSION_TARGET_UTILIZATION
+        self.max_sessions = config.ADMISSION_MAX_SESSIONS
+        self._cost_ema = {
+            'audio': config.ADMISSION_AUDIO_COST,
+            'video': config.ADMISSION_VIDEO_COST,
+        }
+        self._lock = threading.Lock()
+        self._cpu_sample = (perf_counter(), process_time())
+        self._process_cores: Optional[float] = None
+        self.stats = {ADMIT_FULL: 0, ADMIT_AUDIO_ONLY: 0, ADMIT_REJECTED: 0}
+
+    def set_core_share(self, cores: float) -> None:
+        """
+        이 프로세스가 쓸 수 있는 코어 몫을 설정합니다. (슈퍼바이저 워커는 노드 코어를 나눠 가짐)
+
+        @param {float} cores - 코어 수
+        """
+        self.cores = max(1.0, cores)
+        self.budget = self.cores * config.ADMISSION_TARGET_UTILIZATION
+
+    def _measure_process_cores(self) -> Optional[float]:
+        """직전 샘플 이후 프로세스 CPU 사용률(코어)을 반환합니다. 1초 미만 간격의 재호출은 직전 값을 씁니다."""
+        with self._lock:
+            now, cpu = perf_counter(), process_time()
+            last_wall, last_cpu = self._cpu_sample
+            if now - last_wall >= 1.0:
+                self._process_cores = (cpu - last_cpu) / (now - last_wall)
+                self._cpu_sample = (now, cpu)
+            return self._process_cores
+
+    def _measure_audio(self, track) -> Optional[dict]:
+        """
+        오디오 처리 트랙의 STT 실시간 계수를 코어 비용으로 환산합니다. 측정값이 없으면 None.
+        Whisper 스레드 수를 곱하면 인식 중 스레드가 모두 바쁘다고 가정해 비용을 과대평가하므로,
+        실시간 계수(인식 중인 시간 비율)에 보정 계수만 곱합니다.
+        """
+        recognizer = getattr(track, 'speech_recognizer', None)
+        if recognizer is None:
+            return None
+        stats = recognizer.get_stats()
+        rtf = stats.get('real_time_factor')
+        if rtf is None:
+            return None
+        return {'stt_real_time_factor': round(rtf, 3), 'cost': rtf * config.ADMISSION_AUDIO_CORES_PER_RTF}
+
+    def _measure_video(self, track, encoder) -> Optional[dict]:
+        """비디오 처리 트랙의 프레임당 처리/감지 시간과 인코더의 프레임당 인코딩 시간을 코어 비용으로 환산합니다."""
+        processor = getattr(track, 'video_processor', None)
+        if processor is None:
+            return None
+        stats = processor.processing_stats
+        frames = stats.get('processed_frames', 0)
+        if frames <= 0 or stats.get('avg_fps', 0.0) <= 0.0:
+            return None
+        processing_ms = stats['processing_time'] / frames * 1000
+        detection_ms = stats.get('detection_time', 0.0) / frames * 1000
+        cost = processing_ms / 1000 * stats['avg_fps']
+
+        encode_ms = 0.0
+        if encoder is not None and encoder.stats['frames_encoded'] > 0:
+            encode_ms = encoder.stats['encode_time'] / encoder.stats['frames_encoded'] * 1000
+            cost += encode_ms / 1000 * config.VIDEO_OUTPUT_FPS
+        return {
+            'processing_ms_per_frame': round(processing_ms, 2),
+            'detection_ms_per_frame': round(detection_ms, 2),
+            'encode_ms_per_frame': round(encode_ms, 2),
+            'cost': cost,
+        }
+
+    def estimate(self, manager, exclude: Optional[str] = None, learn: bool = False) -> dict:
+        """
+        활성 세션의 비용을 합산해 남은 용량을 추정합니다.
+
+        @param {ConnectionManager} manager - 연결 관리자
+        @param {str} exclude - 합산에서 제외할 세션 ID (입장 심사 중인 세션)
+        @param {bool} learn - 측정값으로 종류별 비용 EMA를 갱신할지 여부 (입장 심사에서만 True)
+        @returns {dict} 예산, 사용량, 남은 코어, 추가 수용 가능한 세션 수, 세션별 비용
+        """
+        session_ids = (set(manager.peer_connections) | set(manager.source_tracks)) - {exclude}
+        sessions: Dict[str, dict] = {}
+        measured = {'audio': [], 'video': []}
+        measured_used = 0.0  # 측정값으로 잡은 비용
+        prior_used = 0.0  # 아직 측정값이 없어 사전값/EMA로 잡은 비용
+
+        for session_id in session_ids:
+            tracks = manager.source_tracks.get(session_id) or {}
+            mode = session_state_manager.get_session_option(session_id, 'admission', ADMIT_FULL)
+            entry = {'mode': mode}
+
+            audio = self._measure_audio(tracks['audio']) if tracks.get('audio') is not None else None
+            if audio is not None:
+                measured['audio'].append(audio['cost'])
+                entry['audio'] = audio
+            entry_cost = 0.0
+            if config.AUDIO_RECOGNITION_ENABLED:
+                if audio is not None:
+                    measured_used += audio['cost']
+                    entry_cost += audio['cost']
+                else:
+                    prior_used += self._cost_ema['audio']
+                    entry_cost += self._cost_ema['audio']
+
+            if mode == ADMIT_FULL and config.OBJECT_DETECTION_ENABLED:
+                video = None
+                if tracks.get('video') is not None:
+                    video = self._measure_video(tracks['video'], manager.shared_encoders.get(session_id))
+                if video is not None:
+                    measured['video'].append(video['cost'])
+                    entry['video'] = video
+                    measured_used += video['cost']
+                    entry_cost += video['cost']
+                else:
+                    prior_used += self._cost_ema['video']
+                    entry_cost += self._cost_ema['video']
+
+            entry['cost'] = round(entry_cost, 3)
+            sessions[session_id] = entry
+
+        # 세션별 환산 합계가 실제 프로세스 CPU보다 크면 실제 값을 사용
+        process_cores = self._measure_process_cores()
+        if process_cores is not None:
+            measured_used = min(measured_used, process_cores)
+        used = measured_used + prior_used
+
+        with self._lock:
+            # 측정된 세션 평균으로 종류별 비용을 천천히 갱신 (새 세션의 예상 비용, 입장 심사당 한 번)
+            if learn:
+                for kind, costs in measured.items():
+                    if costs:
+                        self._cost_ema[kind] = 0.8 * self._cost_ema[kind] + 0.2 * (sum(costs) / len(costs))
+            audio_cost = self._cost_ema['audio'] if config.AUDIO_RECOGNITION_ENABLED else 0.0
+            video_cost = self._cost_ema['video'] if config.OBJECT_DETECTION_ENABLED else 0.0
+
+        remaining = max(0.0, self.budget - used)
+        full_cost = audio_cost + video_cost
+        slots_left = None
+        if self.max_sessions > 0:
+            slots_left = max(0, self.max_sessions - len(session_ids))
+
+        def _fit(cost: float) -> int:
+            count = math.floor(remaining / cost) if cost > 0 else 10 ** 6
+            return count if slots_left is None else min(count, slots_left)
+
+        return {
+            'cores': self.cores,
+            'budget_cores': round(self.budget, 2),
+            'used_cores': round(used, 3),
+            'process_cores': round(process_cores, 3) if process_cores is not None else None,
+            'remaining_cores': round(remaining, 3),
+            'active_sessions': len(session_ids),
+            'max_sessions': self.max_sessions,
+            'session_cost': {'audio': round(audio_cost, 3), 'video': round(video_cost, 3)},
+            'remaining_sessions': {ADMIT_FULL: _fit(full_cost), ADMIT_AUDIO_ONLY: _fit(audio_cost)},
+            'sessions': sessions,
+        }
+
+    def admit(self, manager, session_id: str) -> str:
+        """
+        새 세션의 입장을 결정하고 세션 옵션('admission')에 기록합니다. 이미 결정된 세션은 그대로 둡니다.
+
+        @param {ConnectionManager} manager - 연결 관리자
+        @param {str} session_id - 세션 ID
+        @returns {str} full | audio_only | rejected
+        """
+        decision = session_state_manager.get_session_option(session_id, 'admission')
+        if decision is not None:
+            return decision
+
+        # 비활성화(보고만) 상태에서도 비용 EMA는 입장마다 갱신해 /capacity 추정을 유지
+        capacity = self.estimate(manager, exclude=session_id, learn=True)
+        if not self.enabled or capacity['remaining_sessions'][ADMIT_FULL] >= 1:
+            decision = ADMIT_FULL
+        elif config.AUDIO_RECOGNITION_ENABLED and capacity['remaining_sessions'][ADMIT_AUDIO_ONLY] >= 1:
+            decision = ADMIT_AUDIO_ONLY
+        else:
+            decision = ADMIT_REJECTED
+        if decision != ADMIT_FULL:
+            print(f"🚦 [{session_id}] 입장 제어: {decision} (남은 코어 {capacity['remaining_cores']:.2f}/{capacity['budget_cores']:.2f})")
+
+        self.stats[decision] += 1
+        if decision != ADMIT_REJECTED:
+            session_state_manager.set_session_option(session_id, 'admission', decision)
+        return decision
+
+    def get_stats(self, manager) -> dict:
+        """
+        남은 용량과 입장 결정 통계를 반환합니다. (BE가 다른 노드로 라우팅할 때 사용)
+
+        @param {ConnectionManager} manager - 연결 관리자
+        @returns {dict} 용량 추정값과 결정 횟수
+        """
+        capacity = self.estimate(manager)
+        capacity['enabled'] = self.enabled
+        capacity['decisions'] = dict(self.stats)
+        return capacity
+
+
+# 전역 인스턴스 생성
+admission_controller = AdmissionController()
@@ -0,0 +1,107 @@
+"""
+검열 알림 지연 SLO 모듈
+@module alert_latency
+@author joon hyeok
+@date 2025-09-03
+@description 오디오 윈도/비디오 프레임의 수신 시각부터 알림 JSON이 Data Channel로 나갈 때까지의 종단 간 지연을 세션별·전체로 기록하고 SLO 위반을 셉니다.
+"""
+
+from time import time
+from typing import Dict, Optional
+
+from config import config
+from server.metrics import metrics
+
+ALERT_AUDIO = 'audio'
+ALERT_VIDEO = 'video'
+
+# 알림 지연 버킷(초): 오디오는 3초 윈도 때문에 수 초 단위까지 필요
+ALERT_LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0, 15.0, 30.0)
+
+_ALERT_LATENCY = metrics.histogram('nimf_alert_latency_seconds', '수신부터 알림 전송까지 지연(초)', ['kind'], ALERT_LATENCY_BUCKETS)
+_SESSION_ALERT_LATENCY = metrics.histogram(
+    'nimf_session_alert_latency_seconds', '세션별 수신부터 알림 전송까지 지연(초)', ['session', 'kind'], ALERT_LATENCY_BUCKETS
+)
+_SLO_BREACHES = metrics.counter('nimf_alert_slo_breaches_total', 'SLO를 넘긴 알림 수', ['kind'])
+
+
+class AlertLatencyTracker:
+    """
+    알림 지연 추적기
+
+    오디오는 윈도 첫 프레임 수신 시각을 기준으로 하므로 윈도 버퍼링, STT 대기/인식,
+    결과 큐에서 recv가 꺼낼 때까지의 시간이 모두 포함됩니다. 비디오는 감지에 쓰인 프레임의
+    메일박스 수신 시각을 기준으로 하며 워커 대기, 감지, 송출 슬롯까지의 시간이 포함됩니다.
+    """
+
+    def __init__(self):
+        self.slo = {
+            ALERT_AUDIO: config.ALERT_SLO_AUDIO_SECONDS,
+            ALERT_VIDEO: config.ALERT_SLO_VIDEO_SECONDS,
+        }
+        self._global = {kind: _ALERT_LATENCY.labels(kind) for kind in self.slo}
+        self._breaches = {kind: _SLO_BREACHES.labels(kind) for kind in self.slo}
+        self._sessions: Dict[str, set] = {}
+
+    def record(self, session_id: Optional[str], kind: str, ingest_time: Optional[float]) -> None:
+        """
+        알림 전송 직후 호출해 지연을 기록합니다.
+
+        @param {str} session_id - 세션 ID
+        @param {str} kind - audio | video
+        @param {float} ingest_time - 원본 오디오 윈도/비디오 프레임의 수신 시각 (없으면 기록하지 않음)
+        """
+        if ingest_time is None:
+            return
+        latency = max(0.0, time() - ingest_time)
+        self._global[kind].observe(latency)
+        if latency > self.slo[kind]:
+            self._breaches[kind].inc()
+        if session_id:
+            _SESSION_ALERT_LATENCY.labels(session_id, kind).observe(latency)
+            self._sessions.setdefault(session_id, set()).add(kind)
+
+    def remove_session(self, session_id: Optional[str]) -> None:
+        """세션 종료 시 세션별 히스토그램을 제거합니다."""
+        for kind in self._sessions.pop(session_id, ()):
+            _SESSION_ALERT_LATENCY.remove(session_id, kind)
+
+    @staticmethod
+    def _summary(child, slo: Optional[float] = None) -> dict:
+        count = sum(child.counts)
+
+        def _quantile(q: float) -> Optional[float]:
+            # 마지막 버킷을 넘으면 상한을 알 수 없으므로 None
+            value = child.quantile(q) if count else float('inf')
+            return None if value == float('inf') else value
+
+        summary = {
+            'count': count,
+            'avg': round(child.sum / count, 3) if count else None,
+            'p50': _quantile(0.5),
+            'p95': _quantile(0.95),
+            'p99': _quantile(0.99),
+        }
+        if slo is not None:
+            summary['slo_seconds'] = slo
+        return summary
+
+    def get_stats(self) -> dict:
+        """
+        종류별/세션별 지연 요약을 반환합니다. 분위수는 버킷 상한으로 근사합니다.
+
+        @returns {dict} 전체 요약(SLO, 위반 수 포함)과 세션별 요약
+        """
+        overall = {}
+        for kind, child in self._global.items():
+            overall[kind] = self._summary(child, self.slo[kind])
+            overall[kind]['breaches'] = int(self._breaches[kind].value)
+        sessions = {
+            session_id: {kind: self._summary(_SESSION_ALERT_LATENCY.labels(session_id, kind)) for kind in kinds}
+            for session_id, kinds in list(self._sessions.items())
+        }
+        return {'overall': overall, 'sessions': sessions}
+
+
+# 전역 인스턴스 생성
+alert_latency = AlertLatencyTracker()
@@ -30,6 +30,8 @@ class ConnectionManager:
             cls._instance.added_tracks = {}     # sessionId -> { videoTrack, audioTrack }
             cls._instance.source_tracks = {}    # sessionId -> { videoTrack, audioTrack } 원본 트랙 저장
             cls._instance.stream_keys = {}      # sessionId -> streamKey 매핑
+            cls._instance.shared_encoders = {}  # sessionId -> SharedVideoEncoder (비디오 1회 인코딩 후 분배)
+            cls._instance.streaming_peer_connections = {}  # sessionId -> 스트리밍 서버용 RTCPeerConnection
         return cls._instance
     
     def __init__(self):
@@ -0,0 +1,177 @@
+"""
+이벤트 루프 지연 감시 모듈
+@module loop_monitor
+@author joon hyeok
+@date 2025-09-05
+@description RTP 타이밍을 함께 돌리는 asyncio 루프의 스케줄링 지연을 계속 측정하고, 예산을 넘겨 멈춘 콜백은 멈춰 있는 동안 감시 스레드가 루프 스레드의 스택을 떠서 기록합니다.
+"""
+
+import asyncio
+import sys
+import threading
+import traceback
+from collections import deque
+from datetime import datetime
+from time import perf_counter
+from typing import Deque, Optional
+
+from config import config
+from server.metrics import metrics
+
+# 루프 지연 버킷(초): 오디오 프레임(20ms) 주기 근처를 촘촘하게
+LOOP_LAG_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.02, 0.03, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+# 메트릭으로 내보내는 최근 지연 분위수
+LOOP_LAG_QUANTILES = (0.5, 0.9, 0.99)
+
+_LOOP_LAG = metrics.histogram('nimf_event_loop_lag_seconds', '이벤트 루프 스케줄링 지연(초)', buckets=LOOP_LAG_BUCKETS)
+_LOOP_LAG_QUANTILE = metrics.gauge('nimf_event_loop_lag_quantile_seconds', '최근 구간 이벤트 루프 지연 분위수(초)', ['quantile'])
+_LOOP_LAG_MAX = metrics.gauge('nimf_event_loop_lag_max_seconds', '최근 구간 최대 이벤트 루프 지연(초)')
+_LOOP_LAG_BUDGET = metrics.gauge('nimf_event_loop_lag_budget_seconds', '이벤트 루프 지연 예산(초)')
+_LOOP_LAG_EXCEEDED = metrics.counter('nimf_event_loop_lag_budget_exceeded_total', '지연 예산을 넘긴 루프 하트비트 수')
+_LOOP_SLOW_CALLBACKS = metrics.counter('nimf_event_loop_slow_callbacks_total', '감시 스레드가 멈춘 상태로 포착한 콜백 수')
+
+
+class LoopMonitor:
+    """
+    이벤트 루프 지연 감시기
+
+    루프 위의 하트비트 태스크가 interval마다 깨어나 예정 시각과 실제 시각의 차이를 지연으로 기록하고,
+    별도 감시 스레드가 하트비트가 예산 이상 늦어지는 순간 sys._current_frames()로 루프 스레드의
+    스택을 떠 둡니다. 지연은 콜백이 끝난 뒤에야 잴 수 있으므로, 원인 스택은 멈춰 있는 동안 떠야 합니다.
+    """
+
+    def __init__(self):
+        self.enabled = config.LOOP_MONITOR_ENABLED
+        self.interval = config.LOOP_MONITOR_INTERVAL
+        self.budget = config.LOOP_LAG_BUDGET_SECONDS
+        self._lags: Deque[float] = deque(maxlen=config.LOOP_MONITOR_WINDOW)
+        self._slow_callbacks: Deque[dict] = deque(maxlen=config.LOOP_MONITOR_SLOW_CALLBACKS)
+        self._loop_thread_id: Optional[int] = None
+        self._deadline = 0.0  # 다음 하트비트 예정 시각 (perf_counter)
+        self._captured_deadline = 0.0  # 이미 스택을 뜬 하트비트의 예정 시각
+        self._pending: Optional[dict] = None  # 아직 끝나지 않은 멈춤 기록
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self.stats = {
+            'beats': 0,
+            'budget_exceeded': 0,
+            'slow_callbacks': 0,
+            'max_lag': 0.0,
+        }
+        _LOOP_LAG_BUDGET.set(self.budget)
+
+    def start(self) -> None:
+        """
+        하트비트 태스크와 감시 스레드를 시작합니다. (이벤트 루프에서 호출)
+        """
+        if not self.enabled or self._heartbeat is not None:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._deadline = perf_counter() + self.interval
+        self._stop_event.clear()
+        self._heartbeat = asyncio.get_event_loop().create_task(self._beat())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        metrics.add_collector(self._collect)
+        print(f"⏱️ 이벤트 루프 감시 시작: {self.interval * 1000:.0f}ms 간격, 예산 {self.budget * 1000:.0f}ms")
+
+    def stop(self) -> None:
+        """하트비트 태스크와 감시 스레드를 멈춥니다."""
+        self._stop_event.set()
+        if self._heartbeat is not None:
+            self._heartbeat.cancel()
+            self._heartbeat = None
+        self._watchdog = None
+
+    async def _beat(self) -> None:
+        """interval마다 깨어나 예정 시각 대비 지연을 기록합니다."""
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                now = perf_counter()
+                lag = max(0.0, now - self._deadline)
+                self._deadline = now + self.interval
+                self._record(lag)
+        except asyncio.CancelledError:
+            pass
+
+    def _record(self, lag: float) -> None:
+        self.stats['beats'] += 1
+        self._lags.append(lag)
+        _LOOP_LAG.observe(lag)
+        if lag > self.stats['max_lag']:
+            self.stats['max_lag'] = lag
+        if lag > self.budget:
+            self.stats['budget_exceeded'] += 1
+            _LOOP_LAG_EXCEEDED.inc()
+        # 감시 스레드가 뜬 스택에 실제로 멈춘 시간을 채움
+        pending = self._pending
+        if pending is not None:
+            pending['lag_ms'] = round(lag * 1000, 1)
+            self._pending = None
+
+    def _watch(self) -> None:
+        """하트비트가 예산 이상 늦어지면 멈춰 있는 루프 스레드의 스택을 한 번 뜹니다."""
+        check_interval = max(0.005, min(self.interval, self.budget) / 2)
+        while not self._stop_event.wait(check_interval):
+            deadline = self._deadline
+            stalled = perf_counter() - deadline
+            if stalled <= self.budget or deadline == self._captured_deadline:
+                continue
+            self._captured_deadline = deadline
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            record = {
+                'captured_at': datetime.now().isoformat(),
+                'stalled_ms': round(stalled * 1000, 1),
+                'lag_ms': None,  # 루프가 다시 돌면 하트비트가 채움
+                'stack': traceback.format_stack(frame),
+            }
+            del frame
+            self._slow_callbacks.append(record)
+            self._pending = record
+            self.stats['slow_callbacks'] += 1
+            _LOOP_SLOW_CALLBACKS.inc()
+            print(f"🐢 이벤트 루프 멈춤 {stalled * 1000:.0f}ms: {record['stack'][-1].strip().splitlines()[0]}")
+
+    def _quantiles(self) -> dict:
+        lags = sorted(self._lags)
+        if not lags:
+            return {}
+        last = len(lags) - 1
+        return {q: lags[min(last, int(q * len(lags)))] for q in LOOP_LAG_QUANTILES}
+
+    def _collect(self) -> None:
+        """스크레이프 시 최근 구간 분위수를 게이지로 내보냅니다."""
+        for q, value in self._quantiles().items():
+            _LOOP_LAG_QUANTILE.labels(str(q)).set(value)
+        _LOOP_LAG_MAX.set(max(self._lags, default=0.0))
+
+    def get_stats(self, include_stacks: bool = True) -> dict:
+        """
+        루프 지연 요약과 최근 멈춘 콜백 기록을 반환합니다.
+
+        @param {bool} include_stacks - 멈춘 콜백의 스택 포함 여부
+        @returns {dict} 분위수(ms), 예산 초과 수, 최근 멈춤 기록
+        """
+        slow = list(self._slow_callbacks)
+        if not include_stacks:
+            slow = [{k: v for k, v in record.items() if k != 'stack'} for record in slow]
+        return {
+            'enabled': self.enabled,
+            'interval_ms': round(self.interval * 1000, 1),
+            'budget_ms': round(self.budget * 1000, 1),
+            'window': len(self._lags),
+            'lag_ms': {f'p{int(q * 100)}': round(v * 1000, 2) for q, v in self._quantiles().items()},
+            'max_lag_ms': round(self.stats['max_lag'] * 1000, 1),
+            'beats': self.stats['beats'],
+            'budget_exceeded': self.stats['budget_exceeded'],
+            'slow_callbacks': slow,
+        }
+
+
+# 전역 인스턴스 생성
+loop_monitor = LoopMonitor()
@@ -0,0 +1,327 @@
+"""
+메트릭 모듈
+@module metrics
+@author joon hyeok
+@date 2025-09-02
+@description 미디어 파이프라인의 카운터/게이지/히스토그램을 기록하고 Prometheus 텍스트 형식으로 내보냅니다.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# 기본 지연 시간 버킷(초)
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.02, 0.035, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _CounterChild:
+    """라벨 값이 고정된 카운터 (핫 패스에서는 labels()로 한 번 받아 두고 inc만 호출)"""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild:
+    """라벨 값이 고정된 게이지"""
+
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class _HistogramChild:
+    """라벨 값이 고정된 히스토그램. 버킷별 카운트(누적 아님)와 합계만 기록합니다."""
+
+    __slots__ = ('buckets', 'counts', 'sum')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """버킷 경계로 근사한 분위수를 반환합니다. (관측값이 없으면 0)"""
+        total = sum(self.counts)
+        if total == 0:
+            return 0.0
+        rank = q * total
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return self.buckets[index] if index < len(self.buckets) else float('inf')
+        return float('inf')
+
+
+class _Metric:
+    """라벨별 자식 값을 가진 메트릭 기본 클래스"""
+
+    kind = 'untyped'
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple, object] = {}
+        # 자식 생성만 잠금으로 보호하고, 값 갱신은 잠금 없이 수행
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values):
+        """
+        라벨 값에 해당하는 자식을 반환합니다. 없으면 만듭니다.
+
+        @param {...} values - labelnames 순서의 라벨 값
+        @returns {object} 자식 메트릭
+        """
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def remove(self, *values) -> None:
+        """라벨 값에 해당하는 자식을 제거합니다."""
+        with self._lock:
+            self._children.pop(tuple(str(v) for v in values), None)
+
+    def clear(self) -> None:
+        """라벨이 붙은 자식을 모두 제거합니다. (수집기가 종료된 세션의 시계열을 남기지 않도록 매번 비움)"""
+        if self.labelnames:
+            with self._lock:
+                self._children = {}
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return lines
+
+
+class Counter(_Metric):
+    """단조 증가 카운터"""
+
+    kind = 'counter'
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._children[()].inc(amount)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+                for key, child in list(self._children.items())]
+
+
+class Gauge(_Metric):
+    """현재 값 게이지"""
+
+    kind = 'gauge'
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._children[()].set(value)
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(child.value)}"
+                for key, child in list(self._children.items())]
+
+
+class Histogram(_Metric):
+    """미리 정한 버킷의 히스토그램"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labelnames: Iterable[str] = (), buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help_text, labelnames)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._children[()].observe(value)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, child in list(self._children.items()):
+            cumulative = 0
+            counts = list(child.counts)
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                le = ('le', _format_value(bound) if bound != float('inf') else '+Inf')
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(child.sum)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    메트릭 레지스트리
+
+    핫 패스(프레임/청크 단위)는 미리 만든 메트릭에 잠금 없이 값을 더하고, 큐 깊이나 세션 수처럼
+    이미 다른 객체가 들고 있는 값은 스크레이프 시점에 수집기 함수로 읽어 게이지로 내보냅니다.
+    GIL 경합으로 드물게 증가분이 유실될 수 있지만 샘플당 잠금 비용을 피하기 위해 허용합니다.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Counter:
+        """카운터를 등록합니다. 같은 이름이 있으면 기존 메트릭을 반환합니다."""
+        return self._register(Counter(name, help_text, labelnames))
+
+    def gauge(self, name: str, help_text: str, labelnames: Iterable[str] = ()) -> Gauge:
+        """게이지를 등록합니다. 같은 이름이 있으면 기존 메트릭을 반환합니다."""
+        return self._register(Gauge(name, help_text, labelnames))
+
+    def histogram(self, name: str, help_text: str, labelnames: Iterable[str] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        """히스토그램을 등록합니다. 같은 이름이 있으면 기존 메트릭을 반환합니다."""
+        return self._register(Histogram(name, help_text, labelnames, buckets))
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """
+        스크레이프 직전에 호출할 수집기를 등록합니다. 수집기는 게이지 값을 갱신합니다.
+
+        @param {Callable} collector - 인자 없는 함수
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        모든 메트릭을 Prometheus 텍스트 형식으로 반환합니다.
+
+        @returns {str} text/plain; version=0.0.4 본문
+        """
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception as e:
+                print(f"⚠️ 메트릭 수집기 오류: {e}")
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+# 전역 인스턴스 생성
+metrics = MetricsRegistry()
+
+# 핫 패스에서 직접 기록하는 메트릭 (모듈 임포트 순서와 관계없이 같은 객체를 쓰도록 여기서 정의)
+VIDEO_DETECTION_SECONDS = metrics.histogram('nimf_video_detection_seconds', '감지 추론 시간(초)', ['kind'])
+INFERENCE_QUEUE_WAIT_SECONDS = metrics.histogram('nimf_inference_queue_wait_seconds', '추론 슬롯 대기 시간(초)')
+STT_CHUNK_SECONDS = metrics.histogram('nimf_stt_chunk_seconds', 'STT 청크 인식 시간(초)')
+STAGE_CPU_SECONDS = metrics.counter('nimf_stage_cpu_seconds_total', '처리 단계별 스레드 CPU 시간(초)', ['stage'])
+
+# 세션별 값은 트랙/인식기가 이미 세는 값을 스크레이프 시점에 읽음 (세션 종료와 함께 사라짐)
+_ACTIVE_SESSIONS = metrics.gauge('nimf_active_sessions', '활성 세션 수')
+_VIDEO_FRAMES_IN = metrics.counter('nimf_video_frames_in_total', '수신한 비디오 프레임 수', ['session'])
+_VIDEO_FRAMES_OUT = metrics.counter('nimf_video_frames_out_total', '송출한 비디오 프레임 수', ['session'])
+_VIDEO_FRAMES_DROPPED = metrics.counter('nimf_video_frames_dropped_total', '워커가 처리하기 전에 교체된 비디오 프레임 수', ['session'])
+_VIDEO_PROCESSING_SECONDS = metrics.counter('nimf_video_processing_seconds_total', '비디오 워커 처리 시간 합계(초)', ['session'])
+_VIDEO_DETECTION_SECONDS_TOTAL = metrics.counter('nimf_video_detection_seconds_total', '세션별 감지 시간 합계(초)', ['session'])
+_VIDEO_OUTPUT_QUEUE = metrics.gauge('nimf_video_output_queue_depth', '처리 완료 프레임 큐 길이', ['session'])
+_AUDIO_FRAMES_IN = metrics.counter('nimf_audio_frames_in_total', '수신한 오디오 프레임 수', ['session'])
+_AUDIO_PROCESSING_SECONDS = metrics.counter('nimf_audio_processing_seconds_total', '오디오 recv 처리 시간 합계(초)', ['session'])
+_STT_RTF = metrics.gauge('nimf_stt_real_time_factor', 'STT 실시간 계수 (인식 시간 / 오디오 길이)', ['session'])
+_STT_QUEUE = metrics.gauge('nimf_stt_queue_depth', 'STT 대기 청크 수', ['session'])
+_STT_CHUNKS_SHED = metrics.counter('nimf_stt_chunks_shed_total', '큐가 가득 차 버린 STT 청크 수', ['session'])
+_SESSION_METRICS = (
+    _VIDEO_FRAMES_IN, _VIDEO_FRAMES_OUT, _VIDEO_FRAMES_DROPPED, _VIDEO_PROCESSING_SECONDS,
+    _VIDEO_DETECTION_SECONDS_TOTAL, _VIDEO_OUTPUT_QUEUE, _AUDIO_FRAMES_IN, _AUDIO_PROCESSING_SECONDS,
+    _STT_RTF, _STT_QUEUE, _STT_CHUNKS_SHED,
+)
+
+
+def session_collector(manager) -> Callable[[], None]:
+    """
+    연결 관리자의 세션별 처리 트랙에서 값을 읽는 수집기를 만듭니다.
+
+    @param {ConnectionManager} manager - 연결 관리자
+    @returns {Callable} 레지스트리에 등록할 수집기
+    """
+    def _collect() -> None:
+        for metric in _SESSION_METRICS:
+            metric.clear()
+        sessions = set(manager.peer_connections) | set(manager.source_tracks)
+        _ACTIVE_SESSIONS.set(len(sessions))
+        for session_id, tracks in list(manager.source_tracks.items()):
+            video = (tracks or {}).get('video')
+            processor = getattr(video, 'video_processor', None)
+            if processor is not None:
+                stats = processor.processing_stats
+                _VIDEO_FRAMES_IN.labels(session_id).value = video.frames_in
+                _VIDEO_FRAMES_OUT.labels(session_id).value = video.frames_out
+                _VIDEO_FRAMES_DROPPED.labels(session_id).value = processor.frame_mailbox.replaced_count
+                _VIDEO_PROCESSING_SECONDS.labels(session_id).value = stats.get('processing_time', 0.0)
+                _VIDEO_DETECTION_SECONDS_TOTAL.labels(session_id).value = stats.get('detection_time', 0.0)
+                _VIDEO_OUTPUT_QUEUE.labels(session_id).set(processor.output_frame_queue.qsize())
+
+            audio = (tracks or {}).get('audio')
+            if audio is not None and hasattr(audio, 'processing_stats'):
+                _AUDIO_FRAMES_IN.labels(session_id).value = audio.processing_stats.get('total_frames', 0)
+                _AUDIO_PROCESSING_SECONDS.labels(session_id).value = audio.processing_stats.get('processing_time', 0.0)
+                recognizer = getattr(audio, 'speech_recognizer', None)
+                if recognizer is not None:
+                    stt = recognizer.get_stats()
+                    if 'real_time_factor' in stt:
+                        _STT_RTF.labels(session_id).set(stt['real_time_factor'])
+                    _STT_QUEUE.labels(session_id).set(recognizer.audio_queue.qsize())
+                    _STT_CHUNKS_SHED.labels(session_id).value = stt.get('buffer_overflow_count', 0)
+    return _collect
@@ -0,0 +1,284 @@
+"""
+실행 중 프로파일링 모듈
+@module profiler
+@author joon hyeok
+@date 2025-09-05
+@description 외부 도구 없이 살아 있는 프로세스의 모든 스레드를 시간 제한 통계 샘플링으로 CPU 프로파일링하고, tracemalloc 스냅샷 간 차이로 늘어나는 할당 위치를 찾습니다.
+"""
+
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from config import config
+
+PROFILE_FORMATS = ('collapsed', 'speedscope')
+PROFILE_MODES = ('cpu', 'wall')
+MEMORY_KEY_TYPES = ('lineno', 'filename', 'traceback')
+
+# 스냅샷에서 제외할 할당 (tracemalloc 자신과 임포트 시스템)
+_MEMORY_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+    tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+    tracemalloc.Filter(False, '<unknown>'),
+)
+
+
+def _thread_cpu_clock(ident: int) -> Optional[int]:
+    """스레드별 CPU 시계 ID (리눅스 pthread만 지원, 없으면 None)"""
+    try:
+        return time.pthread_getcpuclockid(ident)
+    except (AttributeError, OSError, OverflowError):
+        return None
+
+
+def _frame_label(code) -> Tuple[str, str, int]:
+    return code.co_name, code.co_filename, code.co_firstlineno
+
+
+class SamplingProfiler:
+    """
+    통계 샘플링 프로파일러
+
+    interval마다 sys._current_frames()로 모든 스레드의 파이썬 스택을 뜹니다. cpu 모드는 직전
+    샘플 이후 스레드 CPU 시계가 늘어난 스레드만 그 CPU 시간을 가중치로 세므로, 메일박스/큐에서
+    대기 중인 워커는 빠지고 추론·인코딩처럼 GIL을 놓고 네이티브 코드에서 도는 구간은 호출한
+    파이썬 위치로 잡힙니다. wall 모드는 대기를 포함해 모든 샘플을 interval 가중치로 셉니다.
+    한 번에 하나만 실행하며 호출한 스레드에서 duration 동안 블로킹됩니다.
+    """
+
+    def __init__(self):
+        self.max_seconds = config.PROFILE_MAX_SECONDS
+        self._lock = threading.Lock()
+
+    def is_running(self) -> bool:
+        return self._lock.locked()
+
+    def profile(self, duration: float, interval: float = 0.01, mode: str = 'cpu') -> dict:
+        """
+        모든 스레드를 duration 동안 샘플링합니다.
+
+        @param {float} duration - 샘플링 시간(초, PROFILE_MAX_SECONDS로 제한)
+        @param {float} interval - 샘플 간격(초)
+        @param {str} mode - cpu | wall
+        @returns {dict} 스레드별 스택 가중치 {'threads': {name: Counter(stack tuple → 초)}, ...}
+        @throws {RuntimeError} 이미 프로파일링 중일 때
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"지원하지 않는 모드: {mode}")
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("이미 CPU 프로파일링이 진행 중입니다")
+        try:
+            return self._sample(min(max(duration, interval), self.max_seconds), max(interval, 0.001), mode)
+        finally:
+            self._lock.release()
+
+    def _sample(self, duration: float, interval: float, mode: str) -> dict:
+        own = threading.get_ident()
+        threads: Dict[int, Counter] = {}
+        names: Dict[int, str] = {}
+        cpu_clocks: Dict[int, Optional[int]] = {}
+        cpu_last: Dict[int, float] = {}
+        samples = 0
+        started_at = datetime.now().isoformat()
+        start = time.perf_counter()
+        end = start + duration
+
+        while True:
+            now = time.perf_counter()
+            if now >= end:
+                break
+            for thread in threading.enumerate():
+                names.setdefault(thread.ident, thread.name)
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                weight = interval
+                if mode == 'cpu':
+                    if ident not in cpu_clocks:
+                        cpu_clocks[ident] = _thread_cpu_clock(ident)
+                    clock = cpu_clocks[ident]
+                    if clock is not None:
+                        try:
+                            cpu_now = time.clock_gettime(clock)
+                        except OSError:
+                            continue  # 샘플 사이에 종료된 스레드
+                        weight = cpu_now - cpu_last.get(ident, cpu_now)
+                        cpu_last[ident] = cpu_now
+                        if weight <= 0.0:
+                            continue
+                stack = []
+                while frame is not None:
+                    stack.append(_frame_label(frame.f_code))
+                    frame = frame.f_back
+                stack.reverse()
+                threads.setdefault(ident, Counter())[tuple(stack)] += weight
+            samples += 1
+            time.sleep(max(0.0, interval - (time.perf_counter() - now)))
+
+        return {
+            'pid': os.getpid(),
+            'mode': mode,
+            'started_at': started_at,
+            'duration': round(time.perf_counter() - start, 3),
+            'interval': interval,
+            'samples': samples,
+            'threads': {names.get(ident, f'thread-{ident}'): stacks for ident, stacks in threads.items() if stacks},
+        }
+
+    @staticmethod
+    def to_collapsed(result: dict) -> str:
+        """
+        Brendan Gregg collapsed stack 형식으로 변환합니다. (flamegraph.pl, speedscope에서 열기)
+        스레드 이름이 루트 프레임이며 값은 마이크로초 단위입니다.
+        """
+        lines = []
+        for thread_name, stacks in result['threads'].items():
+            for stack, weight in stacks.items():
+                frames = ';'.join(f"{name} ({os.path.basename(filename)}:{line})" for name, filename, line in stack)
+                value = int(round(weight * 1e6))
+                if value > 0:
+                    lines.append(f"{thread_name};{frames} {value}")
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def to_speedscope(result: dict) -> dict:
+        """speedscope 파일 형식(스레드별 sampled 프로파일)으로 변환합니다."""
+        frames: List[dict] = []
+        frame_index: Dict[Tuple[str, str, int], int] = {}
+        profiles = []
+        for thread_name, stacks in result['threads'].items():
+            samples, weights = [], []
+            for stack, weight in stacks.items():
+                indexes = []
+                for label in stack:
+                    index = frame_index.get(label)
+                    if index is None:
+                        index = frame_index[label] = len(frames)
+                        frames.append({'name': label[0], 'file': label[1], 'line': label[2]})
+                    indexes.append(index)
+                samples.append(indexes)
+                weights.append(weight)
+            profiles.append({
+                'type': 'sampled',
+                'name': thread_name,
+                'unit': 'seconds',
+                'startValue': 0,
+                'endValue': sum(weights),
+                'samples': samples,
+                'weights': weights,
+            })
+        return {
+            '$schema': 'https://www.speedscope.app/file-format-schema.json',
+            'name': f"nimf pid {result['pid']} {result['mode']} {result['started_at']}",
+            'exporter': 'nimf-sampling-profiler',
+            'activeProfileIndex': 0,
+            'shared': {'frames': frames},
+            'profiles': profiles,
+        }
+
+
+class MemoryProfiler:
+    """
+    tracemalloc 스냅샷 관리자
+
+    첫 스냅샷 요청에서 추적을 시작하며(이전 할당은 보이지 않음) 그 스냅샷이 기준이 됩니다.
+    이후 요청마다 기준 및 직전 스냅샷과의 차이를 돌려주므로, 세션을 돌리며 몇 번 찍으면
+    frame_intervals·pts_gaps·recognition_results처럼 계속 늘어나는 할당 위치가 상위에 나옵니다.
+    추적 중에는 할당마다 비용이 붙으므로 조사가 끝나면 stop()으로 끕니다.
+    """
+
+    def __init__(self):
+        self.frames = config.TRACEMALLOC_FRAMES
+        self._lock = threading.Lock()
+        self._baseline: Optional[tracemalloc.Snapshot] = None
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._snapshots = 0
+        self._started_at: Optional[str] = None
+
+    @staticmethod
+    def _format_stats(stats, limit: int, diff: bool) -> List[dict]:
+        rows = []
+        for stat in stats[:limit]:
+            row = {
+                'location': [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback],
+                'size_kb': round(stat.size / 1024, 1),
+                'count': stat.count,
+            }
+            if diff:
+                row['size_diff_kb'] = round(stat.size_diff / 1024, 1)
+                row['count_diff'] = stat.count_diff
+            rows.append(row)
+        return rows
+
+    def snapshot(self, limit: int = 25, key_type: str = 'lineno') -> dict:
+        """
+        스냅샷을 찍고 상위 할당 위치와 기준/직전 스냅샷 대비 증가분을 반환합니다.
+
+        @param {int} limit - 항목 수
+        @param {str} key_type - lineno | filename | traceback
+        @returns {dict} 추적 메모리, 상위 할당, 차이
+        """
+        if key_type not in MEMORY_KEY_TYPES:
+            raise ValueError(f"지원하지 않는 key_type: {key_type}")
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+                self._baseline = self._previous = None
+                self._snapshots = 0
+                self._started_at = datetime.now().isoformat()
+                print(f"🧠 tracemalloc 추적 시작 (프레임 {self.frames}개)")
+            snapshot = tracemalloc.take_snapshot().filter_traces(_MEMORY_FILTERS)
+            self._snapshots += 1
+            current, peak = tracemalloc.get_traced_memory()
+            result = {
+                'pid': os.getpid(),
+                'tracing_since': self._started_at,
+                'snapshot': self._snapshots,
+                'traced_mb': round(current / 1024 / 1024, 2),
+                'peak_mb': round(peak / 1024 / 1024, 2),
+                'overhead_mb': round(tracemalloc.get_tracemalloc_memory() / 1024 / 1024, 2),
+                'top': self._format_stats(snapshot.statistics(key_type), limit, diff=False),
+            }
+            if self._baseline is None:
+                self._baseline = snapshot
+            else:
+                result['since_baseline'] = self._format_stats(snapshot.compare_to(self._baseline, key_type), limit, diff=True)
+                result['since_previous'] = self._format_stats(snapshot.compare_to(self._previous, key_type), limit, diff=True)
+            self._previous = snapshot
+            return result
+
+    def stop(self) -> dict:
+        """추적을 끄고 저장한 스냅샷을 해제합니다."""
+        with self._lock:
+            was_tracing = tracemalloc.is_tracing()
+            tracemalloc.stop()
+            self._baseline = self._previous = None
+            snapshots, self._snapshots = self._snapshots, 0
+            self._started_at = None
+        if was_tracing:
+            print("🧠 tracemalloc 추적 종료")
+        return {'stopped': was_tracing, 'snapshots': snapshots}
+
+    def get_stats(self) -> dict:
+        """추적 상태를 반환합니다."""
+        tracing = tracemalloc.is_tracing()
+        current, peak = tracemalloc.get_traced_memory() if tracing else (0, 0)
+        return {
+            'tracing': tracing,
+            'tracing_since': self._started_at,
+            'snapshots': self._snapshots,
+            'traced_mb': round(current / 1024 / 1024, 2),
+            'peak_mb': round(peak / 1024 / 1024, 2),
+        }
+
+
+# 전역 인스턴스 생성
+sampling_profiler = SamplingProfiler()
+memory_profiler = MemoryProfiler()
@@ -0,0 +1,170 @@
+"""
+모델 준비 상태 모듈
+@module readiness
+@author joon hyeok
+@date 2025-08-28
+@description 무거운 비디오/오디오 모듈을 설정에 따라 백그라운드 스레드에서 병렬로 임포트·로드·워밍업하고 준비 상태를 기록합니다.
+"""
+
+import os
+import threading
+from time import time
+from typing import Dict, Optional
+
+from config import config
+
+
+class _Component:
+    """준비 대상 구성 요소(비디오/오디오)의 상태"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.status = 'pending'  # pending → loading → warming → ready | failed
+        self.import_time: Optional[float] = None
+        self.load_time: Optional[float] = None
+        self.warmup: Dict[str, dict] = {}
+        self.error: Optional[str] = None
+
+    @property
+    def settled(self) -> bool:
+        return self.status in ('ready', 'failed')
+
+    def to_dict(self) -> dict:
+        return {
+            'status': self.status,
+            'import_time': self.import_time,
+            'load_time': self.load_time,
+            'warmup': dict(self.warmup),
+            'error': self.error,
+        }
+
+
+class ModelReadiness:
+    """
+    모델 로딩/워밍업 오케스트레이터
+
+    OBJECT_DETECTION_ENABLED/AUDIO_RECOGNITION_ENABLED가 켜진 구성 요소만 각자의 데몬 스레드에서
+    모듈 임포트(torch/ultralytics/cv2, faster_whisper/scipy) → 모델 로드 → 워밍업 순으로 준비합니다.
+    포트는 바로 열리고, 모든 구성 요소가 끝날 때까지 준비 상태는 false입니다. 로드에 실패한
+    구성 요소는 기존과 같이 해당 기능만 비활성화된 채 준비 완료로 간주합니다.
+    """
+
+    def __init__(self):
+        self.components: Dict[str, _Component] = {}
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def is_ready(self) -> bool:
+        return self.started_at is not None and all(c.settled for c in self.components.values())
+
+    def start(self) -> None:
+        """활성화된 구성 요소의 로딩 스레드를 시작합니다. (논블로킹)"""
+        with self._lock:
+            if self.started_at is not None:
+                return
+            self.started_at = time()
+            loaders = []
+            if config.OBJECT_DETECTION_ENABLED:
+                loaders.append(('video', self._load_video))
+            if config.AUDIO_RECOGNITION_ENABLED:
+                loaders.append(('audio', self._load_audio))
+            for name, _ in loaders:
+                self.components[name] = _Component(name)
+
+        if not loaders:
+            self.finished_at = self.started_at
+            print("✅ 로드할 모델 없음 (물체 감지/음성 인식 비활성화)")
+            return
+        for name, loader in loaders:
+            threading.Thread(target=self._run, args=(self.components[name], loader), name=f"model-loader-{name}", daemon=True).start()
+
+    def _run(self, component: _Component, loader) -> None:
+        component.status = 'loading'
+        try:
+            loader(component)
+            if component.status != 'failed':
+                component.status = 'ready'
+        except Exception as e:
+            component.status = 'failed'
+            component.error = str(e)
+            print(f"❌ {component.name} 모델 준비 실패: {e}")
+        with self._lock:
+            if self.is_ready and self.finished_at is None:
+                self.finished_at = time()
+                print(f"✅ 모델 준비 완료: {self.finished_at - self.started_at:.2f}초")
+
+    def _load_video(self, component: _Component) -> None:
+        start = time()
+        from ai_video import video_processor
+        component.import_time = round(time() - start, 3)
+
+        if config.VIDEO_SHM_TRANSPORT_ENABLED:
+            self._start_inference_processes(component)
+            return
+
+        start = time()
+        # 슈퍼바이저 모드에서는 fork 전에 부모가 로드한 가중치를 그대로 공유 (copy-on-write)
+        if not video_processor.is_global_yolo_initialized() and not video_processor.initialize_global_yolo_model():
+            component.status = 'failed'
+            component.error = f"YOLO 모델 초기화 실패: {config.get_yolo_model_path()}"
+            print("⚠️ 물체 감지 기능이 비활성화됩니다.")
+            return
+        component.load_time = round(time() - start, 3)
+
+        if config.MODEL_WARMUP_RUNS > 0:
+            component.status = 'warming'
+            component.warmup = video_processor.warmup_global_yolo_model(config.MODEL_WARMUP_RUNS)
+
+    def _start_inference_processes(self, component: _Component) -> None:
+        """공유 메모리 추론 프로세스를 띄우고 모델 로드/워밍업이 끝날 때까지 기다립니다."""
+        from ai_video.shm_transport import shm_inference_pool
+        start = time()
+        cores = os.cpu_count() or 1
+        count = config.VIDEO_SHM_INFERENCE_PROCESSES or max(1, cores // 4)
+        shm_inference_pool.start(count, threads=max(1, cores // (2 * count)))
+        if not shm_inference_pool.wait_ready(config.VIDEO_SHM_READY_TIMEOUT):
+            component.status = 'failed'
+            component.error = ("추론 프로세스 모델 로드 실패" if shm_inference_pool.failed
+                               else f"추론 프로세스 모델 로드 시간 초과 ({config.VIDEO_SHM_READY_TIMEOUT:.0f}초)")
+            shm_inference_pool.stop()
+            print("⚠️ 물체 감지 기능이 비활성화됩니다.")
+            return
+        component.load_time = round(time() - start, 3)
+        component.warmup = {f"process_{index}": info for index, info in shm_inference_pool.load_info.items()}
+
+    def _load_audio(self, component: _Component) -> None:
+        start = time()
+        import ai_audio.audio_processor  # noqa: F401  (scipy, faster_whisper 임포트 비용을 미리 치름)
+        from ai_audio.stt_engine import warmup_whisper_model
+        component.import_time = round(time() - start, 3)
+
+        # 티어별로 로드+워밍업한 인스턴스는 그 티어의 첫 세션에 넘겨짐 (stt_engine.acquire_whisper_model)
+        if config.MODEL_WARMUP_RUNS > 0:
+            component.status = 'warming'
+            for tier in [t.strip() for t in config.WHISPER_WARMUP_TIERS.split(',') if t.strip()]:
+                try:
+                    component.warmup[tier] = warmup_whisper_model(tier, config.MODEL_WARMUP_RUNS)
+                except Exception as e:
+                    component.warmup[tier] = {'error': str(e)}
+                    print(f"⚠️ Whisper {tier} 워밍업 실패: {e}")
+
+    def get_stats(self) -> dict:
+        """
+        준비 상태를 반환합니다.
+
+        @returns {dict} 준비 여부, 경과 시간, 구성 요소별 임포트/로드/워밍업 시간
+        """
+        elapsed = None
+        if self.started_at is not None:
+            elapsed = round((self.finished_at or time()) - self.started_at, 3)
+        return {
+            'ready': self.is_ready,
+            'elapsed': elapsed,
+            'components': {name: c.to_dict() for name, c in self.components.items()},
+        }
+
+
+# 전역 인스턴스 생성
+model_readiness = ModelReadiness()
@@ -0,0 +1,230 @@
+"""
+세션 라우터 모듈
+@module router
+@author joon hyeok
+@date 2025-08-31
+@description 슈퍼바이저 모드에서 외부 포트를 받아 /ws 시그널링과 세션 HTTP 요청을 세션 ID 기준 워커 프로세스로 프록시합니다.
+"""
+
+import asyncio
+import json
+import re
+from typing import Dict, List, Optional
+
+import httpx
+import websockets
+from fastapi import FastAPI, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+
+from server.supervisor import route_worker, worker_port
+
+# 경로에 세션 ID가 들어 있는 엔드포인트 (/stream/{session_id}/..., /sessions/{session_id}/...)
+_SESSION_PATH = re.compile(r'^/(?:stream|sessions)/([^/]+)/')
+
+# 프록시하지 않는 hop-by-hop 헤더
+_HOP_HEADERS = {'host', 'connection', 'keep-alive', 'transfer-encoding', 'content-length', 'upgrade'}
+
+# sessionId가 나올 때까지 라우터가 쌓아 둘 최대 메시지 수와 대기 시간(초)
+_SESSION_WAIT_MESSAGES = 16
+_SESSION_WAIT_SECONDS = 10.0
+
+
+def _session_id_of(message: str) -> Optional[str]:
+    try:
+        session_id = json.loads(message).get('sessionId')
+    except (ValueError, AttributeError):
+        return None
+    return session_id if isinstance(session_id, str) and session_id else None
+
+
+def merge_metrics(texts: List[Optional[str]]) -> str:
+    """
+    워커별 Prometheus 텍스트를 worker 라벨을 붙여 메트릭 패밀리별로 합칩니다.
+
+    @param {List[str]} texts - 워커 순서의 /metrics 본문 (응답 없는 워커는 None)
+    @returns {str} 합쳐진 본문
+    """
+    families: Dict[str, List[str]] = {}
+    for index, text in enumerate(texts):
+        if text is None:
+            continue
+        family = None
+        for line in text.splitlines():
+            if line.startswith('# '):
+                parts = line.split(' ', 3)
+                family = parts[2] if len(parts) > 2 else family
+                header = families.setdefault(family, [])
+                if line not in header:
+                    header.append(line)
+                continue
+            if not line or family is None:
+                continue
+            name, _, rest = line.partition('{')
+            if rest:
+                line = f'{name}{{worker="{index}",{rest}'
+            else:
+                name, _, value = line.partition(' ')
+                line = f'{name}{{worker="{index}"}} {value}'
+            families[family].append(line)
+    return '\n'.join(line for lines in families.values() for line in lines) + '\n'
+
+
+def create_router_app(worker_count: int) -> FastAPI:
+    """
+    워커 프로세스 앞단의 라우터 애플리케이션을 생성합니다.
+
+    @param {int} worker_count - 워커 수
+    @returns {FastAPI} 라우터 애플리케이션
+    """
+    app = FastAPI(title="FastAPI Unified Media Server Router", version="1.0.0")
+    client = httpx.AsyncClient(timeout=30)
+
+    def _worker_url(index: int, path: str) -> str:
+        return f"http://127.0.0.1:{worker_port(index)}{path}"
+
+    async def _get_all(path: str) -> List[Optional[httpx.Response]]:
+        async def _get(index: int):
+            try:
+                return await client.get(_worker_url(index, path))
+            except httpx.HTTPError:
+                return None
+        return await asyncio.gather(*[_get(i) for i in range(worker_count)])
+
+    @app.get("/health/live")
+    async def liveness():
+        """라우터 생존 확인"""
+        return {"status": "alive"}
+
+    @app.get("/health/ready")
+    async def readiness():
+        """모든 워커가 준비되었을 때만 200을 반환합니다."""
+        responses = await _get_all("/health/ready")
+        workers = [r.json() if r is not None else {'ready': False, 'error': 'unreachable'} for r in responses]
+        ready = all(r is not None and r.status_code == 200 for r in responses)
+        return JSONResponse(status_code=200 if ready else 503, content={'ready': ready, 'workers': workers})
+
+    @app.get("/capacity")
+    async def capacity():
+        """워커별 남은 용량을 합산해 노드 전체 용량을 반환합니다."""
+        responses = await _get_all("/capacity")
+        workers = [r.json() for r in responses if r is not None and r.status_code == 200]
+        total = {'full': 0, 'audio_only': 0}
+        for worker in workers:
+            for key in total:
+                total[key] += worker.get('remaining_sessions', {}).get(key, 0)
+        return {
+            'workers': len(workers),
+            'remaining_sessions': total,
+            'active_sessions': sum(w.get('active_sessions', 0) for w in workers),
+            'remaining_cores': round(sum(w.get('remaining_cores', 0.0) for w in workers), 3),
+            'budget_cores': round(sum(w.get('budget_cores', 0.0) for w in workers), 2),
+        }
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        """모든 워커의 메트릭을 worker 라벨로 구분해 합칩니다."""
+        responses = await _get_all("/metrics")
+        texts = [r.text if r is not None and r.status_code == 200 else None for r in responses]
+        return PlainTextResponse(merge_metrics(texts), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    @app.websocket("/ws")
+    async def websocket_proxy(websocket: WebSocket):
+        """
+        sessionId가 들어 있는 첫 메시지로 워커를 고르고, 이후 메시지를 양방향으로 중계합니다.
+        그 전에 온 메시지는 쌓아 두었다가 순서대로 전달하며, 제한 안에 sessionId가 없으면
+        세션이 다른 워커에 갈라지지 않도록 연결을 닫습니다. (1008 Policy Violation)
+        """
+        await websocket.accept()
+        buffered: List[str] = []
+        session_id = None
+        try:
+            while session_id is None:
+                if len(buffered) >= _SESSION_WAIT_MESSAGES:
+                    break
+                message = await asyncio.wait_for(websocket.receive_text(), _SESSION_WAIT_SECONDS)
+                buffered.append(message)
+                session_id = _session_id_of(message)
+        except WebSocketDisconnect:
+            return
+        except asyncio.TimeoutError:
+            pass
+        if session_id is None:
+            print(f"⚠️ [router] sessionId 없는 WebSocket 거부 (메시지 {len(buffered)}개)")
+            await websocket.close(code=1008)
+            return
+        index = route_worker(session_id, worker_count)
+
+        try:
+            async with websockets.connect(f"ws://127.0.0.1:{worker_port(index)}/ws", max_size=None) as upstream:
+                for message in buffered:
+                    await upstream.send(message)
+
+                async def client_to_worker():
+                    while True:
+                        await upstream.send(await websocket.receive_text())
+
+                async def worker_to_client():
+                    async for message in upstream:
+                        await websocket.send_text(message)
+
+                tasks = [asyncio.ensure_future(client_to_worker()), asyncio.ensure_future(worker_to_client())]
+                _, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in pending:
+                    task.cancel()
+        except Exception as e:
+            print(f"⚠️ [router] 워커 {index} WebSocket 중계 종료: {e}")
+        try:
+            await websocket.close()
+        except RuntimeError:
+            pass
+
+    @app.api_route("/{path:path}", methods=["GET", "POST", "PUT", "PATCH", "DELETE"])
+    async def http_proxy(path: str, request: Request):
+        """
+        세션 경로는 해당 워커로, 관리자 변경 요청은 모든 워커로, 그 외는 0번 워커로 전달합니다.
+        관리자 조회(GET /admin/...)는 워커별 상태이므로 ?worker=N으로 대상 워커를 고르며, 없으면 0번 워커입니다.
+        응답의 X-Worker 헤더에 요청을 처리한 워커 번호를 담습니다.
+        """
+        url_path = "/" + path
+        if request.url.query:
+            url_path += "?" + request.url.query
+        body = await request.body()
+        headers = {k: v for k, v in request.headers.items() if k.lower() not in _HOP_HEADERS}
+
+        async def _forward(index: int) -> httpx.Response:
+            return await client.request(request.method, _worker_url(index, url_path), content=body, headers=headers)
+
+        if path.startswith("admin/") and request.method != "GET":
+            # 모델 교체/섀도 평가는 모든 워커에 적용
+            results = await asyncio.gather(*[_forward(i) for i in range(worker_count)], return_exceptions=True)
+            workers = []
+            for result in results:
+                if isinstance(result, Exception):
+                    workers.append({'status_code': 502, 'error': str(result)})
+                else:
+                    try:
+                        content = result.json()
+                    except ValueError:
+                        content = result.text
+                    workers.append({'status_code': result.status_code, 'body': content})
+            status = max(w['status_code'] for w in workers)
+            return JSONResponse(status_code=status, content={'workers': workers})
+
+        match = _SESSION_PATH.match(url_path)
+        index = route_worker(match.group(1) if match else None, worker_count)
+        if path.startswith("admin/") and 'worker' in request.query_params:
+            try:
+                index = int(request.query_params['worker'])
+            except ValueError:
+                index = -1
+            if not 0 <= index < worker_count:
+                return JSONResponse(status_code=400, content={'detail': f"worker는 0~{worker_count - 1} 사이여야 합니다"})
+        try:
+            upstream = await _forward(index)
+        except httpx.HTTPError as e:
+            return JSONResponse(status_code=502, content={'detail': f"워커 {index} 연결 실패: {e}"})
+        response_headers = {k: v for k, v in upstream.headers.items() if k.lower() not in _HOP_HEADERS}
+        response_headers['X-Worker'] = str(index)
+        return Response(content=upstream.content, status_code=upstream.status_code, headers=response_headers)
+
+    return app
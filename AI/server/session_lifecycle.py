@@ -0,0 +1,275 @@
+"""
+세션 생명주기 관리 모듈
+@module session_lifecycle
+@author joon hyeok
+@date 2025-08-29
+@description 피어 연결 종료/실패, WebSocket 해제, 유휴 타임아웃 시 세션별 자원을 모두 해제하고 남은 자원을 집계합니다.
+"""
+
+import asyncio
+import gc
+import threading
+import weakref
+from time import time
+from typing import Dict, Optional
+
+import httpx
+
+from config import config
+from session_state_manager import session_state_manager
+from server.alert_latency import alert_latency
+from server.tracing import frame_tracer
+
+# 유휴로 보지 않는 피어 연결 상태
+_ACTIVE_PEER_STATES = ("connecting", "connected")
+
+
+class SessionLifecycleManager:
+    """
+    세션 생명주기 관리자
+
+    ConnectionManager의 세션별 맵(peer_connections, added_tracks, source_tracks, stream_keys,
+    shared_encoders, streaming_peer_connections)과 세션 필터/옵션을 한 곳에서 정리합니다.
+    teardown은 멱등이며, 처리 트랙 종료 시 워커 스레드·Whisper 모델·프레임 버퍼가 함께 해제됩니다.
+    생성된 세션 객체는 약한 참조로 추적하므로 자원 집계에서 해제되지 않은 객체를 확인할 수 있습니다.
+    """
+
+    def __init__(self):
+        self.idle_timeout = config.SESSION_IDLE_TIMEOUT
+        self.sweep_interval = 10.0
+        self._manager = None
+        self._last_activity: Dict[str, float] = {}
+        self._websockets: Dict[str, object] = {}  # sessionId -> 열려 있는 클라이언트 WebSocket
+        self._tearing_down: set = set()
+        self._sweeper: Optional[asyncio.Task] = None
+        self._live: Dict[str, weakref.WeakSet] = {}
+        self.stats = {
+            'teardowns': 0,
+            'teardown_reasons': {},
+            'teardown_errors': 0,
+            'last_teardown_ms': 0.0,
+        }
+
+    def start(self, manager) -> None:
+        """
+        유휴 세션 정리 태스크를 시작합니다. (이벤트 루프에서 호출)
+
+        @param {ConnectionManager} manager - 연결 관리자
+        """
+        self._manager = manager
+        if self._sweeper is None and self.idle_timeout > 0:
+            self._sweeper = asyncio.get_event_loop().create_task(self._sweep_idle())
+
+    async def shutdown(self) -> None:
+        """정리 태스크를 멈추고 남은 세션을 모두 해제합니다."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        if self._manager is not None:
+            for session_id in list(self._session_ids()):
+                await self.teardown(session_id, 'shutdown')
+
+    def track(self, kind: str, obj) -> None:
+        """
+        세션 자원 객체를 자원 집계용으로 등록합니다. (약한 참조)
+
+        @param {str} kind - 자원 종류 (예: 'video_track', 'whisper_model')
+        @param {object} obj - 추적할 객체
+        """
+        self._live.setdefault(kind, weakref.WeakSet()).add(obj)
+
+    def touch(self, session_id: Optional[str]) -> None:
+        """세션 활동 시각을 갱신합니다."""
+        if session_id:
+            self._last_activity[session_id] = time()
+
+    def bind_websocket(self, session_id: Optional[str], websocket) -> None:
+        """
+        세션을 열려 있는 WebSocket에 연결합니다. 연결된 세션은 유휴 정리 대상이 아니며 필터도 유지됩니다.
+
+        @param {str} session_id - 세션 ID
+        @param {WebSocket} websocket - 클라이언트 WebSocket
+        """
+        if session_id:
+            self._websockets[session_id] = websocket
+            self.touch(session_id)
+
+    def unbind_websocket(self, session_id: Optional[str], websocket) -> bool:
+        """
+        WebSocket과 세션의 연결을 해제합니다. 같은 세션이 새 WebSocket으로 다시 연결된 경우는 건드리지 않습니다.
+
+        @param {str} session_id - 세션 ID
+        @param {WebSocket} websocket - 닫힌 클라이언트 WebSocket
+        @returns {bool} 이 WebSocket이 세션의 현재 연결이었는지 (세션을 해제해도 되는지) 여부
+        """
+        if not session_id:
+            return False
+        current = self._websockets.get(session_id)
+        if current is not None and current is not websocket:
+            return False
+        self._websockets.pop(session_id, None)
+        return True
+
+    def watch_peer(self, pc, session_id: str) -> None:
+        """
+        클라이언트 피어 연결이 closed/failed가 되면 세션을 해제하도록 등록합니다.
+        재협상으로 교체된 이전 피어의 종료는 무시합니다.
+
+        @param {RTCPeerConnection} pc - 클라이언트 피어 연결
+        @param {str} session_id - 세션 ID
+        """
+        self.touch(session_id)
+
+        @pc.on("connectionstatechange")
+        async def _on_state_change():
+            state = pc.connectionState
+            if state == "connected":
+                self.touch(session_id)
+            elif state in ("closed", "failed") and self._is_current_peer(session_id, pc):
+                await self.teardown(session_id, f"peer_{state}")
+
+    def _is_current_peer(self, session_id: str, pc) -> bool:
+        if self._manager is None:
+            return False
+        peers = self._manager.peer_connections.get(session_id) or {}
+        return any(p is pc for p in peers.values())
+
+    def _session_ids(self) -> set:
+        m = self._manager
+        return (
+            set(m.peer_connections) | set(m.added_tracks) | set(m.source_tracks) | set(m.stream_keys)
+            | set(m.shared_encoders) | set(m.streaming_peer_connections)
+        )
+
+    async def teardown(self, session_id: Optional[str], reason: str) -> None:
+        """
+        세션의 모든 자원을 해제합니다. 여러 경로에서 동시에 호출되어도 한 번만 실행됩니다.
+
+        @param {str} session_id - 세션 ID
+        @param {str} reason - 해제 사유 (peer_closed, peer_failed, websocket_disconnect, idle_timeout 등)
+        """
+        manager = self._manager
+        if not session_id or manager is None or session_id in self._tearing_down:
+            return
+        self._tearing_down.add(session_id)
+        start = time()
+        try:
+            peers = manager.peer_connections.pop(session_id, None) or {}
+            manager.added_tracks.pop(session_id, None)
+            tracks = manager.source_tracks.pop(session_id, None) or {}
+            encoder = manager.shared_encoders.pop(session_id, None)
+            streaming_pc = manager.streaming_peer_connections.pop(session_id, None)
+            stream_key = manager.stream_keys.pop(session_id, None)
+
+            # 처리 트랙 종료: 음성 인식 스레드 join은 블로킹이므로 executor에서 먼저 멈춤
+            loop = asyncio.get_event_loop()
+            for track in tracks.values():
+                if track is None:
+                    continue
+                try:
+                    if hasattr(track, 'stop_speech_recognition'):
+                        await loop.run_in_executor(None, track.stop_speech_recognition)
+                    track.stop()
+                except Exception as e:
+                    self.stats['teardown_errors'] += 1
+                    print(f"⚠️ [{session_id}] 트랙 종료 실패: {e}")
+            if encoder is not None:
+                encoder.stop()
+
+            for pc in [streaming_pc, *peers.values()]:
+                if pc is None:
+                    continue
+                try:
+                    await pc.close()
+                except Exception as e:
+                    self.stats['teardown_errors'] += 1
+                    print(f"⚠️ [{session_id}] 피어 연결 종료 실패: {e}")
+
+            if stream_key:
+                # 스트리밍 서버의 FFmpeg도 함께 종료 (실패해도 무시)
+                try:
+                    async with httpx.AsyncClient(timeout=5) as client:
+                        await client.post(f"{config.STREAMING_SERVER_URL}/stream/stop", json={"sessionId": session_id})
+                except Exception:
+                    pass
+
+            if session_id not in self._websockets:
+                # WebSocket이 살아 있으면 재협상으로 다시 쓰므로 필터/옵션 유지
+                session_state_manager.remove_session_filter(session_id)
+            alert_latency.remove_session(session_id)
+            frame_tracer.remove_session(session_id)
+            self._last_activity.pop(session_id, None)
+        finally:
+            self._tearing_down.discard(session_id)
+
+        elapsed = (time() - start) * 1000
+        self.stats['teardowns'] += 1
+        self.stats['teardown_reasons'][reason] = self.stats['teardown_reasons'].get(reason, 0) + 1
+        self.stats['last_teardown_ms'] = round(elapsed, 2)
+        print(f"🧹 [{session_id}] 세션 자원 해제 완료 ({reason}, {elapsed:.1f}ms)")
+
+    async def _sweep_idle(self) -> None:
+        """sweep_interval마다 유휴 세션을 정리합니다."""
+        try:
+            while True:
+                await asyncio.sleep(self.sweep_interval)
+                await self._sweep_once(time())
+        except asyncio.CancelledError:
+            return
+
+    async def _sweep_once(self, now: float) -> None:
+        """
+        WebSocket에 연결되지 않았고 피어도 연결 중/연결됨 상태가 아닌 채로 idle_timeout이 지난 세션을 해제합니다.
+        offer 전이거나 ICE 확인 중인 세션도 WebSocket이 열려 있으면 유지합니다.
+
+        @param {float} now - 현재 시각
+        """
+        for session_id in list(self._session_ids() | set(self._last_activity)):
+            peers = self._manager.peer_connections.get(session_id) or {}
+            if session_id in self._websockets or any(
+                getattr(pc, 'connectionState', None) in _ACTIVE_PEER_STATES for pc in peers.values()
+            ):
+                self._last_activity[session_id] = now
+                continue
+            last = self._last_activity.setdefault(session_id, now)
+            if now - last > self.idle_timeout:
+                await self.teardown(session_id, 'idle_timeout')
+
+    def get_accounting(self, collect: bool = False) -> dict:
+        """
+        세션별 자원 집계를 반환합니다. 활성 세션이 없으면 모든 값이 0이어야 합니다.
+
+        @param {bool} collect - 집계 전에 가비지 컬렉션을 실행할지 여부
+        @returns {dict} 연결 관리자 맵 크기, 세션 상태 수, 살아 있는 세션 객체 수, 스레드 수
+        """
+        if collect:
+            gc.collect()
+        m = self._manager
+        maps = {}
+        if m is not None:
+            maps = {
+                'active_websockets': len(m.active_connections),
+                'peer_connections': len(m.peer_connections),
+                'added_tracks': len(m.added_tracks),
+                'source_tracks': len(m.source_tracks),
+                'stream_keys': len(m.stream_keys),
+                'shared_encoders': len(m.shared_encoders),
+                'streaming_peer_connections': len(m.streaming_peer_connections),
+            }
+        return {
+            'connection_manager': maps,
+            'session_filters': len(session_state_manager.get_all_sessions()),
+            'tracked_sessions': len(self._last_activity),
+            'bound_websockets': len(self._websockets),
+            'live_objects': {kind: len(objects) for kind, objects in self._live.items()},
+            'threads': threading.active_count(),
+            'lifecycle': {
+                **self.stats,
+                'teardown_reasons': dict(self.stats['teardown_reasons']),
+                'idle_timeout': self.idle_timeout,
+            },
+        }
+
+
+# 전역 인스턴스 생성
+session_lifecycle = SessionLifecycleManager()
@@ -3,6 +3,7 @@ import socketio
 import asyncio
 import os
 from aiortc import RTCPeerConnection, RTCSessionDescription, RTCIceCandidate
+from webrtc.shared_encoder import attach_shared_video
 
 class StreamingServerManager:
     _instance = None
@@ -77,11 +78,18 @@ class StreamingServerManager:
                         print(f"audio 트랙 : {self.manager.added_tracks[session_id]['audio']}")
                         print(f"video 트랙 : {self.manager.added_tracks[session_id]['video']}")
                         pc.addTrack(self.manager.added_tracks[session_id]['audio'])
-                        pc.addTrack(self.manager.added_tracks[session_id]['video'])
+                        shared_encoder = self.manager.shared_encoders.get(session_id)
+                        if shared_encoder is not None:
+                            pc.addTrack(shared_encoder.subscribe_raw())
+                        else:
+                            pc.addTrack(self.manager.added_tracks[session_id]['video'])
                         
                         # Answer 생성 및 전송
                         answer = await pc.createAnswer()
                         await pc.setLocalDescription(answer)
+
+                        # H.264로 협상되었으면 공유 인코더의 인코딩 패킷으로 송신
+                        attach_shared_video(pc, shared_encoder)
                         
                         await self.sio.emit('webrtc-signal', {
                             'sessionId': session_id,
@@ -0,0 +1,166 @@
+"""
+멀티 프로세스 슈퍼바이저 모듈
+@module supervisor
+@author joon hyeok
+@date 2025-08-31
+@description 모델 가중치를 한 번 로드한 뒤 워커 프로세스를 fork해 copy-on-write로 공유하고, 라우터 프로세스가 세션 ID로 워커를 선택하도록 관리합니다.
+"""
+
+import math
+import os
+import signal
+import time
+import zlib
+from typing import Dict, Optional
+
+from config import config
+
+
+def worker_port(index: int) -> int:
+    """
+    워커 프로세스의 내부 포트를 반환합니다.
+
+    @param {int} index - 워커 번호 (0부터)
+    @returns {int} 127.0.0.1에서 수신하는 포트
+    """
+    base = config.SUPERVISOR_WORKER_BASE_PORT or config.PORT + 1
+    return base + index
+
+
+def route_worker(session_id: Optional[str], worker_count: int) -> int:
+    """
+    세션 ID를 워커 번호로 매핑합니다. 프로세스마다 달라지는 hash() 대신 crc32를 사용해
+    라우터가 재시작되어도 같은 세션은 같은 워커로 갑니다.
+
+    @param {str} session_id - 세션 ID (없으면 0번 워커)
+    @param {int} worker_count - 워커 수
+    @returns {int} 워커 번호
+    """
+    if not session_id:
+        return 0
+    return zlib.crc32(session_id.encode('utf-8')) % worker_count
+
+
+def _preload_models() -> None:
+    """
+    fork 전에 무거운 모듈을 임포트하고 YOLO 가중치를 로드/퓨즈합니다.
+    부모는 추론을 실행하지 않고 스레드 풀도 1개로 묶어 두므로 fork 후 자식에서 안전하게 재설정됩니다.
+    """
+    if config.OBJECT_DETECTION_ENABLED and not config.VIDEO_SHM_TRANSPORT_ENABLED:
+        # 공유 메모리 추론 모드에서는 워커가 띄운 추론 프로세스가 각자 로드
+        import torch
+        torch.set_num_threads(1)
+        from ai_video import video_processor
+        if video_processor.initialize_global_yolo_model():
+            # 첫 추론 때 자식마다 퓨즈하면 퓨즈된 가중치가 프로세스별로 복사되므로 미리 퓨즈
+            for hosted in video_processor.get_global_yolo_detector().models:
+                try:
+                    hosted.detector.model.fuse()
+                except Exception as e:
+                    print(f"⚠️ {hosted.name} 모델 퓨즈 실패 (워커에서 퓨즈됨): {e}")
+    if config.AUDIO_RECOGNITION_ENABLED:
+        # Whisper는 세션마다 인스턴스를 만들므로 코드/라이브러리만 공유하고 모델 파일은 페이지 캐시로 공유
+        import ai_audio.audio_processor  # noqa: F401
+
+
+def _configure_worker(index: int, worker_count: int) -> None:
+    """fork 직후 자식 프로세스의 스레드 수와 용량 몫을 노드 코어에 맞게 나눕니다."""
+    cores = os.cpu_count() or 1
+    share = max(1.0, cores / worker_count)
+    os.environ['AI_WORKER_INDEX'] = str(index)
+
+    if config.OBJECT_DETECTION_ENABLED and not config.VIDEO_SHM_TRANSPORT_ENABLED:
+        import torch
+        torch.set_num_threads(max(1, int(share)))
+    from ai_video.inference_scheduler import inference_scheduler
+    from ai_video.inference_governor import inference_governor
+    from server.admission import admission_controller
+    concurrency = config.VIDEO_INFERENCE_CONCURRENCY or max(1, int(share) // 2)
+    inference_scheduler.set_concurrency(concurrency)
+    inference_governor.concurrency = inference_scheduler.concurrency
+    admission_controller.set_core_share(share)
+    if admission_controller.max_sessions > 0:
+        admission_controller.max_sessions = math.ceil(admission_controller.max_sessions / worker_count)
+
+
+def _run_worker(app, index: int, worker_count: int) -> None:
+    import uvicorn
+    _configure_worker(index, worker_count)
+    print(f"👷 워커 {index} 시작 (pid {os.getpid()}, 포트 {worker_port(index)})")
+    uvicorn.run(app, host="127.0.0.1", port=worker_port(index))
+
+
+def _run_router(worker_count: int) -> None:
+    import uvicorn
+    from server.router import create_router_app
+    print(f"🧭 라우터 시작 (pid {os.getpid()}, {config.HOST}:{config.PORT} → 워커 {worker_count}개)")
+    uvicorn.run(create_router_app(worker_count), host=config.HOST, port=config.PORT)
+
+
+def _spawn(target, *args) -> int:
+    pid = os.fork()
+    if pid == 0:
+        # 자식: 부모의 시그널 처리기를 해제하고 서버를 실행한 뒤 부모 코드로 돌아가지 않고 종료
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        code = 0
+        try:
+            target(*args)
+        except Exception as e:
+            print(f"❌ 자식 프로세스 오류: {e}")
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def run_supervisor(app, worker_count: int) -> None:
+    """
+    슈퍼바이저를 실행합니다. (블로킹)
+
+    부모는 모델을 로드한 뒤 워커 N개와 라우터 1개를 fork하고, 이후에는 스레드나 이벤트 루프 없이
+    자식 감시만 합니다. 그래서 죽은 워커를 다시 fork해도 로드된 가중치를 그대로 공유합니다.
+
+    @param {FastAPI} app - 워커에서 실행할 애플리케이션
+    @param {int} worker_count - 워커 프로세스 수
+    """
+    print(f"🧩 슈퍼바이저 모드: 워커 {worker_count}개")
+    start = time.time()
+    _preload_models()
+    print(f"📦 공유 모델 로드 완료: {time.time() - start:.2f}초")
+
+    children: Dict[int, tuple] = {}
+    for index in range(worker_count):
+        children[_spawn(_run_worker, app, index, worker_count)] = ('worker', index)
+    children[_spawn(_run_router, worker_count)] = ('router', None)
+
+    stopping = False
+
+    def _stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        role = children.pop(pid, None)
+        if role is None or stopping:
+            continue
+        kind, index = role
+        print(f"⚠️ {kind} {'' if index is None else index} 종료 (pid {pid}, 상태 {status}) → 재시작")
+        time.sleep(1.0)
+        if kind == 'worker':
+            children[_spawn(_run_worker, app, index, worker_count)] = role
+        else:
+            children[_spawn(_run_router, worker_count)] = role
+    print("🛑 슈퍼바이저 종료")
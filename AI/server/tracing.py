@@ -0,0 +1,182 @@
+"""
+프레임 단계 추적 모듈
+@module tracing
+@author joon hyeok
+@date 2025-09-04
+@description 샘플링된 비디오 프레임/오디오 윈도의 단계별 구간을 세션별 링 버퍼에 기록하고 Chrome trace-event JSON으로 내보냅니다.
+"""
+
+import itertools
+import os
+import random
+import threading
+from collections import deque
+from time import perf_counter
+from typing import Deque, Dict, Optional
+
+from config import config
+
+
+class FrameTrace:
+    """
+    샘플링된 프레임(또는 오디오 윈도) 하나의 추적 핸들
+
+    스레드를 넘어 프레임과 함께 전달되며, span()은 시작 시각부터 지금까지를 구간으로 기록하고
+    지금 시각을 반환하므로 단계 사이에 이어서 호출할 수 있습니다.
+    """
+
+    __slots__ = ('ring', 'seq', 'kind')
+
+    enabled = True
+
+    def __init__(self, ring: Deque, seq: int, kind: str):
+        self.ring = ring
+        self.seq = seq
+        self.kind = kind
+
+    def now(self) -> float:
+        return perf_counter()
+
+    def span(self, name: str, start: float, end: Optional[float] = None) -> float:
+        """
+        구간을 기록합니다.
+
+        @param {str} name - 단계 이름
+        @param {float} start - 시작 시각 (perf_counter)
+        @param {float} end - 종료 시각 (없으면 지금)
+        @returns {float} 종료 시각
+        """
+        if end is None:
+            end = perf_counter()
+        # deque.append는 스레드 안전하고 maxlen을 넘으면 오래된 구간부터 버림
+        self.ring.append((name, self.kind, self.seq, start, end, threading.get_ident()))
+        return end
+
+
+class _NullTrace:
+    """샘플링되지 않은 프레임용 핸들. 시계를 읽지 않고 아무것도 기록하지 않습니다."""
+
+    __slots__ = ()
+
+    enabled = False
+
+    def now(self) -> float:
+        return 0.0
+
+    def span(self, name: str, start: float, end: Optional[float] = None) -> float:
+        return 0.0
+
+
+NULL_TRACE = _NullTrace()
+
+
+class FrameTracer:
+    """
+    세션별 프레임 추적기
+
+    sample_rate가 0이면 start()는 난수도 만들지 않고 NULL_TRACE를 반환합니다. 샘플링된 프레임만
+    구간을 기록하므로 1% 샘플링에서의 비용은 프레임당 난수 1회와 빈 메서드 호출 몇 번입니다.
+    """
+
+    def __init__(self):
+        self.sample_rate = config.TRACE_SAMPLE_RATE
+        self.ring_size = config.TRACE_RING_SIZE
+        self._rings: Dict[str, Deque] = {}
+        self._seq = itertools.count(1)
+        # 송출된 샘플 프레임의 PTS → 추적 핸들 (공유 인코더가 인코딩 구간을 이어 기록)
+        self._outputs: Dict[str, Dict[int, FrameTrace]] = {}
+
+    def set_sample_rate(self, rate: float) -> None:
+        """
+        샘플링 비율을 바꿉니다.
+
+        @param {float} rate - 0 ~ 1 (0이면 추적 끔)
+        """
+        self.sample_rate = max(0.0, min(1.0, float(rate)))
+
+    def start(self, session_id: Optional[str], kind: str):
+        """
+        프레임 추적을 시작할지 결정합니다.
+
+        @param {str} session_id - 세션 ID
+        @param {str} kind - video | audio | stt
+        @returns {FrameTrace|_NullTrace} 추적 핸들
+        """
+        if self.sample_rate <= 0.0 or not session_id or random.random() >= self.sample_rate:
+            return NULL_TRACE
+        ring = self._rings.get(session_id)
+        if ring is None:
+            ring = self._rings.setdefault(session_id, deque(maxlen=self.ring_size))
+        return FrameTrace(ring, next(self._seq), kind)
+
+    def mark_output(self, session_id: Optional[str], pts: int, trace) -> None:
+        """샘플 프레임이 송출될 때 PTS를 기억해 인코더가 같은 프레임의 구간을 기록하게 합니다."""
+        if not trace.enabled or not session_id:
+            return
+        outputs = self._outputs.setdefault(session_id, {})
+        if len(outputs) > 64:
+            outputs.clear()
+        outputs[pts] = trace
+
+    def take_output(self, session_id: Optional[str], pts: Optional[int]):
+        """
+        인코더가 받은 프레임이 샘플 프레임이면 추적 핸들을 반환합니다.
+
+        @returns {FrameTrace|_NullTrace} 추적 핸들
+        """
+        outputs = self._outputs.get(session_id) if session_id else None
+        if not outputs or pts is None:
+            return NULL_TRACE
+        return outputs.pop(pts, NULL_TRACE)
+
+    def remove_session(self, session_id: Optional[str]) -> None:
+        """세션 종료 시 링 버퍼를 해제합니다."""
+        self._rings.pop(session_id, None)
+        self._outputs.pop(session_id, None)
+
+    def export(self, session_id: str) -> Optional[dict]:
+        """
+        세션의 구간을 Chrome trace-event 형식으로 반환합니다. (chrome://tracing, Perfetto에서 열기)
+
+        @param {str} session_id - 세션 ID
+        @returns {dict|None} {'traceEvents': [...]} (기록이 없으면 None)
+        """
+        ring = self._rings.get(session_id)
+        if ring is None:
+            return None
+        pid = os.getpid()
+        names = {thread.ident: thread.name for thread in threading.enumerate()}
+        events = []
+        tids = set()
+        for name, kind, seq, start, end, tid in list(ring):
+            tids.add(tid)
+            events.append({
+                'name': name,
+                'cat': kind,
+                'ph': 'X',
+                'ts': round(start * 1e6, 1),
+                'dur': round((end - start) * 1e6, 1),
+                'pid': pid,
+                'tid': tid,
+                'args': {'frame': seq},
+            })
+        for tid in tids:
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid,
+                           'args': {'name': names.get(tid, f'thread-{tid}')}})
+        return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'session_id': session_id}}
+
+    def get_stats(self) -> dict:
+        """
+        추적 상태를 반환합니다.
+
+        @returns {dict} 샘플링 비율, 링 크기, 세션별 기록된 구간 수
+        """
+        return {
+            'sample_rate': self.sample_rate,
+            'ring_size': self.ring_size,
+            'sessions': {session_id: len(ring) for session_id, ring in list(self._rings.items())},
+        }
+
+
+# 전역 인스턴스 생성
+frame_tracer = FrameTracer()
@@ -15,8 +15,12 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import json
 import asyncio
 from webrtc.unified_peer import create_unified_peer_connection
+from webrtc.shared_encoder import attach_shared_video
 from aiortc import RTCSessionDescription, RTCIceCandidate
 from streaming_server_manager import StreamingServerManager
+from config import config
+from server.admission import admission_controller, ADMIT_REJECTED, ADMIT_NOT_READY
+from server.readiness import model_readiness
 
 async def handle_webrtc_message(data, websocket, manager):
     """
@@ -35,6 +39,28 @@ async def handle_webrtc_message(data, websocket, manager):
 
     # WebRTC Offer 처리
     if isinstance(signal, dict) and signal.get("type") == "offer":
+        # 모델 로딩 중에 트랙을 받으면 처리 모듈(torch 등) 임포트가 이벤트 루프를 막으므로 준비될 때까지 거부
+        if not model_readiness.is_ready:
+            await websocket.send_text(json.dumps({
+                "type": "admission",
+                "sessionId": session_id,
+                "decision": ADMIT_NOT_READY,
+                "retryAfter": config.MODEL_NOT_READY_RETRY_SECONDS,
+            }))
+            print(f"⏳ [{session_id}] 모델 준비 중으로 offer 보류")
+            return
+
+        # session_id 메시지 없이 offer가 먼저 온 세션도 입장 제어 적용 (이미 결정된 세션은 재협상 허용)
+        if admission_controller.admit(manager, session_id) == ADMIT_REJECTED:
+            await websocket.send_text(json.dumps({
+                "type": "admission",
+                "sessionId": session_id,
+                "decision": ADMIT_REJECTED,
+                "capacity": admission_controller.estimate(manager, exclude=session_id)['remaining_sessions'],
+            }))
+            print(f"🚦 [{session_id}] 용량 부족으로 offer 거부")
+            return
+
         if session_id not in manager.peer_connections:
             manager.peer_connections[session_id] = {"audio": None, "video": None}
             manager.added_tracks[session_id] = {"audio": None, "video": None}
@@ -125,6 +151,9 @@ async def handle_webrtc_message(data, websocket, manager):
         answer = await pc.createAnswer()
         await pc.setLocalDescription(answer)
 
+        # H.264로 협상되었으면 공유 인코더의 인코딩 패킷으로 송신
+        attach_shared_video(pc, manager.shared_encoders.get(session_id))
+
         # wait ICE gathering complete for trickle=false client
         async def _wait_ice_complete(connection, timeout: float = 5.0):
             elapsed = 0.0
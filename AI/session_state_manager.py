@@ -34,6 +34,7 @@ class FilterRequest(BaseModel):
 class SessionStateManager:
     def __init__(self):
         self._session_filters: Dict[str, Dict[str, Any]] = {}
+        self._session_options: Dict[str, Dict[str, Any]] = {}  # 세션별 부가 설정 (출력 FPS 등)
         self._lock = threading.Lock()  # 스레드 안전성을 위한 락
     
     def set_session_filter(self, session_id: str, filter_request):
@@ -101,6 +102,17 @@ class SessionStateManager:
         """세션별 필터 정보 삭제"""
         with self._lock:
             self._session_filters.pop(session_id, None)
+            self._session_options.pop(session_id, None)
+
+    def set_session_option(self, session_id: str, key: str, value: Any):
+        """세션별 부가 설정 저장 (예: outputFps)"""
+        with self._lock:
+            self._session_options.setdefault(session_id, {})[key] = value
+
+    def get_session_option(self, session_id: str, key: str, default: Any = None) -> Any:
+        """세션별 부가 설정 조회"""
+        with self._lock:
+            return self._session_options.get(session_id, {}).get(key, default)
     
     def get_all_sessions(self) -> Dict[str, Dict[str, Any]]:
         """모든 세션 필터 정보 조회"""
@@ -0,0 +1,12 @@
+"""
+테스트 공통 설정
+@module conftest
+@author joon hyeok
+@date 2025-09-06
+@description AI 루트를 임포트 경로에 추가합니다. (서버와 같은 `from config import config` 형태의 임포트 사용)
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,68 @@
+"""
+입장 제어 테스트
+@module test_admission
+@author joon hyeok
+@date 2025-09-06
+@description 비용 EMA는 /capacity 조회가 아니라 입장 심사마다 한 번 갱신되고, 비활성화 상태에서는 거부하지 않는지 확인합니다.
+"""
+
+import pytest
+
+from config import config
+from server.admission import AdmissionController, ADMIT_FULL
+
+
+class FakeRecognizer:
+    def __init__(self, rtf: float):
+        self.rtf = rtf
+
+    def get_stats(self) -> dict:
+        return {'real_time_factor': self.rtf}
+
+
+class FakeAudioTrack:
+    def __init__(self, rtf: float):
+        self.speech_recognizer = FakeRecognizer(rtf)
+
+
+class FakeManager:
+    def __init__(self):
+        self.peer_connections = {}
+        self.source_tracks = {}
+        self.shared_encoders = {}
+
+
+@pytest.fixture
+def controller(monkeypatch):
+    monkeypatch.setattr(config, 'AUDIO_RECOGNITION_ENABLED', True)
+    monkeypatch.setattr(config, 'OBJECT_DETECTION_ENABLED', False)
+    monkeypatch.setattr(config, 'ADMISSION_AUDIO_COST', 1.0)
+    monkeypatch.setattr(config, 'ADMISSION_AUDIO_CORES_PER_RTF', 1.0)
+    return AdmissionController()
+
+
+def test_capacity_reads_do_not_move_the_cost_ema(controller):
+    manager = FakeManager()
+    manager.source_tracks['measured'] = {'audio': FakeAudioTrack(rtf=0.2)}
+    for _ in range(20):
+        capacity = controller.estimate(manager)
+    assert capacity['session_cost']['audio'] == 1.0
+
+
+def test_each_admission_updates_the_cost_ema_once(controller):
+    manager = FakeManager()
+    manager.source_tracks['measured'] = {'audio': FakeAudioTrack(rtf=0.2)}
+    controller.admit(manager, 'admission-new')
+    assert controller.estimate(manager)['session_cost']['audio'] == pytest.approx(0.84)
+
+
+def test_audio_cost_is_rtf_times_calibration(controller):
+    assert controller._measure_audio(FakeAudioTrack(rtf=0.25))['cost'] == pytest.approx(0.25)
+
+
+def test_disabled_controller_admits_and_still_reports(controller):
+    controller.enabled = False
+    controller.budget = 0.0
+    manager = FakeManager()
+    assert controller.admit(manager, 'admission-disabled') == ADMIT_FULL
+    assert controller.get_stats(manager)['remaining_sessions'][ADMIT_FULL] == 0
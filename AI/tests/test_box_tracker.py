@@ -0,0 +1,64 @@
+"""
+박스 전파 테스트
+@module test_box_tracker
+@author joon hyeok
+@date 2025-09-06
+@description 광학 흐름으로 움직인 박스를 따라가고, 정지 박스는 유지하며, 추적을 놓치거나 오래된 박스는 만료되는지 확인합니다.
+"""
+
+import numpy as np
+import pytest
+
+from ai_video.box_tracker import BoxTracker
+from ai_video.object_detector import DetectionResult
+
+SHAPE = (720, 1280, 3)  # 원본 프레임
+SMALL = (90, 160)  # 모션용 그레이 (가로세로 8배 축소)
+
+
+def _textured_frame(offset_x: int) -> np.ndarray:
+    gray = np.zeros(SMALL, dtype=np.uint8)
+    patch = np.random.default_rng(0).integers(0, 255, (20, 20), dtype=np.uint8)
+    gray[30:50, 40 + offset_x:60 + offset_x] = patch
+    return gray
+
+
+def _box_over_patch():
+    # 작은 프레임의 (40, 30)-(60, 50) 영역 → 원본 좌표
+    return DetectionResult((320, 240, 480, 400), 0.9, 0, 'person', (400, 320), 7)
+
+
+def test_moving_box_follows_flow():
+    tracker = BoxTracker()
+    tracker.reset([_box_over_patch()], _textured_frame(0))
+    moved = tracker.propagate(_textured_frame(2), SHAPE)
+    assert len(moved) == 1
+    x1 = moved[0].bbox[0]
+    assert x1 == pytest.approx(320 + 16, abs=6)
+    assert tracker.last_max_shift >= 1.0
+    assert moved[0].track_id == 7
+
+
+def test_static_box_is_kept_without_aging():
+    tracker = BoxTracker(max_age=2)
+    tracker.reset([_box_over_patch()], _textured_frame(0))
+    for _ in range(10):
+        kept = tracker.propagate(_textured_frame(0), SHAPE)
+    assert len(kept) == 1
+    assert tracker.stats['boxes_expired'] == 0
+
+
+def test_box_expires_when_flow_is_lost():
+    tracker = BoxTracker(max_lost=2)
+    tracker.reset([_box_over_patch()], _textured_frame(0))
+    # 모션 그레이가 없으면 흐름을 계산할 수 없어 연속 추적 실패로 셈
+    results = [len(tracker.propagate(None, SHAPE)) for _ in range(3)]
+    assert results == [1, 1, 0]
+    assert tracker.stats['boxes_expired'] == 1
+
+
+def test_moving_box_expires_after_max_age():
+    tracker = BoxTracker(max_age=2)
+    tracker.reset([_box_over_patch()], _textured_frame(0))
+    results = [len(tracker.propagate(_textured_frame(step), SHAPE)) for step in (1, 2, 3)]
+    assert results == [1, 1, 0]
@@ -0,0 +1,111 @@
+"""
+캐스케이드 감지기 테스트
+@module test_cascade_detector
+@author joon hyeok
+@date 2025-09-06
+@description 스크리너 적중/미검출 집계, 스크리너 오류 시 컨퍼머로 넘기는지, 적중 후 확인과 안전 주기 확인이 구분되고 letterbox 입력을 공유하는지 확인합니다.
+"""
+
+import numpy as np
+
+from ai_video.object_detector import CascadeDetector, DetectionResult
+
+
+class FakeResult:
+    def __init__(self, boxes):
+        self.boxes = boxes
+
+
+class FakeScreenerModel:
+    def __init__(self):
+        self.hit = False
+        self.fail = False
+        self.inputs = []
+
+    def predict(self, image, **kwargs):
+        self.inputs.append(image.shape)
+        if self.fail:
+            raise RuntimeError('screener down')
+        return [FakeResult([object()] if self.hit else [])]
+
+
+class FakeScreener:
+    is_initialized = True
+    confidence_threshold = 0.15
+
+    def __init__(self):
+        self.model = FakeScreenerModel()
+
+
+class FakeConfirmer:
+    is_initialized = True
+
+    def __init__(self):
+        self.detections = []
+        self.letterboxed = []
+
+    def detect_letterboxed(self, boxed, scale, pad):
+        self.letterboxed.append(boxed)
+        return list(self.detections)
+
+    def detect_regions(self, image, regions):
+        return list(self.detections)
+
+
+def _knife():
+    return DetectionResult((10, 10, 50, 50), 0.9, 5, 'knife', (30, 30), 1)
+
+
+def _cascade():
+    return CascadeDetector(FakeConfirmer(), FakeScreener(), screener_imgsz=320, input_size=640)
+
+
+def _frame():
+    return np.zeros((720, 1280, 3), dtype=np.uint8)
+
+
+def test_screener_hits_and_misses_are_counted():
+    cascade = _cascade()
+    frame = _frame()
+    assert cascade.screen(frame) is False
+    cascade.screener.model.hit = True
+    assert cascade.screen(frame) is True
+    stats = cascade.get_stats()
+    assert stats['screener_runs'] == 2 and stats['screener_hits'] == 1
+    assert stats['screener_hit_rate'] == 0.5
+    assert cascade.screener.model.inputs == [(320, 320, 3), (320, 320, 3)]
+
+
+def test_screener_error_falls_through_to_confirmer():
+    cascade = _cascade()
+    cascade.screener.model.fail = True
+    assert cascade.screen(_frame()) is True
+
+
+def test_confirms_after_hit_and_safety_confirms_are_separate():
+    cascade = _cascade()
+    cascade.confirmer.detections = [_knife()]
+    frame = _frame()
+
+    cascade.screener.model.hit = True
+    cascade.screen(frame)
+    assert cascade.detect(frame)[0].class_name == 'knife'
+    cascade.confirmer.detections = []
+    cascade.detect_regions(frame, [(0, 0, 100, 100)])  # 스크리너 없이 실행 → 안전 주기 확인
+
+    stats = cascade.get_stats()
+    assert stats['confirmer_runs'] == 2
+    assert stats['confirmer_after_hit'] == 1
+    assert stats['confirmer_confirmed'] == 1
+    assert stats['safety_confirms'] == 1
+    assert stats['confirmer_precision'] == 1.0
+
+
+def test_screener_and_confirmer_share_the_letterbox():
+    cascade = _cascade()
+    frame = _frame()
+    cascade.screen(frame)
+    cascade.detect(frame)
+    boxed = cascade.confirmer.letterboxed[0]
+    assert boxed.shape[:2] == (640, 640)
+    assert cascade._prepare(frame)[0] is boxed
@@ -0,0 +1,70 @@
+"""
+감지 결과 캐시 테스트
+@module test_detection_cache
+@author joon hyeok
+@date 2025-09-06
+@description 해밍 거리 기준 적중/미스, 해상도·scope 구분, TTL 만료, LRU 용량 제한을 확인합니다.
+"""
+
+import numpy as np
+
+from ai_video import detection_cache as cache_module
+from ai_video.detection_cache import DetectionCache, perceptual_hash
+from ai_video.object_detector import DetectionResult
+
+SHAPE = (720, 1280, 3)
+
+
+def _person():
+    return [DetectionResult((10, 10, 50, 90), 0.9, 0, 'person', (30, 50), 1)]
+
+
+def test_near_hash_hits_and_far_hash_misses():
+    cache = DetectionCache(max_distance=2)
+    cache.store(0b1010_0000, SHAPE, _person())
+    assert cache.lookup(0b1010_0011, SHAPE)[0].class_name == 'person'  # 거리 2
+    assert cache.lookup(0b0101_0111, SHAPE) is None
+    assert cache.stats == {'hits': 1, 'misses': 1}
+
+
+def test_lookup_returns_copies():
+    cache = DetectionCache()
+    cache.store(1, SHAPE, _person())
+    cache.lookup(1, SHAPE)[0].track_id = 99
+    assert cache.lookup(1, SHAPE)[0].track_id == 1
+
+
+def test_resolution_and_scope_are_part_of_the_key():
+    cache = DetectionCache()
+    cache.store(1, SHAPE, _person(), scope='stream-a')
+    assert cache.lookup(1, (480, 640, 3), 'stream-a') is None
+    assert cache.lookup(1, SHAPE, 'stream-b') is None
+    assert cache.lookup(1, SHAPE) is None
+    assert cache.lookup(1, SHAPE, 'stream-a') is not None
+
+
+def test_expired_entry_misses_and_is_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_module, 'time', lambda: now[0])
+    cache = DetectionCache(ttl=30.0)
+    cache.store(1, SHAPE, _person())
+    now[0] += 29.0
+    assert cache.lookup(1, SHAPE) is not None
+    now[0] += 2.0
+    assert cache.lookup(1, SHAPE) is None
+    assert cache.get_stats()['entries'] == 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = DetectionCache(max_entries=2, max_distance=0)
+    cache.store(1, SHAPE, _person())
+    cache.store(2, SHAPE, _person())
+    cache.lookup(1, SHAPE)
+    cache.store(4, SHAPE, _person())
+    assert cache.lookup(2, SHAPE) is None
+    assert cache.lookup(1, SHAPE) is not None
+
+
+def test_perceptual_hash_ignores_brightness_shift():
+    gradient = np.tile(np.arange(0, 160, dtype=np.uint8), (90, 1))
+    assert perceptual_hash(gradient) == perceptual_hash(gradient + 40)
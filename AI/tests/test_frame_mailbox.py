@@ -0,0 +1,62 @@
+"""
+프레임 메일박스 테스트
+@module test_frame_mailbox
+@author joon hyeok
+@date 2025-09-06
+@description 최신 프레임만 남기고 교체 수를 세며, 닫으면 대기 중인 워커가 깨어나고, 워커를 다시 시작하면 메일박스가 다시 열리는지 확인합니다.
+"""
+
+import threading
+from time import time
+
+from ai_video.video_processor import FrameMailbox, VideoProcessor
+
+
+def test_latest_frame_wins():
+    mailbox = FrameMailbox()
+    for frame in ('a', 'b', 'c'):
+        mailbox.put(frame)
+    assert mailbox.take(timeout=0.1) == 'c'
+    assert mailbox.replaced_count == 2
+    assert mailbox.taken_ingest_time is not None
+
+
+def test_take_waits_for_timeout_when_empty():
+    mailbox = FrameMailbox()
+    start = time()
+    assert mailbox.take(timeout=0.05) is None
+    assert time() - start >= 0.04
+
+
+def test_close_wakes_waiting_worker():
+    mailbox = FrameMailbox()
+    taken = []
+    worker = threading.Thread(target=lambda: taken.append(mailbox.take(timeout=5.0)))
+    worker.start()
+    mailbox.close()
+    worker.join(1.0)
+    assert not worker.is_alive() and taken == [None]
+
+
+def test_reopen_restores_blocking_take():
+    mailbox = FrameMailbox()
+    mailbox.put('stale')
+    mailbox.close()
+    mailbox.reopen()
+    start = time()
+    assert mailbox.take(timeout=0.05) is None
+    assert time() - start >= 0.04
+    mailbox.put('fresh')
+    assert mailbox.take(timeout=0.1) == 'fresh'
+
+
+def test_restarted_worker_gets_an_open_mailbox():
+    vp = VideoProcessor()
+    try:
+        vp.release_resources()
+        assert vp.frame_mailbox.closed
+        vp._start_processing_thread()
+        assert not vp.frame_mailbox.closed
+        assert vp.processing_thread.is_alive()
+    finally:
+        vp.release_resources()
@@ -0,0 +1,65 @@
+"""
+추론 거버너 테스트
+@module test_inference_governor
+@author joon hyeok
+@date 2025-09-06
+@description 대기/CPU 과부하 시 곱셈 감소, 여유 시 용량 한도 안의 증가, 모션·우선순위 가중 분배와 최소 감지 간격 환산을 확인합니다.
+"""
+
+import pytest
+
+from ai_video.inference_governor import InferenceGovernor, _SessionDemand
+
+
+@pytest.fixture
+def governor(monkeypatch):
+    gov = InferenceGovernor()
+    gov.concurrency = 1
+    gov.target_wait = 0.05
+    gov.target_cpu = 0.9
+    gov.cpu = 0.1
+    monkeypatch.setattr(gov, '_read_cpu_util', lambda: gov.cpu)
+    gov._sessions = {1: _SessionDemand('busy'), 2: _SessionDemand('idle')}
+    return gov
+
+
+def _window(gov, wait: float, service: float, detections: int = 10) -> None:
+    gov._window_wait = wait * detections
+    gov._window_service = service * detections
+    gov._window_detections = detections
+    gov._last_rebalance -= 1.0
+    gov._rebalance()
+
+
+def test_budget_starts_at_capacity_and_backs_off_on_queue_wait(governor):
+    _window(governor, wait=0.0, service=0.02)
+    assert governor.budget == pytest.approx(50.0)
+    _window(governor, wait=0.5, service=0.02)
+    assert governor.budget == pytest.approx(40.0)
+
+
+def test_budget_backs_off_on_cpu_and_recovers_up_to_capacity(governor):
+    _window(governor, wait=0.0, service=0.02)
+    governor.cpu = 0.95
+    _window(governor, wait=0.0, service=0.02)
+    assert governor.budget == pytest.approx(40.0)
+    governor.cpu = 0.1
+    for _ in range(10):
+        _window(governor, wait=0.0, service=0.02)
+    assert governor.budget == pytest.approx(50.0)
+
+
+def test_budget_is_split_by_motion_and_priority(governor):
+    busy, idle = governor._sessions[1], governor._sessions[2]
+    busy.motion_ema = 0.05
+    busy.frames = idle.frames = 30
+    _window(governor, wait=0.0, service=0.1)  # 용량 10/초
+    # 가중치 1.2 : 0.2
+    assert busy.budget == pytest.approx(10.0 * 1.2 / 1.4)
+    assert idle.budget == pytest.approx(10.0 * 0.2 / 1.4)
+    assert idle.min_stride > busy.min_stride >= 1
+
+    idle.priority = 6.0
+    idle.frames = busy.frames = 30
+    _window(governor, wait=0.0, service=0.1)
+    assert idle.budget == pytest.approx(busy.budget)
@@ -0,0 +1,75 @@
+"""
+추론 스케줄러 테스트
+@module test_inference_scheduler
+@author joon hyeok
+@date 2025-09-06
+@description 티어 가중치 공정 배분, 비차단 토큰 버킷 상한, 기본 티어 무제한을 확인합니다.
+"""
+
+import threading
+from time import sleep, time
+
+import pytest
+
+from config import config
+from ai_video.inference_scheduler import InferenceScheduler, _parse_tiers
+
+
+@pytest.fixture
+def make_scheduler(monkeypatch):
+    def _make(tiers: str, concurrency: int = 1) -> InferenceScheduler:
+        monkeypatch.setattr(config, 'VIDEO_PRIORITY_TIERS', tiers)
+        monkeypatch.setattr(config, 'VIDEO_INFERENCE_CONCURRENCY', concurrency)
+        return InferenceScheduler()
+    return _make
+
+
+def test_parse_tiers_keeps_default_unlimited():
+    tiers = _parse_tiers(config.VIDEO_PRIORITY_TIERS)
+    assert tiers['free']['rate'] == 0.0
+
+
+def test_weighted_sessions_share_slot_by_weight(make_scheduler):
+    scheduler = make_scheduler('paid:4:0,free:1:0')
+    scheduler.register('paid', 'paid-session', 'paid')
+    scheduler.register('free', 'free-session', 'free')
+    counts = {'paid': 0, 'free': 0}
+    # 앞 구간은 세션별 추론 시간 EMA가 실제 값에 수렴하도록 세지 않음
+    measure_from = time() + 0.4
+    deadline = measure_from + 0.8
+
+    def worker(key):
+        while time() < deadline:
+            with scheduler.slot(key):
+                sleep(0.005)
+            if time() >= measure_from:
+                counts[key] += 1
+
+    threads = [threading.Thread(target=worker, args=(key,)) for key in counts]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ratio = counts['paid'] / max(1, counts['free'])
+    assert 2.5 <= ratio <= 6.0, counts
+
+
+def test_empty_bucket_skips_without_blocking(make_scheduler):
+    scheduler = make_scheduler('paid:4:0,free:1:5')
+    scheduler.register('viewer', 'viewer-session', 'free')
+
+    start = time()
+    granted = [scheduler.try_acquire('viewer') for _ in range(8)]
+    assert time() - start < 0.05
+    assert granted == [True] * 5 + [False] * 3
+    assert scheduler.get_stats()['sessions']['viewer-session']['throttled'] == 3
+
+    sleep(0.25)  # 초당 5개 → 1개 이상 충전
+    assert scheduler.try_acquire('viewer')
+
+
+def test_default_tier_is_unlimited(make_scheduler):
+    scheduler = make_scheduler(config.VIDEO_PRIORITY_TIERS)
+    scheduler.register('viewer', 'viewer-session')
+    assert all(scheduler.try_acquire('viewer') for _ in range(100))
@@ -0,0 +1,86 @@
+"""
+메트릭 렌더링 테스트
+@module test_metrics
+@author joon hyeok
+@date 2025-09-06
+@description Prometheus 텍스트 형식(라벨 이스케이프, 누적 히스토그램 버킷), 수집기 오류 격리, 종료된 세션 시계열 제거를 확인합니다.
+"""
+
+import queue
+
+from server.metrics import MetricsRegistry, metrics, session_collector
+
+
+def test_counter_and_gauge_render_with_escaped_labels():
+    registry = MetricsRegistry()
+    counter = registry.counter('t_events_total', '이벤트 수', ['session'])
+    counter.labels('a"b\\c').inc(2)
+    registry.gauge('t_depth', '큐 길이').set(3)
+
+    text = registry.render()
+    assert '# HELP t_events_total 이벤트 수\n# TYPE t_events_total counter\n' in text
+    assert 't_events_total{session="a\\"b\\\\c"} 2.0\n' in text
+    assert '# TYPE t_depth gauge\nt_depth 3\n' in text
+    assert text.endswith('\n')
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('t_latency_seconds', '지연', buckets=(0.1, 0.5))
+    for value in (0.05, 0.2, 0.3, 2.0):
+        histogram.observe(value)
+
+    lines = registry.render().splitlines()
+    assert 't_latency_seconds_bucket{le="0.1"} 1' in lines
+    assert 't_latency_seconds_bucket{le="0.5"} 3' in lines
+    assert 't_latency_seconds_bucket{le="+Inf"} 4' in lines
+    assert 't_latency_seconds_count 4' in lines
+    assert any(line.startswith('t_latency_seconds_sum 2.55') for line in lines)
+
+
+def test_registering_the_same_name_returns_the_existing_metric():
+    registry = MetricsRegistry()
+    assert registry.counter('t_total', 'a') is registry.counter('t_total', 'b')
+
+
+def test_failing_collector_does_not_break_render():
+    registry = MetricsRegistry()
+    gauge = registry.gauge('t_value', '값')
+    registry.add_collector(lambda: 1 / 0)
+    registry.add_collector(lambda: gauge.set(7))
+    assert 't_value 7\n' in registry.render()
+
+
+class FakeProcessor:
+    def __init__(self):
+        self.processing_stats = {'processing_time': 1.5, 'detection_time': 0.5}
+        self.frame_mailbox = type('Mailbox', (), {'replaced_count': 4})()
+        self.output_frame_queue = queue.Queue()
+
+
+class FakeVideoTrack:
+    def __init__(self):
+        self.video_processor = FakeProcessor()
+        self.frames_in = 30
+        self.frames_out = 25
+
+
+class FakeManager:
+    def __init__(self):
+        self.peer_connections = {}
+        self.source_tracks = {}
+
+
+def test_session_series_disappear_with_the_session():
+    manager = FakeManager()
+    manager.source_tracks['metrics-session'] = {'video': FakeVideoTrack()}
+    collect = session_collector(manager)
+
+    collect()
+    text = metrics.render()
+    assert 'nimf_video_frames_in_total{session="metrics-session"} 30' in text
+    assert 'nimf_video_frames_dropped_total{session="metrics-session"} 4' in text
+
+    manager.source_tracks.clear()
+    collect()
+    assert 'session="metrics-session"' not in metrics.render()
@@ -0,0 +1,62 @@
+"""
+모델 준비 전 offer 보류 및 원본 중계 해상도 테스트
+@module test_offer_readiness
+@author joon hyeok
+@date 2025-09-06
+@description 모델 로딩 중 offer는 not_ready로 거부되고, 물체 감지 비활성화 세션의 원본 중계도 1280x720으로 나가는지 확인합니다.
+"""
+
+import asyncio
+import fractions
+import json
+
+import av
+
+import server.dependencies  # noqa: F401  (main.py와 같이 server 디렉토리를 임포트 경로에 추가)
+from server.admission import ADMIT_NOT_READY
+from server.readiness import model_readiness
+from server.websocket_handler import handle_webrtc_message
+from webrtc.unified_track import ScaledVideoTrack
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send_text(self, text: str) -> None:
+        self.sent.append(json.loads(text))
+
+
+class FakeManager:
+    def __init__(self):
+        self.peer_connections = {}
+        self.added_tracks = {}
+
+
+class FakeTrack:
+    kind = 'video'
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+
+    async def recv(self):
+        frame = av.VideoFrame(self.width, self.height, 'yuv420p')
+        frame.pts = 3000
+        frame.time_base = fractions.Fraction(1, 90000)
+        return frame
+
+
+def test_offer_is_deferred_until_models_are_ready(monkeypatch):
+    monkeypatch.setattr(model_readiness, 'started_at', None)
+    websocket, manager = FakeWebSocket(), FakeManager()
+    data = {'sessionId': 's1', 'signal': {'type': 'offer', 'sdp': ''}}
+    asyncio.run(handle_webrtc_message(data, websocket, manager))
+    assert websocket.sent[0]['decision'] == ADMIT_NOT_READY
+    assert manager.peer_connections == {}
+
+
+def test_scaled_track_keeps_streaming_resolution_and_timestamps():
+    frame = asyncio.run(ScaledVideoTrack(FakeTrack(640, 480)).recv())
+    assert (frame.width, frame.height) == (1280, 720)
+    assert frame.pts == 3000 and frame.time_base == fractions.Fraction(1, 90000)
@@ -0,0 +1,87 @@
+"""
+출력 페이싱 클럭 테스트
+@module test_output_pacing
+@author joon hyeok
+@date 2025-09-06
+@description 슬롯이 프레임 간격마다 한 번씩 열리고, 크게 밀리면 몰아서 송출하지 않고 재정렬하며, 세션 FPS는 서버 기본값 이하로 제한되는지 확인합니다.
+"""
+
+import asyncio
+
+import pytest
+
+from config import config
+from ai_video import video_processor
+from ai_video.video_processor import VideoEchoTrack
+
+
+class IdleTrack:
+    kind = 'video'
+
+    async def recv(self):
+        await asyncio.Event().wait()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+
+    async def fake_sleep(seconds):
+        now[0] += seconds
+
+    monkeypatch.setattr(video_processor.asyncio, 'sleep', fake_sleep)
+    return now
+
+
+def _with_track(body):
+    async def run():
+        loop = asyncio.get_running_loop()
+        track = VideoEchoTrack(IdleTrack())
+        try:
+            return await body(track, loop)
+        finally:
+            track.stop()
+    return asyncio.run(run())
+
+
+def test_slots_open_once_per_frame_interval(clock, monkeypatch):
+    monkeypatch.setattr(config, 'VIDEO_OUTPUT_FPS', 30.0)
+
+    async def body(track, loop):
+        loop.time = lambda: clock[0]
+        track.set_target_fps(10)
+        return [await track._wait_next_slot() for _ in range(3)]
+
+    slots = _with_track(body)
+    assert slots == pytest.approx([100.0, 100.1, 100.2])
+    assert clock[0] == pytest.approx(100.2)
+
+
+def test_clock_realigns_instead_of_bursting(clock, monkeypatch):
+    monkeypatch.setattr(config, 'VIDEO_OUTPUT_FPS', 30.0)
+
+    async def body(track, loop):
+        loop.time = lambda: clock[0]
+        track.set_target_fps(10)
+        await track._wait_next_slot()
+        clock[0] += 1.0  # 10 슬롯만큼 뒤처짐
+        late = await track._wait_next_slot()
+        following = await track._wait_next_slot()
+        return late, following
+
+    late, following = _with_track(body)
+    assert late == pytest.approx(101.0)
+    assert following == pytest.approx(101.1)
+
+
+def test_session_fps_is_capped_by_server_default(monkeypatch):
+    monkeypatch.setattr(config, 'VIDEO_OUTPUT_FPS', 30.0)
+
+    async def body(track, loop):
+        rates = []
+        for fps in (120, 0, float('nan'), 15):
+            track.set_target_fps(fps)
+            rates.append(track._target_fps)
+        return rates
+
+    assert _with_track(body) == [30.0, 1.0, 1.0, 15.0]
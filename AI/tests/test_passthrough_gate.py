@@ -0,0 +1,93 @@
+"""
+패스스루 허용 조건 테스트
+@module test_passthrough_gate
+@author joon hyeok
+@date 2025-09-06
+@description 스트리밍 서버 구독자가 있으면 수신 해상도가 1280x720일 때만 패스스루하고, 패스스루 중 SPS가 바뀌면 전체 파이프라인으로 돌아가는지 확인합니다.
+"""
+
+import asyncio
+
+from webrtc.passthrough import PassthroughController, h264_sps
+from webrtc.shared_encoder import SharedVideoEncoder, STREAMING_RESOLUTION
+
+SPS_720P = b'\x00\x00\x00\x01\x67\x42\xc0\x1f\xda\x01\x40\x16\xe8'
+SPS_480P = b'\x00\x00\x00\x01\x67\x42\xc0\x1e\xda\x02\x80\xf6\x80'
+IDR = b'\x00\x00\x00\x01\x65\x88\x84'
+
+
+class FakeSource:
+    def __init__(self):
+        self.input_size = None
+        self.route_changes = 0
+
+    def update_passthrough_mode(self) -> None:
+        self.route_changes += 1
+
+
+def _gate(streaming: bool, input_size) -> bool:
+    async def run():
+        source = FakeSource()
+        source.input_size = input_size
+        encoder = SharedVideoEncoder(source, 'gate')
+        track = encoder.subscribe(streaming=streaming)
+        allowed = encoder.can_passthrough()
+        track.stop()
+        return allowed
+    return asyncio.run(run())
+
+
+def test_client_only_route_passes_any_resolution():
+    assert _gate(streaming=False, input_size=(640, 480))
+
+
+def test_streaming_route_requires_relay_resolution():
+    assert not _gate(streaming=True, input_size=(640, 480))
+    assert not _gate(streaming=True, input_size=None)
+    assert _gate(streaming=True, input_size=STREAMING_RESOLUTION)
+
+
+class FakeCodec:
+    mimeType = 'video/H264'
+
+
+class FakeEncodedFrame:
+    def __init__(self, data: bytes):
+        self.data = data
+        self.timestamp = 0
+
+
+class FakeQueue:
+    def __init__(self):
+        self.items = []
+
+    def put(self, item, block=True, timeout=None):
+        self.items.append(item)
+
+    def put_nowait(self, item):
+        self.items.append(item)
+
+
+def test_sps_change_during_bypass_returns_to_decoder():
+    decoder, remote = FakeQueue(), FakeQueue()
+    controller = PassthroughController(receiver=None, track=None)
+    controller._decoder_queue = decoder
+    controller._track = type('Track', (), {'_queue': remote})()
+    controller.installed = True
+    changes = []
+    controller.on_stream_change = lambda: changes.append(True)
+    controller.want_bypass = True
+
+    controller.put((FakeCodec(), FakeEncodedFrame(SPS_720P + IDR)))
+    controller.put((FakeCodec(), FakeEncodedFrame(SPS_720P + IDR)))
+    assert controller.bypassing and len(remote.items) == 2
+
+    controller.put((FakeCodec(), FakeEncodedFrame(SPS_480P + IDR)))
+    assert not controller.bypassing and not controller.want_bypass
+    assert changes == [True]
+    assert len(decoder.items) == 1
+
+
+def test_sps_is_extracted_from_annex_b():
+    assert h264_sps(SPS_720P + IDR) == SPS_720P[4:]
+    assert h264_sps(IDR) is None
@@ -0,0 +1,102 @@
+"""
+영역 감지 ID 부여/알림 테스트
+@module test_region_track_ids
+@author joon hyeok
+@date 2025-09-06
+@description 영역 감지 → 전체 감지 → 영역 감지 순서에서 같은 물체의 알림이 한 번만 나가는지 확인합니다.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from ai_video.object_detector import DetectionResult
+from ai_video.video_processor import VideoProcessor, _merge_rects
+
+KNIFE = 5
+
+
+class FakeChannel:
+    def __init__(self):
+        self.messages = []
+
+    def send(self, message):
+        self.messages.append(json.loads(message))
+
+
+class FakeDetector:
+    """detect/detect_regions가 미리 정한 결과를 돌려주는 감지기"""
+
+    def __init__(self):
+        self.full = []
+        self.regions = []
+
+    def detect(self, image):
+        return [_copy(d) for d in self.full]
+
+    def detect_regions(self, image, regions):
+        return [_copy(d) for d in self.regions]
+
+
+def _copy(detection):
+    return DetectionResult(detection.bbox, detection.confidence, detection.class_id,
+                           detection.class_name, detection.center, detection.track_id)
+
+
+def _knife(x, track_id=None):
+    return DetectionResult((x, 100, x + 60, 160), 0.9, KNIFE, 'knife', (x + 30, 130), track_id)
+
+
+@pytest.fixture
+def processor():
+    vp = VideoProcessor()
+    vp.release_resources()  # 워커 스레드 없이 감지 경로만 직접 호출
+    vp.object_detector = FakeDetector()
+    vp.cascade_detector = None
+    vp.box_tracker = None
+    vp.detection_cache = None
+    vp.detection_filter.set_class_filter([KNIFE])
+    vp.data_channel = FakeChannel()
+    vp.session_id = 'test-session'
+    yield vp
+
+
+def test_region_full_region_alerts_once(processor):
+    img = np.zeros((360, 640, 3), dtype=np.uint8)
+    detector = processor.object_detector
+
+    # 1) 영역 감지로 처음 본 물체: 임시 ID, 알림 없음, 전체 감지 확정 요청
+    detector.regions = [_knife(100)]
+    detections = processor._detect_regions_thread_safe(img, [(80, 80, 200, 200)])
+    assert detections[0].track_id < 0
+    assert processor._confirm_requested
+    processor.process_detection_results()
+    assert processor.data_channel.messages == []
+
+    # 2) 전체 감지가 ByteTrack ID를 붙이면 한 번 알림
+    detector.full = [_knife(104, track_id=1)]
+    processor.current_detections = processor._detect_objects_thread_safe(img)
+    processor.process_detection_results()
+    assert len(processor.data_channel.messages) == 1
+
+    # 3) 조금 움직인 물체는 이전 박스 ID를 이어받고, 많이 움직여 매칭이 안 돼도 임시 ID라 알림 없음
+    processor.current_detections = [_knife(104, track_id=1)]
+    detector.regions = [_knife(110)]
+    detections = processor._detect_regions_thread_safe(img, [(90, 80, 220, 200)])
+    assert [d.track_id for d in detections] == [1]
+    detector.regions = [_knife(300)]
+    detections = processor._detect_regions_thread_safe(img, [(280, 80, 400, 200)])
+    assert detections[-1].track_id < 0
+    processor.process_detection_results()
+
+    # 4) 다음 전체 감지에서 ByteTrack이 같은 ID를 유지하면 재알림 없음
+    detector.full = [_knife(300, track_id=1)]
+    processor.current_detections = processor._detect_objects_thread_safe(img)
+    processor.process_detection_results()
+    assert len(processor.data_channel.messages) == 1
+
+
+def test_merge_rects_joins_overlapping_chains():
+    merged = _merge_rects([[0, 0, 10, 10], [20, 0, 30, 10], [5, 0, 25, 10], [100, 100, 110, 110]])
+    assert sorted(map(tuple, merged)) == [(0, 0, 30, 10), (100, 100, 110, 110)]
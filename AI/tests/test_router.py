@@ -0,0 +1,48 @@
+"""
+세션 라우터 테스트
+@module test_router
+@author joon hyeok
+@date 2025-09-06
+@description sessionId 없는 WebSocket은 0번 워커로 고정하지 않고 거부하며, 관리자 조회는 ?worker=로 대상 워커를 고르는지 확인합니다.
+"""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from config import config
+from server import router
+from server.router import create_router_app
+
+
+@pytest.fixture
+def client(monkeypatch):
+    # 아무도 듣지 않는 포트로 워커 연결은 즉시 실패
+    monkeypatch.setattr(config, 'SUPERVISOR_WORKER_BASE_PORT', 1)
+    return TestClient(create_router_app(worker_count=2))
+
+
+def test_session_id_is_read_from_any_message():
+    assert router._session_id_of(json.dumps({'type': 'ping'})) is None
+    assert router._session_id_of('not json') is None
+    assert router._session_id_of(json.dumps({'type': 'webrtc', 'sessionId': 's1'})) == 's1'
+
+
+def test_websocket_without_session_id_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(router, '_SESSION_WAIT_MESSAGES', 3)
+    with client.websocket_connect('/ws') as websocket:
+        for _ in range(3):
+            websocket.send_text(json.dumps({'type': 'ping'}))
+        with pytest.raises(WebSocketDisconnect) as closed:
+            websocket.receive_text()
+    assert closed.value.code == 1008
+
+
+def test_admin_get_worker_selector(client):
+    assert client.get('/admin/trace?worker=2').status_code == 400
+    assert client.get('/admin/trace?worker=x').status_code == 400
+    response = client.get('/admin/trace?worker=1')
+    assert response.status_code == 502
+    assert '워커 1' in response.json()['detail']
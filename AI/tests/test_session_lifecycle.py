@@ -0,0 +1,120 @@
+"""
+세션 생명주기 테스트
+@module test_session_lifecycle
+@author joon hyeok
+@date 2025-09-06
+@description 열린 WebSocket에 연결된 세션은 유휴 정리·필터 삭제 대상이 아니고, 고아 세션만 정리되며 정리 후 자원 집계가 0으로 돌아오는지 확인합니다.
+"""
+
+import asyncio
+
+import pytest
+
+from server.session_lifecycle import SessionLifecycleManager
+from session_state_manager import session_state_manager
+
+FILTERS = {'videoFilter': None, 'audioFilter': None}
+
+
+class FakeManager:
+    def __init__(self):
+        self.active_connections = []
+        self.peer_connections = {}
+        self.added_tracks = {}
+        self.source_tracks = {}
+        self.stream_keys = {}
+        self.shared_encoders = {}
+        self.streaming_peer_connections = {}
+
+
+class FakePeer:
+    def __init__(self, state: str):
+        self.connectionState = state
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+        self.connectionState = 'closed'
+
+
+class FakeTrack:
+    def __init__(self):
+        self.stopped = False
+
+    def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def lifecycle():
+    manager = FakeManager()
+    lifecycle = SessionLifecycleManager()
+    lifecycle.idle_timeout = 30.0
+    lifecycle._manager = manager
+    yield lifecycle
+    for session_id in ('bound', 'orphan'):
+        session_state_manager.remove_session_filter(session_id)
+
+
+def _open_session(lifecycle, session_id: str, peer_state: str) -> FakePeer:
+    manager = lifecycle._manager
+    peer = FakePeer(peer_state)
+    manager.peer_connections[session_id] = {'unified': peer}
+    manager.added_tracks[session_id] = {}
+    manager.source_tracks[session_id] = {'video': FakeTrack()}
+    session_state_manager.set_session_filter(session_id, FILTERS)
+    return peer
+
+
+def test_only_orphaned_sessions_are_reaped(lifecycle):
+    websocket = object()
+    _open_session(lifecycle, 'bound', 'new')
+    orphan_peer = _open_session(lifecycle, 'orphan', 'checking')
+    lifecycle.bind_websocket('bound', websocket)
+
+    asyncio.run(lifecycle._sweep_once(1000.0))
+    asyncio.run(lifecycle._sweep_once(1031.0))
+
+    assert 'bound' in lifecycle._manager.peer_connections
+    assert session_state_manager.get_session_filter('bound') is not None
+    assert 'orphan' not in lifecycle._manager.peer_connections
+    assert session_state_manager.get_session_filter('orphan') is None
+    assert orphan_peer.closed
+    assert lifecycle.stats['teardown_reasons'] == {'idle_timeout': 1}
+
+
+def test_peer_failure_keeps_filters_of_live_socket(lifecycle):
+    websocket = object()
+    _open_session(lifecycle, 'bound', 'failed')
+    lifecycle.bind_websocket('bound', websocket)
+
+    asyncio.run(lifecycle.teardown('bound', 'peer_failed'))
+    assert 'bound' not in lifecycle._manager.peer_connections
+    assert session_state_manager.get_session_filter('bound') is not None
+
+
+def test_stale_socket_does_not_release_reconnected_session(lifecycle):
+    old_socket, new_socket = object(), object()
+    lifecycle.bind_websocket('bound', old_socket)
+    lifecycle.bind_websocket('bound', new_socket)
+    assert not lifecycle.unbind_websocket('bound', old_socket)
+    assert lifecycle.unbind_websocket('bound', new_socket)
+
+
+def test_accounting_returns_to_zero_after_teardown(lifecycle):
+    websocket = object()
+    peer = _open_session(lifecycle, 'bound', 'connected')
+    track = lifecycle._manager.source_tracks['bound']['video']
+    lifecycle.bind_websocket('bound', websocket)
+    lifecycle.track('video_track', track)
+
+    assert lifecycle.unbind_websocket('bound', websocket)
+    asyncio.run(lifecycle.teardown('bound', 'websocket_disconnect'))
+
+    accounting = lifecycle.get_accounting()
+    assert peer.closed and track.stopped
+    assert all(size == 0 for size in accounting['connection_manager'].values())
+    assert accounting['tracked_sessions'] == 0
+    assert accounting['bound_websockets'] == 0
+    assert 'bound' not in session_state_manager.get_all_sessions()
+    assert accounting['lifecycle']['teardowns'] == 1
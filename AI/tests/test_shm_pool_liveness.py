@@ -0,0 +1,84 @@
+"""
+공유 메모리 추론 풀 생존 감시 테스트
+@module test_shm_pool_liveness
+@author joon hyeok
+@date 2025-09-06
+@description 로드 중 프로세스가 죽으면 wait_ready가 바로 실패하고, 서비스 중 죽으면 같은 번호로 재시작되는지 확인합니다.
+"""
+
+import threading
+from time import sleep, time
+
+import pytest
+
+from config import config
+from ai_video.shm_transport import ShmInferencePool
+
+
+class FakeProcess:
+    def __init__(self, alive: bool = True):
+        self.alive = alive
+        self.exitcode = None if alive else -9
+        self.pid = 0
+
+    def is_alive(self) -> bool:
+        return self.alive
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(config, 'VIDEO_SHM_HEALTH_INTERVAL', 0.01)
+    pool = ShmInferencePool()
+    spawned = []
+
+    def fake_spawn(index):
+        spawned.append(index)
+        pool.processes[index] = FakeProcess()
+
+    monkeypatch.setattr(pool, '_spawn', fake_spawn)
+    pool.spawned = spawned
+    yield pool
+    pool._stopping.set()
+
+
+def _start_monitor(pool):
+    pool._monitor = threading.Thread(target=pool._watch, daemon=True)
+    pool._monitor.start()
+
+
+def test_wait_ready_fails_fast_when_process_dies_during_load(pool):
+    pool.processes = [FakeProcess(alive=False)]
+    _start_monitor(pool)
+    start = time()
+    assert pool.wait_ready(5.0) is False
+    assert time() - start < 1.0
+    assert pool.failed and not pool.is_running
+
+
+def test_wait_ready_is_bounded(pool):
+    pool.processes = [FakeProcess()]
+    assert pool.wait_ready(0.05) is False
+    assert not pool.failed
+
+
+def test_dead_process_is_respawned_after_ready(pool):
+    pool.processes = [FakeProcess(), FakeProcess(alive=False)]
+    pool._request_queues = [None, None]
+    pool._ready.set()
+    _start_monitor(pool)
+    deadline = time() + 2.0
+    while not pool.spawned and time() < deadline:
+        sleep(0.01)
+    assert pool.spawned == [1]
+    assert pool.stats['respawns'] == 1
+    assert pool.processes[1].is_alive()
+    assert pool.is_running
+
+
+def test_respawn_limit_marks_pool_failed(pool, monkeypatch):
+    monkeypatch.setattr(config, 'VIDEO_SHM_MAX_RESPAWNS', 0)
+    pool.processes = [FakeProcess(alive=False)]
+    pool._ready.set()
+    _start_monitor(pool)
+    pool._monitor.join(2.0)
+    assert pool.failed and pool.spawned == []
@@ -0,0 +1,63 @@
+"""
+공유 메모리 추론 풀 모델 교체 테스트
+@module test_shm_pool_swap
+@author joon hyeok
+@date 2025-09-06
+@description 추론 프로세스 교체가 끝나면 클래스 이름을 새 모델 것으로 바꾸고, 로컬 핫스왑과 같은 경로로 세대를 올리는지 확인합니다.
+"""
+
+import pytest
+
+from config import config
+from ai_video import video_processor
+from ai_video.shm_transport import ShmInferencePool
+
+
+class SwapQueue:
+    """swap 요청을 받으면 추론 프로세스 대신 바로 결과를 돌려주는 요청 큐"""
+
+    def __init__(self, pool: ShmInferencePool, index: int, result: dict):
+        self.pool = pool
+        self.index = index
+        self.result = result
+
+    def put(self, message) -> None:
+        with self.pool._swap_done:
+            self.pool._swap_results[self.index] = dict(self.result)
+            self.pool._swap_done.notify_all()
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(type(config), 'YOLO_MODEL_PATH', config.YOLO_MODEL_PATH)
+    pool = ShmInferencePool()
+    pool.class_names = {0: 'person'}
+    return pool
+
+
+def test_successful_swap_updates_classes_and_generation(pool):
+    classes = {0: '칼', 1: '총'}
+    pool._request_queues = [SwapQueue(pool, i, {'generation': 1, 'classes': classes}) for i in range(2)]
+    generation = video_processor.get_global_detector_generation()
+
+    result = pool.swap('new.pt', warmup_runs=0, timeout=1.0)
+
+    assert pool.class_names == classes
+    assert video_processor.get_global_detector_generation() == generation + 1
+    assert result['generation'] == generation + 1
+    assert config.YOLO_MODEL_PATH == 'new.pt'
+    assert all('classes' not in process for process in result['processes'].values())
+
+
+def test_failed_swap_keeps_classes_and_generation(pool):
+    pool._request_queues = [
+        SwapQueue(pool, 0, {'generation': 1, 'classes': {0: '칼'}}),
+        SwapQueue(pool, 1, {'error': 'load failed'}),
+    ]
+    generation = video_processor.get_global_detector_generation()
+
+    with pytest.raises(RuntimeError):
+        pool.swap('broken.pt', warmup_runs=0, timeout=1.0)
+
+    assert pool.class_names == {0: 'person'}
+    assert video_processor.get_global_detector_generation() == generation
@@ -0,0 +1,20 @@
+"""
+Whisper 워밍업 인스턴스 인계 테스트
+@module test_whisper_warm_handoff
+@author joon hyeok
+@date 2025-09-06
+@description 워밍업한 모델은 그 크기의 첫 세션에 한 번만 넘겨지고, 이후 세션은 새로 로드하는지 확인합니다.
+"""
+
+from ai_audio import stt_engine
+
+
+def test_warmed_model_goes_to_first_session_only(monkeypatch):
+    loaded = []
+    monkeypatch.setattr(stt_engine, '_warm_models', {'small': ['warm-small']})
+    monkeypatch.setattr(stt_engine, 'load_whisper_model', lambda size: loaded.append(size) or f'fresh-{size}')
+
+    assert stt_engine.acquire_whisper_model('small') == ('warm-small', True)
+    assert stt_engine.acquire_whisper_model('small') == ('fresh-small', False)
+    assert stt_engine.acquire_whisper_model('medium') == ('fresh-medium', False)
+    assert loaded == ['small', 'medium']
@@ -0,0 +1,198 @@
+"""
+인코딩 패킷 패스스루 모듈
+@module passthrough
+@author joon hyeok
+@date 2025-08-21
+@description 필터링이 꺼진 세션에서 수신한 H.264 패킷을 디코딩/재인코딩 없이 그대로 전달합니다.
+"""
+
+import asyncio
+import fractions
+from typing import Callable, Optional
+
+import av
+
+# 수신 측 RTP 비디오 클럭 (aiortc 타임스탬프 매퍼 기준 90kHz)
+VIDEO_TIME_BASE = fractions.Fraction(1, 90000)
+H264_MIME_TYPE = 'video/h264'
+
+# aiortc 1.5 RTCRtpReceiver의 디코더 입력 큐 속성 (name mangling)
+_DECODER_QUEUE_ATTR = '_RTCRtpReceiver__decoder_queue'
+
+
+def is_h264_keyframe(data: bytes) -> bool:
+    """
+    Annex-B H.264 프레임이 키프레임(IDR 또는 SPS 포함)인지 확인합니다.
+
+    @param {bytes} data - Annex-B 형식 H.264 프레임
+    @returns {bool} 키프레임 여부
+    """
+    index = 0
+    length = len(data)
+    while True:
+        index = data.find(b'\x00\x00\x01', index)
+        if index < 0 or index + 3 >= length:
+            return False
+        nal_type = data[index + 3] & 0x1F
+        if nal_type in (5, 7):
+            return True
+        index += 3
+
+
+def h264_sps(data: bytes) -> Optional[bytes]:
+    """
+    Annex-B H.264 프레임에서 SPS NAL 유닛을 꺼냅니다. (해상도 변경 감지용)
+
+    @param {bytes} data - Annex-B 형식 H.264 프레임
+    @returns {bytes|None} SPS NAL 유닛 (없으면 None)
+    """
+    index = 0
+    length = len(data)
+    while True:
+        index = data.find(b'\x00\x00\x01', index)
+        if index < 0 or index + 3 >= length:
+            return None
+        if data[index + 3] & 0x1F == 7:
+            end = data.find(b'\x00\x00\x01', index + 3)
+            return data[index + 3:end if end >= 0 else length].rstrip(b'\x00')
+        index += 3
+
+
+class PassthroughController:
+    """
+    수신기 디코더 입력 탭
+
+    aiortc RTCRtpReceiver가 디코더 스레드로 넘기는 (codec, encoded_frame)을 가로채서,
+    패스스루 모드에서는 디코딩 대신 av.Packet으로 원격 트랙 큐에 바로 넣습니다.
+    모드 전환은 다음 키프레임에서 이루어지므로 디코더와 하위 피어 모두 깨끗한 지점에서 이어집니다.
+    """
+
+    def __init__(self, receiver, track, session_id: Optional[str] = None):
+        """
+        PassthroughController 초기화
+
+        @param {RTCRtpReceiver} receiver - 비디오 수신기
+        @param {RemoteStreamTrack} track - 수신기의 원격 트랙
+        @param {str} session_id - 세션 ID
+        """
+        self._receiver = receiver
+        self._track = track
+        self._decoder_queue = None
+        self.session_id = session_id
+        self.installed = False
+        self.want_bypass = False  # 요청된 모드
+        self.bypassing = False    # 현재 적용 중인 모드 (키프레임에서 want_bypass를 따라감)
+        self.on_stream_change: Optional[Callable[[], None]] = None  # 패스스루 중 SPS가 바뀌면 호출
+        self._sps: Optional[bytes] = None  # 패스스루 전환 시점의 SPS
+        self.stats = {
+            'packets_forwarded': 0,
+            'mode_switches': 0,
+        }
+
+    def install(self) -> bool:
+        """
+        수신기의 디코더 입력 큐를 이 컨트롤러로 교체합니다.
+
+        @returns {bool} 설치 성공 여부 (aiortc 내부 구조가 다르면 False)
+        """
+        original = getattr(self._receiver, _DECODER_QUEUE_ATTR, None)
+        if original is None or not hasattr(self._track, '_queue'):
+            print(f"⚠️ [{self.session_id}] 패스스루 미지원 aiortc 버전 → 전체 파이프라인 유지")
+            return False
+        self._decoder_queue = original
+        setattr(self._receiver, _DECODER_QUEUE_ATTR, self)
+        self.installed = True
+        return True
+
+    def uninstall(self) -> None:
+        """원래 디코더 입력 큐를 복원합니다."""
+        if self.installed:
+            setattr(self._receiver, _DECODER_QUEUE_ATTR, self._decoder_queue)
+            self.installed = False
+            self.bypassing = False
+
+    def __getattr__(self, name):
+        # put 이외의 queue.Queue 인터페이스는 원래 큐에 위임
+        return getattr(self._decoder_queue, name)
+
+    def put(self, item, block: bool = True, timeout: Optional[float] = None) -> None:
+        """
+        수신기에서 호출: 패스스루 중이면 패킷으로 전달하고, 아니면 디코더 스레드로 넘깁니다.
+        """
+        if item is None or not self._forward(item):
+            self._decoder_queue.put(item, block, timeout)
+
+    def _forward(self, item) -> bool:
+        codec, encoded_frame = item
+        if codec.mimeType.lower() != H264_MIME_TYPE:
+            return False
+
+        keyframe = is_h264_keyframe(encoded_frame.data)
+        if self.bypassing and keyframe and not self._same_stream(encoded_frame.data):
+            # 송신 측 해상도/프로파일 변경 → 디코더로 돌려 새 해상도를 확인한 뒤 다시 판단
+            self.want_bypass = False
+            print(f"📐 [{self.session_id}] 패스스루 중 SPS 변경 감지 → 전체 파이프라인으로 복귀")
+            if self.on_stream_change is not None:
+                self.on_stream_change()
+
+        if self.want_bypass != self.bypassing and keyframe:
+            self.bypassing = self.want_bypass
+            self._sps = h264_sps(encoded_frame.data) if self.bypassing else None
+            self.stats['mode_switches'] += 1
+            mode = "패스스루" if self.bypassing else "전체 파이프라인"
+            print(f"🔀 [{self.session_id}] 키프레임에서 {mode} 모드로 전환")
+
+        if not self.bypassing:
+            return False
+
+        packet = av.Packet(encoded_frame.data)
+        packet.pts = encoded_frame.timestamp
+        packet.time_base = VIDEO_TIME_BASE
+        self._track._queue.put_nowait(packet)
+        self.stats['packets_forwarded'] += 1
+        return True
+
+    def _same_stream(self, data: bytes) -> bool:
+        sps = h264_sps(data)
+        if sps is None or self._sps is None:
+            # SPS 없는 IDR이면 비교할 수 없으니 유지, 전환 시점 SPS가 없었으면 지금 값을 기준으로 삼음
+            self._sps = self._sps or sps
+            return True
+        return sps == self._sps
+
+    def set_bypass(self, enabled: bool) -> None:
+        """
+        패스스루 모드를 요청합니다. 실제 전환은 다음 키프레임에서 일어납니다.
+
+        @param {bool} enabled - 패스스루 사용 여부
+        """
+        if not self.installed or enabled == self.want_bypass:
+            return
+        self.want_bypass = enabled
+        if enabled != self.bypassing:
+            self._request_keyframe()
+
+    def _request_keyframe(self) -> None:
+        """송신 측에 PLI를 보내 전환용 키프레임을 앞당깁니다."""
+        try:
+            sources = self._receiver.getSynchronizationSources()
+            if sources:
+                asyncio.ensure_future(self._receiver._send_rtcp_pli(sources[0].source))
+        except Exception as e:
+            print(f"⚠️ [{self.session_id}] 키프레임 요청 실패: {e}")
+
+
+def install_passthrough(pc, track, session_id: Optional[str] = None) -> Optional[PassthroughController]:
+    """
+    원격 비디오 트랙의 수신기에 패스스루 컨트롤러를 설치합니다.
+
+    @param {RTCPeerConnection} pc - 피어 연결
+    @param {RemoteStreamTrack} track - 수신된 비디오 트랙
+    @param {str} session_id - 세션 ID
+    @returns {PassthroughController|None} 설치된 컨트롤러
+    """
+    receiver = next((r for r in pc.getReceivers() if r.track is track), None)
+    if receiver is None:
+        return None
+    controller = PassthroughController(receiver, track, session_id)
+    return controller if controller.install() else None
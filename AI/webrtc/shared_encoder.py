@@ -0,0 +1,368 @@
+"""
+공유 인코더 트랙 모듈
+@module shared_encoder
+@author joon hyeok
+@date 2025-08-20
+@description 처리된 비디오 프레임을 한 번만 H.264로 인코딩하고, 인코딩된 비트스트림을 여러 피어 연결에 나눠 보냅니다.
+"""
+
+import asyncio
+import fractions
+from time import time
+from typing import Optional, Set, List, Tuple
+
+import av
+from aiortc import MediaStreamTrack
+from aiortc.contrib.media import MediaRelay
+from aiortc.mediastreams import MediaStreamError
+
+from config import config
+from webrtc.passthrough import is_h264_keyframe
+from server.tracing import frame_tracer
+
+# 구독자별 패킷 큐 크기 (초과 시 큐를 비우고 다음 키프레임부터 다시 전달)
+SUBSCRIBER_QUEUE_SIZE = 30
+
+# 스트리밍 서버가 받는 해상도 (FFmpeg -s 1280x720, 크기가 다른 프레임은 버림)
+STREAMING_RESOLUTION = (1280, 720)
+
+
+class EncodedVideoTrack(MediaStreamTrack):
+    """
+    공유 인코더의 구독 트랙
+
+    recv()가 av.Packet을 반환하므로 RTCRtpSender는 인코딩 없이 패킷화만 수행합니다.
+    """
+    kind = "video"
+
+    def __init__(self, encoder: "SharedVideoEncoder"):
+        """
+        EncodedVideoTrack 초기화
+
+        @param {SharedVideoEncoder} encoder - 패킷을 공급하는 공유 인코더
+        """
+        super().__init__()
+        self._encoder = encoder
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._waiting_keyframe = True  # 디코딩 가능한 지점(키프레임)부터 전달
+
+    def _push(self, packet: av.Packet, is_keyframe: bool) -> None:
+        """
+        인코딩된 패킷을 구독자 큐에 넣습니다.
+
+        @param {av.Packet} packet - 인코딩된 패킷
+        @param {bool} is_keyframe - 키프레임 여부
+        """
+        if self._waiting_keyframe:
+            if not is_keyframe:
+                return
+            self._waiting_keyframe = False
+
+        if self._queue.full():
+            # 중간 패킷이 빠지면 디코딩이 깨지므로 큐를 비우고 다음 키프레임부터 다시 전달
+            dropped = 0
+            while not self._queue.empty():
+                self._queue.get_nowait()
+                dropped += 1
+            self._encoder.stats['packets_dropped'] += dropped
+            if not is_keyframe:
+                self._waiting_keyframe = True
+                self._encoder.request_keyframe()
+                return
+
+        self._queue.put_nowait(packet)
+
+    async def recv(self):
+        """
+        다음 인코딩된 패킷을 반환합니다.
+
+        @returns {av.Packet} 인코딩된 H.264 패킷
+        """
+        if self.readyState != "live":
+            raise MediaStreamError
+        packet = await self._queue.get()
+        if packet is None:
+            raise MediaStreamError
+        return packet
+
+    def stop(self) -> None:
+        """구독을 해제하고 트랙을 종료합니다."""
+        if self.readyState == "live":
+            self._encoder._unsubscribe(self)
+            try:
+                self._queue.put_nowait(None)
+            except asyncio.QueueFull:
+                pass
+        super().stop()
+
+
+class SharedVideoEncoder:
+    """
+    세션별 공유 H.264 인코더
+
+    처리된 비디오 트랙을 한 번만 인코딩하고, 협상된 코덱이 H.264인 모든 피어에 같은 비트스트림을 전달합니다.
+    H.264가 아닌 피어는 subscribe_raw()로 원본 프레임을 받아 각자 인코딩합니다.
+    """
+
+    def __init__(self, source: MediaStreamTrack, session_id: Optional[str] = None):
+        """
+        SharedVideoEncoder 초기화
+
+        @param {MediaStreamTrack} source - 처리된 비디오 트랙 (VideoEchoTrack)
+        @param {str} session_id - 세션 ID
+        """
+        self.source = source
+        self.session_id = session_id
+        self.bitrate = config.VIDEO_SHARED_ENCODER_BITRATE
+        self.gop_seconds = config.VIDEO_SHARED_ENCODER_GOP_SECONDS
+
+        # 원본 트랙을 인코더와 원본 구독자가 함께 읽도록 세션 전용 릴레이 사용
+        self._relay = MediaRelay()
+        self._subscribers: Set[EncodedVideoTrack] = set()
+        self._streaming_subscribers: Set[EncodedVideoTrack] = set()
+        self._raw_tracks: Set[MediaStreamTrack] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._codec = None
+        self._force_keyframe = True
+
+        self.stats = {
+            'frames_encoded': 0,
+            'encode_time': 0.0,
+            'keyframes': 0,
+            'packets_dropped': 0,
+            'packets_passed_through': 0,
+        }
+
+    def subscribe(self, streaming: bool = False) -> EncodedVideoTrack:
+        """
+        인코딩된 패킷을 받는 구독 트랙을 생성합니다.
+        새 구독자는 키프레임부터 받을 수 있도록 즉시 키프레임을 요청합니다.
+
+        @param {bool} streaming - 스트리밍 서버 피어 여부 (STREAMING_RESOLUTION만 받을 수 있음)
+        @returns {EncodedVideoTrack} 구독 트랙
+        """
+        track = EncodedVideoTrack(self)
+        self._subscribers.add(track)
+        if streaming:
+            self._streaming_subscribers.add(track)
+        self.request_keyframe()
+        if self._task is None:
+            self._task = asyncio.get_event_loop().create_task(self._run())
+        print(f"🔁 [{self.session_id}] 공유 인코더 구독 추가 (구독자 {len(self._subscribers)}명)")
+        self._notify_route_change()
+        return track
+
+    def subscribe_raw(self) -> MediaStreamTrack:
+        """
+        원본(디코딩된) 프레임을 받는 릴레이 트랙을 생성합니다. (H.264 이외 코덱 피어용)
+
+        @returns {MediaStreamTrack} 릴레이 프록시 트랙
+        """
+        proxy = self._relay.subscribe(self.source)
+        self._raw_tracks.add(proxy)
+        self._notify_route_change()
+        return proxy
+
+    def release_raw(self, track: MediaStreamTrack) -> None:
+        """
+        더 이상 사용하지 않는 원본 릴레이 트랙을 해제합니다.
+
+        @param {MediaStreamTrack} track - subscribe_raw()로 받은 트랙
+        """
+        if track in self._raw_tracks:
+            self._raw_tracks.discard(track)
+            track.stop()
+            self._notify_route_change()
+
+    def can_passthrough(self) -> bool:
+        """
+        모든 송신 경로가 인코딩 패킷을 받는 구독자인지 확인합니다.
+        원본 프레임 구독자(H.264 이외 코덱 피어)가 있으면 패스스루할 수 없고,
+        스트리밍 서버 구독자가 있으면 수신 해상도가 STREAMING_RESOLUTION일 때만 패스스루합니다.
+
+        @returns {bool} 패스스루 가능 여부
+        """
+        if not self._subscribers or self._raw_tracks:
+            return False
+        if not self._streaming_subscribers:
+            return True
+        return getattr(self.source, 'input_size', None) == STREAMING_RESOLUTION
+
+    def _notify_route_change(self) -> None:
+        update = getattr(self.source, 'update_passthrough_mode', None)
+        if update is not None:
+            update()
+
+    def request_keyframe(self) -> None:
+        """다음 프레임을 키프레임으로 인코딩하도록 요청합니다."""
+        self._force_keyframe = True
+
+    def _unsubscribe(self, track: EncodedVideoTrack) -> None:
+        self._subscribers.discard(track)
+        self._streaming_subscribers.discard(track)
+        if not self._subscribers and self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._notify_route_change()
+
+    def _encode(self, frame: av.VideoFrame, force_keyframe: bool) -> Tuple[Optional[av.Packet], bool]:
+        """
+        프레임 하나를 H.264로 인코딩합니다. (executor 스레드에서 실행)
+
+        @param {VideoFrame} frame - 인코딩할 프레임
+        @param {bool} force_keyframe - 키프레임 강제 여부
+        @returns {tuple} (패킷 또는 None, 키프레임 여부)
+        """
+        if self._codec and (frame.width != self._codec.width or frame.height != self._codec.height):
+            self._codec = None
+
+        if self._codec is None:
+            fps = max(1, int(round(config.VIDEO_OUTPUT_FPS)))
+            self._codec = av.CodecContext.create("libx264", "w")
+            self._codec.width = frame.width
+            self._codec.height = frame.height
+            self._codec.bit_rate = self.bitrate
+            self._codec.pix_fmt = "yuv420p"
+            self._codec.framerate = fractions.Fraction(fps, 1)
+            self._codec.time_base = fractions.Fraction(1, fps)
+            self._codec.gop_size = max(1, int(fps * self.gop_seconds))
+            self._codec.options = {"profile": "baseline", "level": "31", "tune": "zerolatency"}
+            self._codec.profile = "Baseline"
+            force_keyframe = True
+
+        if force_keyframe:
+            frame.pict_type = av.video.frame.PictureType.I
+        else:
+            frame.pict_type = av.video.frame.PictureType.NONE
+
+        data = b""
+        is_keyframe = False
+        for package in self._codec.encode(frame):
+            data += bytes(package)
+            is_keyframe = is_keyframe or package.is_keyframe
+        if not data:
+            return None, False
+
+        packet = av.Packet(data)
+        packet.pts = frame.pts
+        packet.time_base = frame.time_base
+        return packet, is_keyframe
+
+    def _dispatch(self, packet: av.Packet, is_keyframe: bool) -> None:
+        for subscriber in list(self._subscribers):
+            subscriber._push(packet, is_keyframe)
+
+    async def _run(self) -> None:
+        """원본 트랙에서 프레임을 읽어 한 번 인코딩하고 모든 구독자에게 분배합니다."""
+        loop = asyncio.get_event_loop()
+        # 인코더가 밀리면 오래된 프레임 대신 최신 프레임만 인코딩
+        source = self._relay.subscribe(self.source, buffered=False)
+        try:
+            while self._subscribers:
+                frame = await source.recv()
+
+                if isinstance(frame, av.Packet):
+                    # 패스스루 패킷은 인코딩 없이 그대로 분배, 복귀 후 첫 프레임은 키프레임으로 인코딩
+                    self.stats['packets_passed_through'] += 1
+                    self._force_keyframe = True
+                    self._dispatch(frame, is_h264_keyframe(bytes(frame)))
+                    continue
+
+                force_keyframe = self._force_keyframe
+                self._force_keyframe = False
+                trace = frame_tracer.take_output(self.session_id, frame.pts)
+                traced_at = trace.now()
+                start_time = time()
+                packet, is_keyframe = await loop.run_in_executor(None, self._encode, frame, force_keyframe)
+                self.stats['encode_time'] += time() - start_time
+                trace.span('encode', traced_at)
+                self.stats['frames_encoded'] += 1
+                if packet is None:
+                    continue
+                if is_keyframe:
+                    self.stats['keyframes'] += 1
+                self._dispatch(packet, is_keyframe)
+        except (asyncio.CancelledError, MediaStreamError):
+            pass
+        except Exception as e:
+            print(f"❌ [{self.session_id}] 공유 인코더 오류: {e}")
+        finally:
+            source.stop()
+
+    def get_stats(self) -> dict:
+        """
+        인코딩 통계를 반환합니다.
+
+        @returns {dict} 인코딩 통계
+        """
+        stats = self.stats.copy()
+        stats['subscribers'] = len(self._subscribers)
+        stats['raw_subscribers'] = len(self._raw_tracks)
+        if stats['frames_encoded'] > 0:
+            stats['avg_encode_time'] = stats['encode_time'] / stats['frames_encoded']
+        return stats
+
+    def stop(self) -> None:
+        """인코딩을 중지하고 모든 구독 트랙을 종료합니다."""
+        for track in list(self._subscribers):
+            track.stop()
+        for track in list(self._raw_tracks):
+            self.release_raw(track)
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._codec = None
+
+
+def negotiated_video_codec(pc) -> Optional[str]:
+    """
+    로컬 SDP(answer)의 video m= 라인에서 협상된 첫 번째 코덱 이름을 반환합니다.
+
+    @param {RTCPeerConnection} pc - 피어 연결
+    @returns {str|None} 코덱 이름 (예: 'H264', 'VP8')
+    """
+    description = pc.localDescription
+    if description is None:
+        return None
+    lines = description.sdp.splitlines()
+    video_start = next((i for i, l in enumerate(lines) if l.startswith('m=video ')), None)
+    if video_start is None:
+        return None
+    payloads = lines[video_start].split(' ')[3:]
+    if not payloads:
+        return None
+    first_pt = payloads[0]
+    for l in lines[video_start + 1:]:
+        if l.startswith('m='):
+            break
+        if l.startswith(f'a=rtpmap:{first_pt} '):
+            return l.split(' ', 1)[1].split('/')[0].upper()
+    return None
+
+
+def attach_shared_video(pc, encoder: Optional[SharedVideoEncoder], streaming: bool = False) -> bool:
+    """
+    협상된 비디오 코덱이 H.264이면 video sender 트랙을 공유 인코더 구독 트랙으로 교체합니다.
+    setLocalDescription 이후에 호출해야 합니다.
+
+    @param {RTCPeerConnection} pc - 피어 연결
+    @param {SharedVideoEncoder} encoder - 세션의 공유 인코더
+    @param {bool} streaming - 스트리밍 서버 피어 여부
+    @returns {bool} 교체 여부
+    """
+    if encoder is None or not config.VIDEO_SHARED_ENCODER_ENABLED:
+        return False
+    codec = negotiated_video_codec(pc)
+    if codec != 'H264':
+        print(f"⚠️ [{encoder.session_id}] 협상 코덱 {codec} → 공유 인코더 미사용 (피어별 인코딩)")
+        return False
+
+    senders: List = [s for s in pc.getSenders() if s.kind == 'video' and s.track is not None]
+    if not senders:
+        return False
+    sender = senders[0]
+    old_track = sender.track
+    sender.replaceTrack(encoder.subscribe(streaming=streaming))
+    encoder.release_raw(old_track)
+    print(f"✅ [{encoder.session_id}] 비디오 송신을 공유 인코더로 전환")
+    return True
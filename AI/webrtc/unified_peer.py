@@ -15,9 +15,13 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 import asyncio
 from aiortc import RTCPeerConnection, RTCIceServer, RTCConfiguration
 from aiortc.contrib.media import MediaRelay
-from unified_track import UnifiedMediaTrack, VideoEchoTrack
-from ai_audio.audio_processor import AudioProcessor
+from unified_track import UnifiedMediaTrack, ScaledVideoTrack
+from webrtc.shared_encoder import SharedVideoEncoder
+from webrtc.passthrough import install_passthrough
 import config
+from server.session_lifecycle import session_lifecycle
+from server.admission import ADMIT_AUDIO_ONLY
+from session_state_manager import session_state_manager
 
 from aiortc.contrib.media import MediaRelay
 
@@ -71,6 +75,9 @@ def create_unified_peer_connection(websocket, manager, session_id):
         # bundlePolicy와 rtcpMuxPolicy는 aiortc에서 지원하지 않음
     )
     pc = RTCPeerConnection(configuration)
+    # 피어가 closed/failed가 되면 세션 자원 전체 해제
+    session_lifecycle.watch_peer(pc, session_id)
+    session_lifecycle.track('peer_connection', pc)
 
     # 사전 트랜시버 추가로 초기 SDP 방향성 안정화 (브라우저 offer의 sendrecv 대응)
     try:
@@ -99,10 +106,19 @@ def create_unified_peer_connection(websocket, manager, session_id):
         
         if track.kind == "audio":
             # print("🎧 오디오 트랙 수신: ", track)
-            echo_track = AudioProcessor(track, session_id)
+            if config.config.AUDIO_RECOGNITION_ENABLED:
+                # 준비 스레드(server.readiness)에서 이미 임포트되어 있으므로 지연 임포트 비용 없음
+                from ai_audio.audio_processor import AudioProcessor
+                echo_track = AudioProcessor(track, session_id)
+                session_lifecycle.track('audio_processor', echo_track)
+                if echo_track.speech_recognizer is not None:
+                    session_lifecycle.track('whisper_model', echo_track.speech_recognizer.model)
 
-            # 음성 인식 시작
-            echo_track.start_speech_recognition()
+                # 음성 인식 시작
+                echo_track.start_speech_recognition()
+            else:
+                # 음성 인식이 꺼져 있으면 오디오 처리 모듈 없이 원본 트랙을 그대로 중계
+                echo_track = track
 
             # 클라이언트와 스트리밍 서버의 트랙 분리
             client_track = relay.subscribe(echo_track)
@@ -120,17 +136,40 @@ def create_unified_peer_connection(websocket, manager, session_id):
             # manager.source_tracks[session_id]['audio'] = client_track
             manager.source_tracks[session_id]['audio'] = echo_track
             
+        elif track.kind == "video" and session_state_manager.get_session_option(session_id, 'admission') == ADMIT_AUDIO_ONLY:
+            # 입장 제어로 오디오 전용 강등된 세션은 비디오를 처리/인코딩하지 않음
+            print(f"🚦 [{session_id}] 오디오 전용 세션 → 비디오 트랙 무시")
+
+        elif track.kind == "video" and not config.config.OBJECT_DETECTION_ENABLED:
+            # 물체 감지가 꺼져 있으면 비디오 처리 모듈(torch/ultralytics/cv2) 없이 해상도만 맞춰 중계
+            print("📹 비디오 트랙 수신 (물체 감지 비활성화 → 1280x720 중계): ", track)
+            scaled_track = ScaledVideoTrack(track)
+            pc.addTrack(relay.subscribe(scaled_track))
+            manager.added_tracks[session_id]['video'] = scaled_track
+            manager.source_tracks.setdefault(session_id, {})['video'] = scaled_track
+
         elif track.kind == "video":
             print("📹 비디오 트랙 수신: ", track)
+            from ai_video.video_processor import VideoEchoTrack
             echo_track = VideoEchoTrack(track)
-            # 세션 ID를 비디오 처리기로 전달하여 세션별 필터 적용
+            session_lifecycle.track('video_track', echo_track)
+            session_lifecycle.track('video_processor', echo_track.video_processor)
+            # 세션 ID를 비디오 처리기로 전달하여 세션별 필터/출력 FPS 적용
             try:
-                if hasattr(echo_track, 'video_processor') and hasattr(echo_track.video_processor, 'set_session_id'):
-                    echo_track.video_processor.set_session_id(session_id)
+                echo_track.set_session_id(session_id)
             except Exception:
                 pass
             
-            pc.addTrack(echo_track)
+            # 공유 인코더 생성: 협상 완료 후 H.264 피어는 인코딩된 패킷을 공유 (attach_shared_video)
+            shared_encoder = SharedVideoEncoder(echo_track, session_id)
+            manager.shared_encoders[session_id] = shared_encoder
+            session_lifecycle.track('shared_encoder', shared_encoder)
+            pc.addTrack(shared_encoder.subscribe_raw())
+
+            # 필터링이 꺼져 있으면 수신 H.264 패킷을 그대로 전달하는 패스스루 탭 설치
+            controller = install_passthrough(pc, track, session_id)
+            if controller is not None:
+                echo_track.attach_passthrough(controller, shared_encoder.can_passthrough)
 
             # 트랙 저장 -> 스트리밍 서버에도 추가하기
             manager.added_tracks[session_id]['video'] = echo_track
@@ -6,9 +6,41 @@
 @description 비디오와 오디오를 통합 처리하는 MediaStreamTrack 구현체입니다.
 """
 
-# 음성 테스트를 위해 비디오 프로세서 import 비활성화
-from ai_video.video_processor import VideoEchoTrack
-from ai_audio.audio_processor import AudioProcessor
+from aiortc import MediaStreamTrack
+
+# 비디오/오디오 처리 모듈은 무거운 라이브러리를 끌어오므로 사용하는 시점에 지연 임포트
+
+
+class ScaledVideoTrack(MediaStreamTrack):
+    """
+    원본 비디오를 고정 해상도로만 바꿔 중계하는 트랙
+
+    물체 감지가 꺼진 세션도 VideoEchoTrack과 같은 해상도(스트리밍 서버 raw 파이프 규격)로 내보내되,
+    비디오 처리 모듈(torch/ultralytics/cv2)을 임포트하지 않도록 PyAV의 reformat만 사용합니다.
+    """
+
+    kind = "video"
+
+    def __init__(self, track, width: int = 1280, height: int = 720):
+        """
+        @param {MediaStreamTrack} track - 원본 비디오 트랙
+        @param {int} width - 출력 너비
+        @param {int} height - 출력 높이
+        """
+        super().__init__()
+        self.track = track
+        self.width = width
+        self.height = height
+
+    async def recv(self):
+        frame = await self.track.recv()
+        if frame.width == self.width and frame.height == self.height:
+            return frame
+        scaled = frame.reformat(width=self.width, height=self.height, format='yuv420p')
+        scaled.pts = frame.pts
+        scaled.time_base = frame.time_base
+        return scaled
+
 
 class UnifiedMediaTrack:
     """
@@ -31,6 +63,7 @@ class UnifiedMediaTrack:
         
         @param {MediaStreamTrack} track - 오디오 트랙
         """
+        from ai_audio.audio_processor import AudioProcessor
         self.audio_track = AudioProcessor(track)
         print("🎧 오디오 트랙이 통합 처리기에 추가되었습니다.")
         